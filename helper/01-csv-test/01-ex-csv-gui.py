@@ -3,128 +3,177 @@ from tkinter import filedialog, messagebox
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
 from matplotlib.path import Path
+from matplotlib.collections import LineCollection
+from matplotlib.lines import Line2D
+from matplotlib.transforms import Bbox
 import numpy as np
 import sys
 import os
 import math
+import itertools
+
+# numba 为可选依赖: 可用时对分段几何计算做 JIT 编译, 否则退回纯 numpy 实现
+try:
+    from numba import njit
+except ImportError:
+    njit = None
 
 # --- Constants ---
 MINIMAL_DISTANCE = 1e-6 # 用于比较浮点数或角度是否接近零
+SECTION_PAIRS_PER_CHUNK = 256 # 流式读取 CSV 时每批解析的行对数, 限制原始文本的峰值内存
+FIGURE_SIZE = (12, 6) # 窗口中图形的尺寸 (英寸)
+FIGURE_DPI = 100 # 窗口中图形的分辨率, 显式指定以免全局 rcParams 的高 DPI 放大画布和每次重绘的像素量
+PLOT_DTYPE = np.float32 # 只用于显示的轮廓与分段角点的存储精度 (曲率等几何计算仍用 float64)
+SAVE_DPI = 300 # 位图格式 (png/jpg) 的保存分辨率
+SAVE_VECTOR_DPI = 150 # 矢量格式 (pdf/svg) 中栅格化部分 (未选中分段) 的分辨率
+VECTOR_FORMATS = ('.pdf', '.svg', '.eps', '.ps')
 
 # --- Helper Functions ---
 
 def normalize_vector(vx, vy):
     """归一化向量"""
-    norm = np.sqrt(vx**2 + vy**2)
+    norm = math.hypot(vx, vy)
     if norm > MINIMAL_DISTANCE:
         return vx / norm, vy / norm
     else:
         return 1.0, 0.0 # 返回默认值，例如 (1, 0)
 
-def normalize_angle(angle):
-    """将角度标准化到 (-pi, pi] 区间"""
-    while angle <= -np.pi:
-        angle += 2 * np.pi
-    while angle > np.pi:
-        angle -= 2 * np.pi
-    return angle
-
-def calculate_curvature(p1, n1, p2, n2):
+def calculate_curvature_batch(points, normals):
     """
-    模拟 getCurvatureAngleShift 计算曲率半径和角度。
+    模拟 getCurvatureAngleShift, 一次性计算所有相邻截面对的曲率半径和角度。
     输入:
-        p1 (tuple): 截面1中心点 (x1, y1)
-        n1 (tuple): 截面1单位法线 (nx1, ny1)
-        p2 (tuple): 截面2中心点 (x2, y2)
-        n2 (tuple): 截面2单位法线 (nx2, ny2)
+        points (ndarray): (N, 2) 截面中心点
+        normals (ndarray): (N, 2) 截面单位法线
     输出:
-        radius (float): 曲率半径 R (可能为负，表示方向)
-        angle (float): 法线夹角 alpha (弧度, 标准化到 (-pi, pi])
+        lengths (ndarray): (N-1,) 相邻中心点距离
+        radii (ndarray): (N-1,) 曲率半径 R (近似平行时为 inf)
+        angles (ndarray): (N-1,) 法线夹角 alpha (弧度, 标准化到 (-pi, pi])
     """
-    x1, y1 = p1
-    nx1, ny1 = n1
-    x2, y2 = p2
-    nx2, ny2 = n2
-    cross_p_n2 = (x2 - x1) * ny2 - (y2 - y1) * nx2
-    cross_n2_n1 = nx2 * ny1 - ny2 * nx1
-    radius = 0.0
-    if abs(cross_n2_n1) > MINIMAL_DISTANCE:
-        radius = -cross_p_n2 / cross_n2_n1
-    else:
-        radius = float('inf')
-    angle1 = math.atan2(ny1, nx1)
-    angle2 = math.atan2(ny2, nx2)
-    angle_diff = angle2 - angle1
-    angle = normalize_angle(angle_diff)
-    return radius, angle
-
-def rotate_vector(vector, angle_rad):
-    """将二维向量旋转指定角度 (弧度)"""
-    vx, vy = vector
-    cos_a = math.cos(angle_rad)
-    sin_a = math.sin(angle_rad)
-    vx_new = cos_a * vx - sin_a * vy
-    vy_new = sin_a * vx + cos_a * vy
-    return vx_new, vy_new
-
-def calculate_outlet_geometry(s_prime_i, n_hat_i, L_i, R_i, alpha_i):
+    d_p = points[1:] - points[:-1]
+    n1 = normals[:-1]
+    n2 = normals[1:]
+    lengths = np.hypot(d_p[:, 0], d_p[:, 1])
+    cross_p_n2 = d_p[:, 0] * n2[:, 1] - d_p[:, 1] * n2[:, 0]
+    cross_n2_n1 = n2[:, 0] * n1[:, 1] - n2[:, 1] * n1[:, 0]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        radii = np.where(np.abs(cross_n2_n1) > MINIMAL_DISTANCE, -cross_p_n2 / cross_n2_n1, np.inf)
+    # 每条法线的方位角只算一次 (N 次 atan2), 相邻差值即为夹角
+    normal_angles = np.arctan2(normals[:, 1], normals[:, 0])
+    angle_diff = np.diff(normal_angles)
+    # 与 math.remainder 相同的就近取整归约, 再把 -pi 映射到 pi
+    angles = angle_diff - 2 * np.pi * np.round(angle_diff / (2 * np.pi))
+    angles[angles <= -np.pi] += 2 * np.pi
+    return lengths, radii, angles
+
+def calculate_outlet_geometry_batch(pts_in, normals_in, lengths, radii, angles):
     """
-    模拟 Acoustic3dSimulation::ctrLinePtOut 和出口法线的计算。
-    严格遵循 C++ 的条件判断逻辑来计算曲线出口点。
+    模拟 Acoustic3dSimulation::ctrLinePtOut 和出口法线的计算: 输入为按分段排列的 (N, 2) / (N,) 数组,
+    两种曲线分支与直线情况用布尔掩码选择, 返回 (N, 2) 的出口中心点和出口法线。
+    整批只算一次半角 theta = |alpha|/2 的 sin/cos 表, alpha 的 sin/cos 由倍角公式得到。
     """
-    pt_in_x, pt_in_y = s_prime_i
-    norm_in_x, norm_in_y = n_hat_i
-    n_vec = (norm_in_x, norm_in_y) # 入口法线向量 N
-
-    # --- 1. 计算出口法线 --- (不变)
-    cos_a = math.cos(alpha_i)
-    sin_a = math.sin(alpha_i)
-    norm_out_x = cos_a * norm_in_x - sin_a * norm_in_y
-    norm_out_y = sin_a * norm_in_x + cos_a * norm_in_y
-    n_hat_out_i = normalize_vector(norm_out_x, norm_out_y)
-
-    # --- 2. 计算出口中心点 ---
-    s_out_i = s_prime_i # 默认等于入口点
-
-    if L_i > MINIMAL_DISTANCE:
-        if abs(alpha_i) < MINIMAL_DISTANCE or not math.isfinite(R_i):
-            # --- 直线情况 --- (不变)
-            tangent_x = norm_in_y
-            tangent_y = -norm_in_x
-            s_out_x = pt_in_x + L_i * tangent_x
-            s_out_y = pt_in_y + L_i * tangent_y
-            s_out_i = (s_out_x, s_out_y)
+    norm_in_x = normals_in[:, 0]
+    norm_in_y = normals_in[:, 1]
+    theta = np.abs(angles) / 2.0
+    sin_theta = np.sin(theta)
+    cos_theta = np.cos(theta)
+
+    # --- 1. 出口法线: 入口法线旋转 alpha 后归一化 ---
+    # cos(alpha) = cos²θ - sin²θ, sin(alpha) = sign(alpha) * 2 sinθ cosθ
+    cos_a = (cos_theta - sin_theta) * (cos_theta + sin_theta)
+    sin_a = np.copysign(2.0 * sin_theta * cos_theta, angles)
+    norm_out = np.stack([cos_a * norm_in_x - sin_a * norm_in_y,
+                         sin_a * norm_in_x + cos_a * norm_in_y], axis=1)
+    norm = np.hypot(norm_out[:, 0], norm_out[:, 1])
+    valid = norm > MINIMAL_DISTANCE
+    normals_out = np.tile([1.0, 0.0], (len(angles), 1))
+    normals_out[valid] = norm_out[valid] / norm[valid, None]
+
+    # --- 2. 出口中心点 ---
+    # 直线与两种曲线情况都可写成 "入口点 + 系数 * 旋转后的入口法线" (复现 C++ 的两种旋转+平移组合):
+    #   直线: 系数 L, 旋转 -pi/2 (cos=0, sin=-1)
+    #   曲线: 系数 2|R|sin(theta), 旋转的 cos/sin 为 (sin θ, ±cos θ)
+    # 先在 (N,) 标量数组上按条件选出系数与 cos/sin, 再用一个无分支表达式算出全部出口点
+    signs_differ = (radii != 0.0) & ((radii < 0.0) != (angles < 0.0))
+    is_straight = (np.abs(angles) < MINIMAL_DISTANCE) | ~np.isfinite(radii)
+    with np.errstate(invalid='ignore'):
+        # R 为 inf 的分段走直线分支, 这里产生的 nan 会被 np.where 丢弃
+        chord = 2.0 * np.abs(radii) * sin_theta
+    coef = np.where(lengths > MINIMAL_DISTANCE, np.where(is_straight, lengths, chord), 0.0)
+    cos_r = np.where(is_straight, 0.0, sin_theta)
+    sin_r = np.where(is_straight, -1.0, np.where(signs_differ, cos_theta, -cos_theta))
+    pts_out = pts_in + coef[:, None] * np.stack([cos_r * norm_in_x - sin_r * norm_in_y,
+                                                 sin_r * norm_in_x + cos_r * norm_in_y], axis=1)
+    return pts_out, normals_out
+
+def _segment_geometry_kernel(points, normals, lengths, radii, angles, pts_out, normals_out):
+    """
+    曲率与出口几何的合并内核 (逐分段循环, 供 Numba 编译)。
+    输入为 (N+1, 2) 的截面中心点与单位法线, 结果写入预分配的 (N,) / (N, 2) 输出数组;
+    公式与 calculate_curvature_batch / calculate_outlet_geometry_batch 完全一致。
+    """
+    angle_prev = math.atan2(normals[0, 1], normals[0, 0])
+    for i in range(points.shape[0] - 1):
+        norm_in_x = normals[i, 0]
+        norm_in_y = normals[i, 1]
+        n2_x = normals[i + 1, 0]
+        n2_y = normals[i + 1, 1]
+
+        # --- 曲率: 长度, 半径, 法线夹角 ---
+        d_x = points[i + 1, 0] - points[i, 0]
+        d_y = points[i + 1, 1] - points[i, 1]
+        L_i = math.hypot(d_x, d_y)
+        cross_p_n2 = d_x * n2_y - d_y * n2_x
+        cross_n2_n1 = n2_x * norm_in_y - n2_y * norm_in_x
+        R_i = -cross_p_n2 / cross_n2_n1 if abs(cross_n2_n1) > MINIMAL_DISTANCE else math.inf
+        angle_next = math.atan2(n2_y, n2_x)
+        angle_diff = angle_next - angle_prev
+        angle_prev = angle_next
+        alpha_i = angle_diff - 2 * np.pi * np.round(angle_diff / (2 * np.pi))
+        if alpha_i <= -np.pi:
+            alpha_i += 2 * np.pi
+        lengths[i] = L_i
+        radii[i] = R_i
+        angles[i] = alpha_i
+
+        # --- 出口法线: 每个分段只算一次半角的 sin/cos, alpha 的 sin/cos 由倍角公式得到 ---
+        theta = abs(alpha_i) / 2.0
+        sin_theta = math.sin(theta)
+        cos_theta = math.cos(theta)
+        cos_a = (cos_theta - sin_theta) * (cos_theta + sin_theta)
+        sin_a = math.copysign(2.0 * sin_theta * cos_theta, alpha_i)
+        norm_out_x = cos_a * norm_in_x - sin_a * norm_in_y
+        norm_out_y = sin_a * norm_in_x + cos_a * norm_in_y
+        norm = math.hypot(norm_out_x, norm_out_y)
+        if norm > MINIMAL_DISTANCE:
+            normals_out[i, 0] = norm_out_x / norm
+            normals_out[i, 1] = norm_out_y / norm
         else:
-            # --- 曲线情况 (复现 C++ 条件逻辑) ---
-            theta = abs(alpha_i) / 2.0
-            sin_theta = math.sin(theta)
-
-            # C++ 条件: R 和 R*alpha 符号是否相反 (等价于 R 和 alpha 符号是否不同)
-            signs_differ = (np.sign(R_i) * np.sign(alpha_i) < 0) if R_i != 0 and alpha_i != 0 else False
-
-            translation_vec = (0.0, 0.0)
-
-            if signs_differ:
-                # 分支1: R 和 alpha 符号不同
-                angle_rot1 = math.pi/2.0 - theta
-                base_vec1 = (-norm_in_x, -norm_in_y) # 基础向量 -N
-                rotated_vec1 = rotate_vector(base_vec1, angle_rot1)
-                dist_scalar1 = -2.0 * abs(R_i) * sin_theta
-                translation_vec = (dist_scalar1 * rotated_vec1[0], dist_scalar1 * rotated_vec1[1])
+            normals_out[i, 0] = 1.0
+            normals_out[i, 1] = 0.0
+
+        # --- 出口中心点: 入口点 + 系数 * 旋转后的入口法线 ---
+        coef = 0.0
+        cos_r = 0.0
+        sin_r = -1.0
+        if L_i > MINIMAL_DISTANCE:
+            if abs(alpha_i) < MINIMAL_DISTANCE or not math.isfinite(R_i):
+                coef = L_i
             else:
-                # 分支2: R 和 alpha 符号相同 (或其一为0)
-                angle_rot2 = theta - math.pi/2.0
-                base_vec2 = n_vec # 基础向量 N
-                rotated_vec2 = rotate_vector(base_vec2, angle_rot2)
-                dist_scalar2 = 2.0 * abs(R_i) * sin_theta
-                translation_vec = (dist_scalar2 * rotated_vec2[0], dist_scalar2 * rotated_vec2[1])
+                coef = 2.0 * abs(R_i) * sin_theta
+                cos_r = sin_theta
+                sin_r = cos_theta if R_i != 0.0 and (R_i < 0.0) != (alpha_i < 0.0) else -cos_theta
+        pts_out[i, 0] = points[i, 0] + coef * (cos_r * norm_in_x - sin_r * norm_in_y)
+        pts_out[i, 1] = points[i, 1] + coef * (sin_r * norm_in_x + cos_r * norm_in_y)
 
-            # 应用最终的平移向量
-            s_out_x = pt_in_x + translation_vec[0]
-            s_out_y = pt_in_y + translation_vec[1]
-            s_out_i = (s_out_x, s_out_y)
+def _segment_geometry_numpy(points, normals, lengths, radii, angles, pts_out, normals_out):
+    """未安装 numba 时使用的纯 numpy 实现, 接口与 _segment_geometry_kernel 相同"""
+    lengths[:], radii[:], angles[:] = calculate_curvature_batch(points, normals)
+    pts_out[:], normals_out[:] = calculate_outlet_geometry_batch(points[:-1], normals[:-1], lengths, radii, angles)
 
-    return s_out_i, n_hat_out_i
+if njit is not None:
+    calculate_segment_geometry = njit(cache=True, error_model='numpy')(_segment_geometry_kernel)
+else:
+    calculate_segment_geometry = _segment_geometry_numpy
 
 
 # --- 数据加载与准备 ---
@@ -133,115 +182,165 @@ def load_and_prepare_section_data(line_odd, line_even):
     解析CSV行对, 模拟 C++ 中的数据加载、几何中心调整和必要的数据准备。
     返回包含原始和调整后数据的字典。
     """
-    local_contour_y = []
-    local_contour_z = []
-    center_x, center_y = 0.0, 0.0
-    normal_x, normal_y = 1.0, 0.0
-    scale_in, scale_out = 1.0, 1.0
     try:
-        parts_odd = line_odd.strip().split(';')
+        # 只切分出前三个标量字段, 轮廓部分逐字段转换并跳过空字段 (含补齐用的尾部分号)
+        parts_odd = line_odd.strip().split(';', 3)
         if len(parts_odd) < 4: raise ValueError("奇数行字段不足")
         center_x = float(parts_odd[0])
         normal_x = float(parts_odd[1])
         scale_in = float(parts_odd[2])
-        local_contour_y = [float(p) for p in parts_odd[3:] if p.strip()]
+        local_contour_y = np.array([p for p in parts_odd[3].split(';') if p.strip()], dtype=float)
     except Exception as e:
         print(f"错误: 解析奇数行失败: {e}\n行: {line_odd.strip()}")
         return None
     try:
-        parts_even = line_even.strip().split(';')
+        parts_even = line_even.strip().split(';', 3)
         if len(parts_even) < 4: raise ValueError("偶数行字段不足")
         center_y = float(parts_even[0])
         normal_y = float(parts_even[1])
         scale_out = float(parts_even[2])
-        local_contour_z = [float(p) for p in parts_even[3:] if p.strip()]
+        local_contour_z = np.array([p for p in parts_even[3].split(';') if p.strip()], dtype=float)
     except (IndexError, ValueError) as e:
         print(f"错误: 解析偶数行失败: {e}\n行: {line_even.strip()}")
         return None
-    if len(local_contour_y) != len(local_contour_z):
-        print(f"错误: 轮廓点数量不匹配 ({len(local_contour_y)} vs {len(local_contour_z)})" )
+    return prepare_section_data(center_x, center_y, normal_x, normal_y, scale_in, scale_out,
+                                local_contour_y, local_contour_z)
+
+def parse_section_lines(lines):
+    """
+    批量解析 CSV 的全部行对: 把所有行拼接后交给一次 np.fromstring 在 C 层解析,
+    再按每行字段数切回各行。若有格式异常或含空字段的行, 退回逐对解析 (跳过空字段, 并报告出错位置)。
+    """
+    lines = [line.strip().rstrip(';') for line in lines[:len(lines) // 2 * 2]]
+    if not lines:
+        return []
+    counts = np.array([line.count(';') + 1 for line in lines])
+    values = None
+    if counts.min() >= 4:
+        try:
+            values = np.fromstring(';'.join(lines), sep=';')
+        except ValueError:
+            values = None
+    if values is None or values.size != counts.sum():
+        sections = (load_and_prepare_section_data(lines[i], lines[i + 1]) for i in range(0, len(lines), 2))
+        return [section for section in sections if section]
+    rows = np.split(values, np.cumsum(counts)[:-1])
+    # 奇数行: 中心 x, 法线 x, 入口缩放, 轮廓 y; 偶数行: 中心 y, 法线 y, 出口缩放, 轮廓 z
+    sections = (prepare_section_data(row_odd[0], row_even[0], row_odd[1], row_even[1], row_odd[2], row_even[2],
+                                     row_odd[3:], row_even[3:])
+                for row_odd, row_even in zip(rows[0::2], rows[1::2]))
+    return [section for section in sections if section]
+
+def iter_file_sections(file, pairs_per_chunk=SECTION_PAIRS_PER_CHUNK):
+    """
+    逐批从文件对象读取行对并解析, 依次 yield 截面字典。
+    每批最多 pairs_per_chunk 对行交给 parse_section_lines 批量解析, 不必一次读入整个文件。
+    """
+    while True:
+        lines = list(itertools.islice(file, 2 * pairs_per_chunk))
+        if not lines:
+            return
+        if len(lines) % 2 != 0: print("Warning: Odd number of lines in CSV.")
+        yield from parse_section_lines(lines)
+
+def prepare_section_data(center_x, center_y, normal_x, normal_y, scale_in, scale_out,
+                         local_contour_y, local_contour_z):
+    """由解析得到的截面字段 (轮廓为 numpy 数组) 计算几何中心调整, 返回包含原始和调整后数据的字典"""
+    if local_contour_y.size != local_contour_z.size:
+        print(f"错误: 轮廓点数量不匹配 ({local_contour_y.size} vs {local_contour_z.size})" )
         return None
-    if not local_contour_y:
+    if local_contour_y.size == 0:
         print("警告: 未找到轮廓点")
 
-    # 保存原始局部轮廓用于绘图
-    original_contour_y = list(local_contour_y)
-    original_contour_z = list(local_contour_z)
-    original_contourY_plot = list(original_contour_y)
-    original_contourZ_plot = list(original_contour_z)
-    if original_contourY_plot and original_contourZ_plot:
-        original_contourY_plot.append(original_contourY_plot[0])
-        original_contourZ_plot.append(original_contourZ_plot[0])
-
     nx_norm, ny_norm = normalize_vector(normal_x, normal_y)
 
     z_min_adj, z_max_adj = 0.0, 0.0
     z_c_local = 0.0
-    adjusted_contour_z = []
-    if local_contour_z:
-        z_min_local = min(local_contour_z)
-        z_max_local = max(local_contour_z)
+    adjusted_contour_z = local_contour_z
+    if local_contour_z.size:
+        z_min_local = local_contour_z.min()
+        z_max_local = local_contour_z.max()
         z_c_local = (z_min_local + z_max_local) / 2.0
-        adjusted_contour_z = [z - z_c_local for z in local_contour_z]
-        if adjusted_contour_z:
-             z_min_adj = min(adjusted_contour_z)
-             z_max_adj = max(adjusted_contour_z)
-
-    adjusted_contour_y = list(local_contour_y)
+        adjusted_contour_z = local_contour_z - z_c_local
+        z_min_adj = adjusted_contour_z.min()
+        z_max_adj = adjusted_contour_z.max()
 
     adjusted_center_x = center_x + z_c_local * nx_norm
     adjusted_center_y = center_y + z_c_local * ny_norm
-    ctrLinePtIn_adj = (adjusted_center_x, adjusted_center_y)
-
-    contour_y_plot_adj = list(adjusted_contour_y)
-    contour_z_plot_adj = list(adjusted_contour_z)
-    if contour_y_plot_adj and contour_z_plot_adj:
-        contour_y_plot_adj.append(contour_y_plot_adj[0])
-        contour_z_plot_adj.append(contour_z_plot_adj[0])
 
     return {
-        "ctrLinePtIn_adj": ctrLinePtIn_adj,
+        "ctrLinePtIn_adj": (adjusted_center_x, adjusted_center_y),
         "normalIn_adj": (nx_norm, ny_norm),
         "scaleIn": scale_in,
         "scaleOut": scale_out,
-        "contourY_local_adj": adjusted_contour_y,
+        "contourY_local": local_contour_y, # Y 坐标不变, 原始/居中后共用
+        "contourZ_local_orig": local_contour_z,
         "contourZ_local_adj": adjusted_contour_z,
-        "contourY_plot_adj": contour_y_plot_adj,
-        "contourZ_plot_adj": contour_z_plot_adj,
-        "original_contourY_plot": original_contourY_plot,
-        "original_contourZ_plot": original_contourZ_plot,
         "z_c_local": z_c_local,
         "zMinAdj_local": z_min_adj,
         "zMaxAdj_local": z_max_adj,
-        "length": 0.0,
-        "curvatureRadius": float('inf'),
-        "curvatureAngle": 0.0,
-        "ctrLinePtOut": ctrLinePtIn_adj,
-        "normalOut": (nx_norm, ny_norm),
     }
 
+# 截面字典中按截面取值的标量/二维向量字段, 由 build_section_arrays 整理为 SoA 数组
+SECTION_ARRAY_FIELDS = ("ctrLinePtIn_adj", "normalIn_adj", "scaleIn", "scaleOut",
+                        "z_c_local", "zMinAdj_local", "zMaxAdj_local")
+# 长度随截面变化的轮廓字段, 首尾拼接成一维数组, 按 contourOffsets 切分
+SECTION_CONTOUR_FIELDS = ("contourY_local", "contourZ_local_orig", "contourZ_local_adj")
+
+def build_section_arrays(sections):
+    """
+    把 parse_section_lines 得到的截面字典列表整理为 SoA (以字段名为键的 numpy 数组字典):
+    标量字段为 (N,), 二维向量字段为 (N, 2); 轮廓拼接为一维 PLOT_DTYPE 数组 (只用于绘图),
+    第 i 个截面的轮廓为 [contourOffsets[i], contourOffsets[i+1]) 区间。
+    """
+    arrays = {key: np.array([d[key] for d in sections], dtype=float) for key in SECTION_ARRAY_FIELDS}
+    for key in SECTION_CONTOUR_FIELDS:
+        arrays[key] = np.concatenate([d[key] for d in sections]).astype(PLOT_DTYPE)
+    arrays["contourOffsets"] = np.concatenate([[0], np.cumsum([d["contourY_local"].size for d in sections])])
+    return arrays
+
+def section_contour(sections, key, index):
+    """取出第 index 个截面的轮廓数组 (拼接数组上的视图)"""
+    offsets = sections["contourOffsets"]
+    return sections[key][offsets[index]:offsets[index + 1]]
+
+def close_contour(contour):
+    """把首点接到末尾, 得到绘图用的闭合曲线坐标"""
+    return np.concatenate([contour, contour[:1]])
+
 # --- 角点计算 ---
-def get_segment_points(section_data_i):
+def get_segment_points(ptIn, normalIn, scaleIn, ymin_local, ymax_local,
+                       ptOut, normalOut, scaleOut):
+    """
+    批量计算所有分段四个角点的全局坐标。
+    点/法线为 (N, 2) 数组, 缩放和上下界为 (N,) 数组。
+    返回 (N, 4, 2) 数组, 角点顺序为 InMin, InMax, OutMin, OutMax。
+    """
+    # 每个分段的 (ymin, ymax) 局部边界, (N, 2, 1)
+    y_bounds = np.stack([ymin_local, ymax_local], axis=1)[:, :, None]
+    pts_in = ptIn[:, None, :] + normalIn[:, None, :] * y_bounds * scaleIn[:, None, None]
+    pts_out = ptOut[:, None, :] + normalOut[:, None, :] * y_bounds * scaleOut[:, None, None]
+    return np.concatenate([pts_in, pts_out], axis=1)
+
+# --- 矢状图绘制 ---
+# 每类边在角点数组 (InMin, InMax, OutMin, OutMax) 中的端点索引及其默认颜色
+SEGMENT_EDGES = (
+    ((0, 1), 'gray'),     # 入口线 InMin -> InMax
+    ((2, 3), 'darkgray'), # 出口线 OutMin -> OutMax
+    ((0, 2), 'green'),    # 下边界 InMin -> OutMin
+    ((1, 3), 'blue'),     # 上边界 InMax -> OutMax
+)
+SEGMENT_EDGE_CORNERS = np.array([edge for edge, _ in SEGMENT_EDGES])
+
+def build_centerline_path(pts_in, pts_out):
     """
-    使用段 i 的完整几何数据计算四个角点的全局坐标。
+    把所有分段的中心线 (入口点 -> 出口点) 拼成一条折线的坐标, 分段之间以 NaN 断开,
+    这样一个 Line2D 即可画出全部中心线。返回 (3N,) 的 x, y 数组。
     """
-    ptIn = section_data_i["ctrLinePtIn_adj"]
-    normalIn = section_data_i["normalIn_adj"]
-    scaleIn = section_data_i["scaleIn"]
-    ymin_local = section_data_i["zMinAdj_local"]
-    ymax_local = section_data_i["zMaxAdj_local"]
-    ptOut = section_data_i["ctrLinePtOut"]
-    normalOut = section_data_i["normalOut"]
-    scaleOut = section_data_i["scaleOut"]
-    ptInMin = (ptIn[0] + normalIn[0] * ymin_local * scaleIn,
-               ptIn[1] + normalIn[1] * ymin_local * scaleIn)
-    ptInMax = (ptIn[0] + normalIn[0] * ymax_local * scaleIn,
-               ptIn[1] + normalIn[1] * ymax_local * scaleIn)
-    ptOutMin = (ptOut[0] + normalOut[0] * ymin_local * scaleOut,
-                ptOut[1] + normalOut[1] * ymin_local * scaleOut)
-    ptOutMax = (ptOut[0] + normalOut[0] * ymax_local * scaleOut,
-                ptOut[1] + normalOut[1] * ymax_local * scaleOut)
-    return ptInMin, ptInMax, ptOutMin, ptOutMax
+    path = np.full((3 * len(pts_in), 2), np.nan)
+    path[0::3] = pts_in
+    path[1::3] = pts_out
+    return path[:, 0], path[:, 1]
 
 # --- GUI Application Class ---
 class VocalTractViewerApp:
@@ -251,11 +350,26 @@ class VocalTractViewerApp:
         # 添加关闭窗口协议处理
         master.protocol("WM_DELETE_WINDOW", self.on_closing)
 
-        self.all_sections_data = []
+        # 截面数据与分段结果均为以字段名为键的 numpy 数组字典 (SoA), 见 build_section_arrays
+        self.sections = {}
+        self.segments = {}
+        self.num_sections = 0
         self.num_segments = 0
         self.selected_segment_index = -1
-        self.segment_lines = []
+        self.segment_collections = [] # 每类边一个 LineCollection, 见 create_sagittal_artists
+        self.selected_segment_lines = None # 选中分段四条边的高亮 LineCollection (animated, 用 blit 单独绘制)
+        self.centerline = None # 全部分段中心线 (以 NaN 断开的一条折线)
+        self.sagittal_background = None # 不含高亮线段的左图背景缓存, 每次完整重绘后更新
+        self.cross_section_background = None # 不含右图的右侧区域背景缓存, 同上
+        self.cross_section_bbox = None # 右侧区域 (右图及其标题、刻度、图例) 的像素范围
+        # 左图图例的静态句柄, 只创建一次, 不再每次重绘都往坐标轴里加空的代理曲线
+        self.centerline_legend_handle = Line2D([], [], color='red', linestyle='--', marker='.', label='Centerline')
+        self.segment_legend_handles = [Line2D([], [], color='gray', label='Segment Boundary (Deselected)'),
+                                       Line2D([], [], color='red', label='Segment Boundary (Selected)')]
         self.loaded_csv_basename = ""
+        # 各分段的包围盒 (N, 4: xmin, ymin, xmax, ymax) 和四边形路径, 供点击检测
+        self.segment_bounds = np.empty((0, 4))
+        self.segment_paths = []
 
         # --- Top Frame for Controls ---
         self.control_frame = tk.Frame(master)
@@ -273,7 +387,7 @@ class VocalTractViewerApp:
         self.status_label.pack(side=tk.LEFT, padx=5)
 
         # --- Matplotlib Figure and Axes ---
-        self.fig, (self.ax_left, self.ax_right) = plt.subplots(1, 2, figsize=(12, 6))
+        self.fig, (self.ax_left, self.ax_right) = plt.subplots(1, 2, figsize=FIGURE_SIZE, dpi=FIGURE_DPI)
         self.fig.suptitle("Vocal Tract Visualization")
 
         # --- Left Plot (Sagittal) Setup ---
@@ -289,6 +403,12 @@ class VocalTractViewerApp:
         self.ax_right.set_ylabel('Local Z')
         self.ax_right.set_aspect('equal', adjustable='datalim')
         self.ax_right.grid(True)
+        # 右图整体 animated: 切换分段时连同标题、刻度一起 blit, 由 on_draw 在完整重绘后补画
+        self.ax_right.set_animated(True)
+
+        # 两侧图中的 artist 只创建一次, 加载文件和切换分段时只更新其数据
+        self.create_sagittal_artists()
+        self.create_cross_section_artists()
 
         # --- Embed Matplotlib in Tkinter ---
         self.canvas = FigureCanvasTkAgg(self.fig, master=master)
@@ -302,6 +422,8 @@ class VocalTractViewerApp:
 
         # --- Connect Click Event ---
         self.fig.canvas.mpl_connect('button_press_event', self.on_click)
+        # 每次完整重绘 (加载, 缩放/平移, 窗口尺寸变化) 后重新缓存左图背景
+        self.fig.canvas.mpl_connect('draw_event', self.on_draw)
 
     def on_closing(self):
         """处理窗口关闭事件"""
@@ -322,53 +444,61 @@ class VocalTractViewerApp:
         self.loaded_csv_basename = os.path.splitext(os.path.basename(filepath))[0]
         self.status_label.config(text=f"Loading: {os.path.basename(filepath)}...")
         self.master.update_idletasks()
-        self.all_sections_data = []
+        self.sections = {}
+        self.num_sections = 0
+        self.num_segments = 0
         try:
             with open(filepath, 'r') as f:
-                lines = f.readlines()
-            if len(lines) % 2 != 0: print("Warning: Odd number of lines in CSV.")
-            for i in range(0, len(lines), 2):
-                if i + 1 < len(lines):
-                    section = load_and_prepare_section_data(lines[i], lines[i+1])
-                    if section: self.all_sections_data.append(section)
+                section_list = list(iter_file_sections(f))
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load or process file:\n{e}")
             self.status_label.config(text="Error loading file.")
             self.loaded_csv_basename = ""
             self.btn_save["state"] = "disabled"
             return
-        if not self.all_sections_data:
+        if not section_list:
             messagebox.showwarning("Warning", "No valid section data found in the file.")
             self.status_label.config(text="No data found.")
             self.loaded_csv_basename = ""
             self.btn_save["state"] = "disabled"
             return
-        self.num_segments = len(self.all_sections_data) - 1
-        if self.num_segments < 0: self.num_segments = 0
-        for i in range(self.num_segments):
-            data_i = self.all_sections_data[i]; data_i_plus_1 = self.all_sections_data[i+1]
-            s_prime_i = data_i["ctrLinePtIn_adj"]; s_prime_i_plus_1 = data_i_plus_1["ctrLinePtIn_adj"]
-            n_hat_i = data_i["normalIn_adj"]; n_hat_i_plus_1 = data_i_plus_1["normalIn_adj"]
-            length = np.sqrt((s_prime_i_plus_1[0] - s_prime_i[0])**2 + (s_prime_i_plus_1[1] - s_prime_i[1])**2)
-            data_i["length"] = length
-            radius, angle = calculate_curvature(s_prime_i, n_hat_i, s_prime_i_plus_1, n_hat_i_plus_1)
-            data_i["curvatureRadius"] = radius; data_i["curvatureAngle"] = angle
-        for i in range(self.num_segments):
-            data_i = self.all_sections_data[i]
-            s_out_i, n_hat_out_i = calculate_outlet_geometry(
-                data_i["ctrLinePtIn_adj"], data_i["normalIn_adj"], data_i["length"],
-                data_i["curvatureRadius"], data_i["curvatureAngle"]
-            )
-            data_i["ctrLinePtOut"] = s_out_i; data_i["normalOut"] = n_hat_out_i
+        self.sections = build_section_arrays(section_list)
+        self.num_sections = len(section_list)
+        self.num_segments = self.num_sections - 1
+        n = self.num_segments
+        # 所有分段的曲率和出口几何一次性计算, 结果直接写入分段数组
+        points = self.sections["ctrLinePtIn_adj"]
+        normals = self.sections["normalIn_adj"]
+        self.segments = {
+            "length": np.empty(n),
+            "curvatureRadius": np.empty(n),
+            "curvatureAngle": np.empty(n),
+            "ctrLinePtOut": np.empty((n, 2)),
+            "normalOut": np.empty((n, 2)),
+        }
+        calculate_segment_geometry(points, normals, self.segments["length"], self.segments["curvatureRadius"],
+                                   self.segments["curvatureAngle"], self.segments["ctrLinePtOut"],
+                                   self.segments["normalOut"])
+        # 几何只在加载时变化: 角点、包围盒和点击检测用的四边形路径在这里算好并缓存
+        corners = get_segment_points(points[:-1], normals[:-1], self.sections["scaleIn"][:-1],
+                                     self.sections["zMinAdj_local"][:-1], self.sections["zMaxAdj_local"][:-1],
+                                     self.segments["ctrLinePtOut"], self.segments["normalOut"],
+                                     self.sections["scaleOut"][:-1])
+        # 角点只用于绘图和点击检测, 按 float64 算完后以 PLOT_DTYPE 存储
+        corners = corners.astype(PLOT_DTYPE)
+        self.segments["corners"] = corners
+        self.segment_bounds = np.hstack([corners.min(axis=1), corners.max(axis=1)])
+        self.segment_paths = [Path(quad[[0, 1, 3, 2, 0]]) for quad in corners]
         self.selected_segment_index = 0 if self.num_segments > 0 else -1
-        self.update_sagittal_plot()
+        # 先更新右图数据, 再由 update_sagittal_plot 的完整重绘一并画出
         self.update_cross_section_plot()
-        self.status_label.config(text=f"Loaded {len(self.all_sections_data)} sections ({self.num_segments} segments).")
+        self.update_sagittal_plot()
+        self.status_label.config(text=f"Loaded {self.num_sections} sections ({self.num_segments} segments).")
         self.btn_save["state"] = "normal"
 
     def save_plot(self):
         """保存当前图形到文件"""
-        if not self.all_sections_data:
+        if self.num_sections == 0:
             messagebox.showwarning("Save Plot", "No data loaded to save.")
             return
         default_filename = f"{self.loaded_csv_basename}_plot"
@@ -388,123 +518,194 @@ class VocalTractViewerApp:
             ]
         )
         if output_filepath:
+            # 高亮线段和右图平时是 animated 的, 不参与普通绘制; 保存时临时放回普通绘制流程
+            self.selected_segment_lines.set_animated(False)
+            self.ax_right.set_animated(False)
             try:
-                self.fig.savefig(output_filepath, dpi=300, bbox_inches='tight')
+                is_vector = os.path.splitext(output_filepath)[1].lower() in VECTOR_FORMATS
+                self.fig.savefig(output_filepath, dpi=SAVE_VECTOR_DPI if is_vector else SAVE_DPI, bbox_inches='tight')
                 self.status_label.config(text=f"Plot saved to: {os.path.basename(output_filepath)}")
                 print(f"Plot saved successfully to {output_filepath}")
             except Exception as e:
                 messagebox.showerror("Save Error", f"Failed to save plot:\n{e}")
                 self.status_label.config(text="Error saving plot.")
+            finally:
+                self.selected_segment_lines.set_animated(True)
+                self.ax_right.set_animated(True)
+                self.canvas.draw_idle()
+
+    def create_sagittal_artists(self):
+        """
+        在左图上一次性创建分段边框、高亮线段和中心线的 artist, 之后加载新文件只替换它们的数据。
+        每类边 (入口线, 出口线, 下边界, 上边界) 用一个 LineCollection 画出所有分段,
+        选中分段的四条边另用一个 animated 的高亮 LineCollection 画在最上层, 切换选中时
+        只替换它的线段并 blit 到缓存的背景上。
+        """
+        self.segment_collections = []
+        for _, color in SEGMENT_EDGES:
+            collection = LineCollection([], colors=color, linewidths=1.0, linestyles='-', capstyle='projecting', zorder=5)
+            # 导出 pdf/svg 时未选中的分段按位图嵌入, 只有高亮线段和中心线保留矢量
+            collection.set_rasterized(True)
+            self.ax_left.add_collection(collection, autolim=False)
+            self.segment_collections.append(collection)
+        self.selected_segment_lines = LineCollection([], colors='red', linewidths=2.0, linestyles='-', capstyle='projecting', zorder=15, animated=True)
+        self.ax_left.add_collection(self.selected_segment_lines, autolim=False)
+        # 全部中心线合成一条以 NaN 断开的折线
+        self.centerline, = self.ax_left.plot([], [], color='red', linestyle='--', marker='.', markersize=3,
+                                             linewidth=1, zorder=10)
+
+    def create_cross_section_artists(self):
+        """在右图上一次性创建轮廓、中心点和法线的 artist, 切换截面时只更新数据和图例标签"""
+        self.cross_orig_line, = self.ax_right.plot([], [], marker='.', markersize=3, linestyle='--', color='lightcoral', label='Original')
+        self.cross_adj_line, = self.ax_right.plot([], [], marker='o', markersize=4, linestyle='-', color='darkblue', label='Centered')
+        self.cross_origin = self.ax_right.scatter(0, 0, color='black', s=50, zorder=5, label='Origin/Centered Z')
+        self.cross_z_center = self.ax_right.scatter(0, 0, color='purple', s=100, marker='*', zorder=6)
+        self.cross_normal = self.ax_right.quiver(0, 0, 1, 0, angles='xy', scale_units='xy', scale=1, color='green')
+        self.cross_artists = (self.cross_orig_line, self.cross_adj_line, self.cross_origin,
+                              self.cross_z_center, self.cross_normal)
+        for artist in self.cross_artists:
+            artist.set_visible(False)
+
+    def highlight_segment(self, index):
+        """把高亮 LineCollection 换成 index 分段的四条边, index 无效时清空"""
+        if 0 <= index < self.num_segments:
+            self.selected_segment_lines.set_segments(self.segments["corners"][index][SEGMENT_EDGE_CORNERS])
+        else:
+            self.selected_segment_lines.set_segments([])
 
-    def draw_segment_sagittal_gui(self, ax, section_data_i, segment_index, is_selected):
-        ptInMin, ptInMax, ptOutMin, ptOutMax = get_segment_points(section_data_i)
-        color_in = 'red' if is_selected else 'gray'
-        color_out = 'red' if is_selected else 'darkgray'
-        color_upper = 'red' if is_selected else 'blue'
-        color_lower = 'red' if is_selected else 'green'
-        linewidth = 2.0 if is_selected else 1.0
-        zorder = 15 if is_selected else 5
-        lines = []
-        lines.extend(ax.plot([ptInMin[0], ptInMax[0]], [ptInMin[1], ptInMax[1]], color=color_in, linestyle='-', linewidth=linewidth, zorder=zorder))
-        lines.extend(ax.plot([ptOutMin[0], ptOutMax[0]], [ptOutMin[1], ptOutMax[1]], color=color_out, linestyle='-', linewidth=linewidth, zorder=zorder))
-        lines.extend(ax.plot([ptInMin[0], ptOutMin[0]], [ptInMin[1], ptOutMin[1]], color=color_lower, linestyle='-', linewidth=linewidth, zorder=zorder))
-        lines.extend(ax.plot([ptInMax[0], ptOutMax[0]], [ptInMax[1], ptOutMax[1]], color=color_upper, linestyle='-', linewidth=linewidth, zorder=zorder))
-        return lines
+    def on_draw(self, event):
+        """完整重绘后缓存不含高亮线段的左图背景和不含右图的右侧区域背景, 再把两者补画上去"""
+        if not self.selected_segment_lines.get_animated():
+            self.sagittal_background = None
+            self.cross_section_background = None
+            return
+        self.sagittal_background = self.canvas.copy_from_bbox(self.ax_left.bbox)
+        # 右侧区域: 左图 (含图例、刻度) 右边到画布右边缘, 右图标题和刻度文字随截面变化也在其内
+        left = self.ax_left.get_tightbbox(event.renderer).x1
+        self.cross_section_bbox = Bbox.from_extents(left, self.fig.bbox.y0, self.fig.bbox.x1, self.fig.bbox.y1)
+        self.cross_section_background = self.canvas.copy_from_bbox(self.cross_section_bbox)
+        self.fig.draw_artist(self.ax_right)
+        self.ax_left.draw_artist(self.selected_segment_lines)
+
+    def blit_selected_segment(self):
+        """恢复缓存的左图背景, 只重画高亮线段并 blit, 不触发整幅图的重绘"""
+        if self.sagittal_background is None:
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self.sagittal_background)
+        self.ax_left.draw_artist(self.selected_segment_lines)
+        self.canvas.blit(self.ax_left.bbox)
+
+    def blit_cross_section(self):
+        """恢复缓存的右侧区域背景, 只重画右图并 blit, 不触发整幅图的重绘"""
+        if self.cross_section_background is None:
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self.cross_section_background)
+        self.fig.draw_artist(self.ax_right)
+        self.canvas.blit(self.cross_section_bbox)
 
     def update_sagittal_plot(self):
-        """更新左侧矢状图"""
-        self.ax_left.clear()
-        self.segment_lines = []
-
-        if not self.all_sections_data:
+        """更新左侧矢状图: 替换已有 artist 的数据, 并按新数据重新计算坐标范围"""
+        self.sagittal_background = None
+        legend = self.ax_left.get_legend()
+        if legend is not None:
+            legend.remove()
+
+        if self.num_sections == 0:
+            for collection in self.segment_collections:
+                collection.set_segments([])
+            self.highlight_segment(-1)
+            self.centerline.set_data([], [])
             self.ax_left.set_title('Sagittal View (No data)')
             self.canvas.draw()
             return
 
-        # 绘制所有段及其中心线
-        for i in range(self.num_segments):
-            data_i = self.all_sections_data[i]
-            is_selected = (i == self.selected_segment_index)
-
-            # 绘制段梯形轮廓
-            lines = self.draw_segment_sagittal_gui(self.ax_left, data_i, i, is_selected)
-            self.segment_lines.append(lines)
-
-            # 绘制该段的中心线
-            s_prime_i = data_i["ctrLinePtIn_adj"]
-            s_out_i = data_i["ctrLinePtOut"]
-            self.ax_left.plot([s_prime_i[0], s_out_i[0]], [s_prime_i[1], s_out_i[1]],
-                              color='red', linestyle='--', marker='.', markersize=3,
-                              linewidth=1, zorder=10,
-                              label='_nolegend_' if i > 0 else 'Centerline') # 只为第一个段添加图例
+        edges = self.segments["corners"][:, SEGMENT_EDGE_CORNERS] # (N, 4, 2, 2)
+        for role, collection in enumerate(self.segment_collections):
+            collection.set_segments(edges[:, role])
+        self.highlight_segment(self.selected_segment_index)
+        pts_in = self.sections["ctrLinePtIn_adj"]
+        if self.num_segments > 0:
+            self.centerline.set_data(*build_centerline_path(pts_in[:-1], self.segments["ctrLinePtOut"]))
+            data_points = np.concatenate([self.segments["corners"].reshape(-1, 2), pts_in[:-1],
+                                          self.segments["ctrLinePtOut"]])
+        else:
+            self.centerline.set_data([], [])
+            data_points = pts_in
+        # set_segments/set_data 不会更新数据范围: 丢弃旧文件的范围后按新数据重新计算
+        self.ax_left.ignore_existing_data_limits = True
+        self.ax_left.update_datalim(data_points)
+        self.ax_left.autoscale_view()
 
         self.ax_left.set_title('Sagittal View')
-        self.ax_left.set_xlabel('Global X')
-        self.ax_left.set_ylabel('Global Y')
-        self.ax_left.set_aspect('equal', adjustable='datalim')
-        self.ax_left.grid(True)
-        # 修正图例，确保 Centerline 显示
+        legend_handles = self.segment_legend_handles
         if self.num_segments > 0:
-             self.ax_left.plot([],[], color='red', linestyle='--', marker='.', label='Centerline')
-        self.ax_left.plot([],[], color='gray', label='Segment Boundary (Deselected)')
-        self.ax_left.plot([],[], color='red', label='Segment Boundary (Selected)')
-        self.ax_left.legend(fontsize='small')
+            legend_handles = [self.centerline_legend_handle] + legend_handles
+        self.ax_left.legend(handles=legend_handles, fontsize='small')
         self.canvas.draw()
 
     def update_cross_section_plot(self):
-        self.ax_right.clear()
-        if self.selected_segment_index < 0 or self.selected_segment_index >= len(self.all_sections_data):
+        """更新右图的数据和坐标范围; 右图是 animated 的, 由调用方负责重绘或 blit"""
+        index = self.selected_segment_index
+        if index < 0 or index >= self.num_sections:
+             for artist in self.cross_artists:
+                 artist.set_visible(False)
+             legend = self.ax_right.get_legend()
+             if legend is not None:
+                 legend.remove()
+             self.ax_right.autoscale() # 恢复自动范围, 不保留上一个截面的坐标范围
              self.ax_right.set_title('Cross-section (Select Segment)')
-             self.canvas.draw()
              return
-        section_data = self.all_sections_data[self.selected_segment_index]
-        if section_data.get("original_contourY_plot"):
-             self.ax_right.plot(section_data["original_contourY_plot"], section_data["original_contourZ_plot"], marker='.', markersize=3, linestyle='--', color='lightcoral', label='Original')
-        if section_data.get("contourY_plot_adj"):
-             self.ax_right.plot(section_data["contourY_plot_adj"], section_data["contourZ_plot_adj"], marker='o', markersize=4, linestyle='-', color='darkblue', label='Centered')
-        self.ax_right.scatter(0, 0, color='black', s=50, zorder=5, label='Origin/Centered Z')
-        z_c = section_data.get("z_c_local")
-        if z_c is not None:
-             self.ax_right.scatter(0, z_c, color='purple', s=100, marker='*', zorder=6, label=f'Original Z-Center ({z_c:.2f})')
-        nx, ny = section_data["normalIn_adj"]
-        self.ax_right.quiver(0, 0, nx, ny, angles='xy', scale_units='xy', scale=1, color='green', label=f'Normal Dir ({nx:.2f},{ny:.2f})')
+        # 只为当前选中的截面生成闭合轮廓 (Y 坐标原始/居中后相同, 共用一份)
+        contour_y_plot = close_contour(section_contour(self.sections, "contourY_local", index))
+        original_contour_z_plot = close_contour(section_contour(self.sections, "contourZ_local_orig", index))
+        contour_z_plot_adj = close_contour(section_contour(self.sections, "contourZ_local_adj", index))
+        self.cross_orig_line.set_data(contour_y_plot, original_contour_z_plot)
+        self.cross_adj_line.set_data(contour_y_plot, contour_z_plot_adj)
+        z_c = self.sections["z_c_local"][index]
+        self.cross_z_center.set_offsets([[0, z_c]])
+        self.cross_z_center.set_label(f'Original Z-Center ({z_c:.2f})')
+        nx, ny = self.sections["normalIn_adj"][index]
+        self.cross_normal.set_UVC(nx, ny)
+        self.cross_normal.set_label(f'Normal Dir ({nx:.2f},{ny:.2f})')
+        for artist in self.cross_artists:
+            artist.set_visible(True)
         self.ax_right.set_title(f'Cross-section {self.selected_segment_index} (Z-Centering)')
-        self.ax_right.set_xlabel('Local Y')
-        self.ax_right.set_ylabel('Local Z')
-        self.ax_right.set_aspect('equal', adjustable='datalim')
-        self.ax_right.grid(True)
         self.ax_right.legend(fontsize='small')
-        all_x, all_y = [0], [0]
-        if section_data.get("original_contourY_plot"): all_x.extend(section_data["original_contourY_plot"])
-        if section_data.get("original_contourZ_plot"): all_y.extend(section_data["original_contourZ_plot"])
-        if section_data.get("contourY_plot_adj"): all_x.extend(section_data["contourY_plot_adj"])
-        if section_data.get("contourZ_plot_adj"): all_y.extend(section_data["contourZ_plot_adj"])
-        if z_c is not None: all_y.append(z_c)
-        if len(all_x) > 1:
-            min_x, max_x = min(all_x), max(all_x); range_x = max_x - min_x or 1.0
-            pad_x = 0.1 * range_x + 0.5; self.ax_right.set_xlim(min_x - pad_x, max_x + pad_x)
-        if len(all_y) > 1:
-            min_y, max_y = min(all_y), max(all_y); range_y = max_y - min_y or 1.0
-            pad_y = 0.1 * range_y + 0.5; self.ax_right.set_ylim(min_y - pad_y, max_y + pad_y)
-        self.canvas.draw()
+        # 坐标范围直接在轮廓数组上归约 (含原点和原始 Z 中心), 不再拼接 Python 列表
+        if contour_y_plot.size:
+            min_x = min(0.0, contour_y_plot.min()); max_x = max(0.0, contour_y_plot.max())
+            min_y = min(0.0, z_c, original_contour_z_plot.min(), contour_z_plot_adj.min())
+            max_y = max(0.0, z_c, original_contour_z_plot.max(), contour_z_plot_adj.max())
+        else:
+            min_x = max_x = 0.0
+            min_y, max_y = min(0.0, z_c), max(0.0, z_c)
+        range_x = max_x - min_x or 1.0
+        pad_x = 0.1 * range_x + 0.5; self.ax_right.set_xlim(min_x - pad_x, max_x + pad_x)
+        range_y = max_y - min_y or 1.0
+        pad_y = 0.1 * range_y + 0.5; self.ax_right.set_ylim(min_y - pad_y, max_y + pad_y)
 
     def on_click(self, event):
-        if event.inaxes != self.ax_left or not self.all_sections_data or self.num_segments == 0:
+        if event.inaxes != self.ax_left or self.num_segments <= 0:
             return
         click_x, click_y = event.xdata, event.ydata
         clicked_segment = -1
-        for i in range(self.num_segments):
-            data_i = self.all_sections_data[i]
-            pts = get_segment_points(data_i)
-            poly_path = Path([pts[0], pts[1], pts[3], pts[2], pts[0]])
-            if poly_path.contains_point((click_x, click_y)):
-                clicked_segment = i
+        # 先用包围盒一次性筛出候选分段 (通常只有一两个), 再对候选做精确的多边形检测
+        xmin, ymin, xmax, ymax = self.segment_bounds.T
+        candidates = np.flatnonzero((xmin <= click_x) & (click_x <= xmax) & (ymin <= click_y) & (click_y <= ymax))
+        for i in candidates:
+            if self.segment_paths[i].contains_point((click_x, click_y)):
+                clicked_segment = int(i)
                 break
         if clicked_segment != -1 and clicked_segment != self.selected_segment_index:
             print(f"Segment {clicked_segment} clicked.")
             self.selected_segment_index = clicked_segment
-            self.update_sagittal_plot()
+            # 矢状图只需更换高亮线段, 截面图只需更新数据, 两者分别 blit
+            self.highlight_segment(clicked_segment)
+            self.blit_selected_segment()
             self.update_cross_section_plot()
+            self.blit_cross_section()
 
 
 # --- Main Execution ---
@@ -1,15 +1,34 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox
-import matplotlib.pyplot as plt
+import matplotlib
+# 界面直接嵌入 FigureCanvasTkAgg, 不经过 pyplot: 导入本模块时不会初始化 pyplot 的后端
+from matplotlib.figure import Figure
+from matplotlib.lines import Line2D
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
-from matplotlib.path import Path
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection
+from matplotlib.colors import to_rgba, to_rgba_array
+from matplotlib.transforms import Bbox
 import numpy as np
 import sys
 import os
 import math
 from matplotlib import font_manager  # 新增导入
 
+# numba 为可选依赖: 可用时对出口几何批量计算做 JIT 编译, 否则退回纯 numpy 实现
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
 # --- 字体设置 (全局变量) ---
+def set_global_font(font_path):
+    """注册字体文件并设为 matplotlib 默认字体, 之后的标题/标签/图例无需再逐个传入 fontproperties"""
+    font_manager.fontManager.addfont(font_path)
+    matplotlib.rcParams['font.family'] = 'sans-serif'
+    matplotlib.rcParams['font.sans-serif'] = [font_manager.FontProperties(fname=font_path).get_name()] + matplotlib.rcParams['font.sans-serif']
+    matplotlib.rcParams['axes.unicode_minus'] = False # 中文字体通常缺少 Unicode 负号字形
+
 zh_font_prop = None
 try:
     # 假设字体文件在脚本同目录下
@@ -17,6 +36,7 @@ try:
     font_path = os.path.join(script_dir, 'SimHei.ttf')
     if os.path.exists(font_path):
         zh_font_prop = font_manager.FontProperties(fname=font_path)
+        set_global_font(font_path)
         print(f"已成功加载中文字体: {font_path}")
     else:
         print(f"警告：未在目录 '{script_dir}' 下找到字体文件 'SimHei.ttf'，中文可能无法正确显示。")
@@ -26,6 +46,7 @@ except NameError:
     font_path = os.path.join(script_dir, 'SimHei.ttf')
     if os.path.exists(font_path):
         zh_font_prop = font_manager.FontProperties(fname=font_path)
+        set_global_font(font_path)
         print(f"已成功加载中文字体: {font_path}")
     else:
         print(f"警告：未在目录 '{script_dir}' 或 '{os.getcwd()}' 下找到字体文件 'SimHei.ttf'，中文可能无法正确显示。")
@@ -37,116 +58,139 @@ MINIMAL_DISTANCE = 1e-6 # 用于比较浮点数或角度是否接近零
 
 def normalize_vector(vx, vy):
     """归一化向量"""
-    norm = np.sqrt(vx**2 + vy**2)
+    norm = math.hypot(vx, vy)
     if norm > MINIMAL_DISTANCE:
         return vx / norm, vy / norm
     else:
         return 1.0, 0.0 # 返回默认值，例如 (1, 0)
 
-def normalize_angle(angle):
-    """将角度标准化到 (-pi, pi] 区间"""
-    while angle <= -np.pi:
-        angle += 2 * np.pi
-    while angle > np.pi:
-        angle -= 2 * np.pi
-    return angle
+def normalize_vectors(vectors):
+    """normalize_vector 的批量版本: 对 (N, 2) 数组逐行归一化, 模长过小的行置为 (1, 0)"""
+    vectors = np.array(vectors, dtype=float)
+    norms = np.hypot(vectors[:, 0], vectors[:, 1])
+    valid = norms > MINIMAL_DISTANCE
+    vectors[valid] /= norms[valid, None]
+    vectors[~valid] = (1.0, 0.0)
+    return vectors
 
-def calculate_curvature(p1, n1, p2, n2):
+def calculate_curvature_batch(points, normals):
     """
-    模拟 getCurvatureAngleShift 计算曲率半径和角度。
+    模拟 getCurvatureAngleShift, 一次性计算所有相邻截面对的曲率半径和角度。
     输入:
-        p1 (tuple): 截面1中心点 (x1, y1)
-        n1 (tuple): 截面1单位法线 (nx1, ny1)
-        p2 (tuple): 截面2中心点 (x2, y2)
-        n2 (tuple): 截面2单位法线 (nx2, ny2)
+        points (ndarray): (N, 2) 截面中心点
+        normals (ndarray): (N, 2) 截面单位法线
     输出:
-        radius (float): 曲率半径 R (可能为负，表示方向)
-        angle (float): 法线夹角 alpha (弧度, 标准化到 (-pi, pi])
+        lengths (ndarray): (N-1,) 相邻中心点距离
+        radii (ndarray): (N-1,) 曲率半径 R (近似平行时为 inf)
+        angles (ndarray): (N-1,) 法线夹角 alpha (弧度, 标准化到 (-pi, pi])
     """
-    x1, y1 = p1
-    nx1, ny1 = n1
-    x2, y2 = p2
-    nx2, ny2 = n2
-    cross_p_n2 = (x2 - x1) * ny2 - (y2 - y1) * nx2
-    cross_n2_n1 = nx2 * ny1 - ny2 * nx1
-    radius = 0.0
-    if abs(cross_n2_n1) > MINIMAL_DISTANCE:
-        radius = -cross_p_n2 / cross_n2_n1
-    else:
-        radius = float('inf')
-    angle1 = math.atan2(ny1, nx1)
-    angle2 = math.atan2(ny2, nx2)
-    angle_diff = angle2 - angle1
-    angle = normalize_angle(angle_diff)
-    return radius, angle
-
-def rotate_vector(vector, angle_rad):
-    """将二维向量旋转指定角度 (弧度)"""
-    vx, vy = vector
-    cos_a = math.cos(angle_rad)
-    sin_a = math.sin(angle_rad)
-    vx_new = cos_a * vx - sin_a * vy
-    vy_new = sin_a * vx + cos_a * vy
-    return vx_new, vy_new
-
-def calculate_outlet_geometry(s_prime_i, n_hat_i, L_i, R_i, alpha_i):
+    d_p = points[1:] - points[:-1]
+    n1 = normals[:-1]
+    n2 = normals[1:]
+    lengths = np.hypot(d_p[:, 0], d_p[:, 1])
+    cross_p_n2 = d_p[:, 0] * n2[:, 1] - d_p[:, 1] * n2[:, 0]
+    cross_n2_n1 = n2[:, 0] * n1[:, 1] - n2[:, 1] * n1[:, 0]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        radii = np.where(np.abs(cross_n2_n1) > MINIMAL_DISTANCE, -cross_p_n2 / cross_n2_n1, np.inf)
+    # 每条法线的方位角只算一次 (N 次 atan2), 相邻差值即为夹角
+    normal_angles = np.arctan2(normals[:, 1], normals[:, 0])
+    angle_diff = np.diff(normal_angles)
+    # 与 math.remainder 相同的就近取整归约, 再把 -pi 映射到 pi
+    angles = angle_diff - math.tau * np.round(angle_diff / math.tau)
+    angles[angles <= -math.pi] += math.tau
+    return lengths, radii, angles
+
+def _outlet_geometry_kernel(pts_in, normals_in, lengths, radii, angles, pts_out, normals_out):
     """
-    模拟 Acoustic3dSimulation::ctrLinePtOut 和出口法线的计算。
-    严格遵循 C++ 的条件判断逻辑来计算曲线出口点。
+    模拟 Acoustic3dSimulation::ctrLinePtOut 和出口法线的计算 (逐分段循环, 供 Numba 编译)。
+    输入均为按分段排列的数组, 结果写入预分配的 pts_out / normals_out (N, 2)。
     """
-    pt_in_x, pt_in_y = s_prime_i
-    norm_in_x, norm_in_y = n_hat_i
-    n_vec = (norm_in_x, norm_in_y) # 入口法线向量 N
-
-    # --- 1. 计算出口法线 --- (不变)
-    cos_a = math.cos(alpha_i)
-    sin_a = math.sin(alpha_i)
-    norm_out_x = cos_a * norm_in_x - sin_a * norm_in_y
-    norm_out_y = sin_a * norm_in_x + cos_a * norm_in_y
-    n_hat_out_i = normalize_vector(norm_out_x, norm_out_y)
-
-    # --- 2. 计算出口中心点 ---
-    s_out_i = s_prime_i # 默认等于入口点
-
-    if L_i > MINIMAL_DISTANCE:
-        if abs(alpha_i) < MINIMAL_DISTANCE or not math.isfinite(R_i):
-            # --- 直线情况 --- (不变)
-            tangent_x = norm_in_y
-            tangent_y = -norm_in_x
-            s_out_x = pt_in_x + L_i * tangent_x
-            s_out_y = pt_in_y + L_i * tangent_y
-            s_out_i = (s_out_x, s_out_y)
+    for i in range(pts_in.shape[0]):
+        norm_in_x = normals_in[i, 0]
+        norm_in_y = normals_in[i, 1]
+        L_i = lengths[i]
+        R_i = radii[i]
+        alpha_i = angles[i]
+
+        # --- 1. 出口法线 ---
+        cos_a = math.cos(alpha_i)
+        sin_a = math.sin(alpha_i)
+        norm_out_x = cos_a * norm_in_x - sin_a * norm_in_y
+        norm_out_y = sin_a * norm_in_x + cos_a * norm_in_y
+        norm = math.sqrt(norm_out_x * norm_out_x + norm_out_y * norm_out_y)
+        if norm > MINIMAL_DISTANCE:
+            normals_out[i, 0] = norm_out_x / norm
+            normals_out[i, 1] = norm_out_y / norm
         else:
-            # --- 曲线情况 (复现 C++ 条件逻辑) ---
-            theta = abs(alpha_i) / 2.0
-            sin_theta = math.sin(theta)
-
-            # C++ 条件: R 和 R*alpha 符号是否相反 (等价于 R 和 alpha 符号是否不同)
-            signs_differ = (np.sign(R_i) * np.sign(alpha_i) < 0) if R_i != 0 and alpha_i != 0 else False
-
-            translation_vec = (0.0, 0.0)
-
-            if signs_differ:
-                # 分支1: R 和 alpha 符号不同
-                angle_rot1 = math.pi/2.0 - theta
-                base_vec1 = (-norm_in_x, -norm_in_y) # 基础向量 -N
-                rotated_vec1 = rotate_vector(base_vec1, angle_rot1)
-                dist_scalar1 = -2.0 * abs(R_i) * sin_theta
-                translation_vec = (dist_scalar1 * rotated_vec1[0], dist_scalar1 * rotated_vec1[1])
+            normals_out[i, 0] = 1.0
+            normals_out[i, 1] = 0.0
+
+        # --- 2. 出口中心点 ---
+        s_out_x = pts_in[i, 0]
+        s_out_y = pts_in[i, 1]
+        if L_i > MINIMAL_DISTANCE:
+            if abs(alpha_i) < MINIMAL_DISTANCE or not math.isfinite(R_i):
+                # 直线情况
+                s_out_x += L_i * norm_in_y
+                s_out_y -= L_i * norm_in_x
             else:
-                # 分支2: R 和 alpha 符号相同 (或其一为0)
-                angle_rot2 = theta - math.pi/2.0
-                base_vec2 = n_vec # 基础向量 N
-                rotated_vec2 = rotate_vector(base_vec2, angle_rot2)
-                dist_scalar2 = 2.0 * abs(R_i) * sin_theta
-                translation_vec = (dist_scalar2 * rotated_vec2[0], dist_scalar2 * rotated_vec2[1])
-
-            # 应用最终的平移向量
-            s_out_x = pt_in_x + translation_vec[0]
-            s_out_y = pt_in_y + translation_vec[1]
-            s_out_i = (s_out_x, s_out_y)
-
-    return s_out_i, n_hat_out_i
+                # 曲线情况: 旋转角 ±(pi/2 - theta) 的 cos/sin 由 theta 的 sin/cos 导出
+                theta = abs(alpha_i) / 2.0
+                sin_theta = math.sin(theta)
+                cos_theta = math.cos(theta)
+                dist_scalar = 2.0 * abs(R_i) * sin_theta
+                if R_i != 0.0 and (R_i < 0.0) != (alpha_i < 0.0):
+                    # R 与 alpha 符号不同: 旋转角 pi/2 - theta, 基础向量 -N
+                    rot_sin = cos_theta
+                    base_x = -norm_in_x
+                    base_y = -norm_in_y
+                    dist_scalar = -dist_scalar
+                else:
+                    # R 与 alpha 符号相同: 旋转角 theta - pi/2, 基础向量 N
+                    rot_sin = -cos_theta
+                    base_x = norm_in_x
+                    base_y = norm_in_y
+                s_out_x += dist_scalar * (sin_theta * base_x - rot_sin * base_y)
+                s_out_y += dist_scalar * (rot_sin * base_x + sin_theta * base_y)
+        pts_out[i, 0] = s_out_x
+        pts_out[i, 1] = s_out_y
+
+def _outlet_geometry_numpy(pts_in, normals_in, lengths, radii, angles, pts_out, normals_out):
+    """未安装 numba 时使用的纯 numpy 批量实现, 接口与 _outlet_geometry_kernel 相同"""
+    norm_in_x = normals_in[:, 0]
+    norm_in_y = normals_in[:, 1]
+    cos_a = np.cos(angles)
+    sin_a = np.sin(angles)
+    norm_out = np.stack([cos_a * norm_in_x - sin_a * norm_in_y,
+                         sin_a * norm_in_x + cos_a * norm_in_y], axis=1)
+    norm = np.hypot(norm_out[:, 0], norm_out[:, 1])
+    valid = norm > MINIMAL_DISTANCE
+    normals_out[:] = (1.0, 0.0)
+    normals_out[valid] = norm_out[valid] / norm[valid, None]
+
+    # 直线与两种曲线情况都可写成 "入口点 + 系数 * 旋转后的入口法线":
+    #   直线: 系数 L, 旋转 -pi/2 (cos=0, sin=-1)
+    #   曲线: 系数 2|R|sin(theta), 旋转 ±(pi/2 - theta), 其 cos/sin 由 theta 的 sin/cos 代数导出
+    #         (R 与 alpha 符号不同时, C++ 中的 -N 与负距离两次取负相互抵消)
+    # 先在 (N,) 标量数组上按条件选出系数与 cos/sin, 再用一个无分支表达式算出全部出口点
+    signs_differ = (radii != 0.0) & ((radii < 0.0) != (angles < 0.0))
+    theta = np.abs(angles) / 2.0
+    sin_theta = np.sin(theta)
+    cos_theta = np.cos(theta)
+    is_straight = (np.abs(angles) < MINIMAL_DISTANCE) | ~np.isfinite(radii)
+    with np.errstate(invalid='ignore'):
+        # R 为 inf 的分段走直线分支, 这里产生的 nan 会被 np.where 丢弃
+        dist_scalar = 2.0 * np.abs(radii) * sin_theta
+    coef = np.where(lengths > MINIMAL_DISTANCE, np.where(is_straight, lengths, dist_scalar), 0.0)
+    cos_r = np.where(is_straight, 0.0, sin_theta)
+    sin_r = np.where(is_straight, -1.0, np.where(signs_differ, cos_theta, -cos_theta))
+    pts_out[:, 0] = pts_in[:, 0] + coef * (cos_r * norm_in_x - sin_r * norm_in_y)
+    pts_out[:, 1] = pts_in[:, 1] + coef * (sin_r * norm_in_x + cos_r * norm_in_y)
+
+if njit is not None:
+    calculate_outlet_geometry_batch = njit(cache=True, error_model='numpy')(_outlet_geometry_kernel)
+else:
+    calculate_outlet_geometry_batch = _outlet_geometry_numpy
 
 
 # --- 数据加载与准备 ---
@@ -155,71 +199,107 @@ def load_and_prepare_section_data(line_odd, line_even):
     解析CSV行对, 模拟 C++ 中的数据加载、几何中心调整和必要的数据准备。
     返回包含原始和调整后数据的字典。
     """
-    local_contour_y = []
-    local_contour_z = []
-    center_x, center_y = 0.0, 0.0
-    normal_x, normal_y = 1.0, 0.0
-    scale_in, scale_out = 1.0, 1.0
     try:
-        parts_odd = line_odd.strip().split(';')
+        # 只切分出前三个标量字段, 轮廓部分逐字段转换并跳过空字段 (含补齐用的尾部分号)
+        parts_odd = line_odd.strip().split(';', 3)
         if len(parts_odd) < 4: raise ValueError("奇数行字段不足")
         center_x = float(parts_odd[0])
         normal_x = float(parts_odd[1])
         scale_in = float(parts_odd[2])
-        local_contour_y = [float(p) for p in parts_odd[3:] if p.strip()]
+        local_contour_y = np.array([p for p in parts_odd[3].split(';') if p.strip()], dtype=float)
     except Exception as e:
         print(f"错误: 解析奇数行失败: {e}\n行: {line_odd.strip()}")
         return None
     try:
-        parts_even = line_even.strip().split(';')
+        parts_even = line_even.strip().split(';', 3)
         if len(parts_even) < 4: raise ValueError("偶数行字段不足")
         center_y = float(parts_even[0])
         normal_y = float(parts_even[1])
         scale_out = float(parts_even[2])
-        local_contour_z = [float(p) for p in parts_even[3:] if p.strip()]
+        local_contour_z = np.array([p for p in parts_even[3].split(';') if p.strip()], dtype=float)
     except (IndexError, ValueError) as e:
         print(f"错误: 解析偶数行失败: {e}\n行: {line_even.strip()}")
         return None
-    if len(local_contour_y) != len(local_contour_z):
-        print(f"错误: 轮廓点数量不匹配 ({len(local_contour_y)} vs {len(local_contour_z)})" )
+    nx_norm, ny_norm = normalize_vector(normal_x, normal_y)
+    return prepare_section_data(center_x, center_y, nx_norm, ny_norm, scale_in, scale_out,
+                                local_contour_y, local_contour_z)
+
+def parse_section_lines(lines):
+    """
+    批量解析 CSV 的全部行对: 把所有行拼接后交给一次 np.fromstring 在 C 层解析,
+    再按每行字段数切回各行。若有格式异常或含空字段的行, 退回逐对解析 (跳过空字段, 并报告出错位置)。
+    """
+    lines = [line.strip().rstrip(';') for line in lines[:len(lines) // 2 * 2]]
+    if not lines:
+        return []
+    counts = np.array([line.count(';') + 1 for line in lines])
+    values = None
+    if counts.min() >= 4:
+        try:
+            values = np.fromstring(';'.join(lines), sep=';')
+        except ValueError:
+            values = None
+    if values is None or values.size != counts.sum():
+        sections = (load_and_prepare_section_data(lines[i], lines[i + 1]) for i in range(0, len(lines), 2))
+        return [section for section in sections if section]
+    rows = np.split(values, np.cumsum(counts)[:-1])
+    # 每行前三个字段 (中心, 法线, 缩放) 整理成 (N, 3), 法线一次性批量归一化
+    heads_odd = np.array([row[:3] for row in rows[0::2]])
+    heads_even = np.array([row[:3] for row in rows[1::2]])
+    normals = normalize_vectors(np.column_stack([heads_odd[:, 1], heads_even[:, 1]]))
+    sections = (prepare_section_data(head_odd[0], head_even[0], normal[0], normal[1], head_odd[2], head_even[2],
+                                     row_odd[3:], row_even[3:])
+                for row_odd, row_even, head_odd, head_even, normal
+                in zip(rows[0::2], rows[1::2], heads_odd, heads_even, normals))
+    return [section for section in sections if section]
+
+def prepare_section_data(center_x, center_y, nx_norm, ny_norm, scale_in, scale_out,
+                         local_contour_y, local_contour_z):
+    """由解析得到的截面字段 (法线已归一化) 计算几何中心调整, 返回包含原始和调整后数据的字典"""
+    if local_contour_y.size != local_contour_z.size:
+        print(f"错误: 轮廓点数量不匹配 ({local_contour_y.size} vs {local_contour_z.size})" )
         return None
-    if not local_contour_y:
+    if local_contour_y.size == 0:
         print("警告: 未找到轮廓点")
 
-    # 保存原始局部轮廓用于绘图
-    original_contour_y = list(local_contour_y)
-    original_contour_z = list(local_contour_z)
-    original_contourY_plot = list(original_contour_y)
-    original_contourZ_plot = list(original_contour_z)
-    if original_contourY_plot and original_contourZ_plot:
-        original_contourY_plot.append(original_contourY_plot[0])
-        original_contourZ_plot.append(original_contourZ_plot[0])
-
-    nx_norm, ny_norm = normalize_vector(normal_x, normal_y)
+    # 保存原始局部轮廓用于绘图: (2, M+1) 数组, 首点接到末尾以闭合曲线
+    contour_closed_orig = np.vstack([local_contour_y, local_contour_z])
+    contour_closed_orig = np.concatenate([contour_closed_orig, contour_closed_orig[:, :1]], axis=1)
 
+    # 每条轮廓只做一次 min/max 归约; 平移不改变元素顺序, 调整后的极值直接由原始极值平移得到
+    z_min_local, z_max_local = 0.0, 0.0
     z_min_adj, z_max_adj = 0.0, 0.0
     z_c_local = 0.0
-    adjusted_contour_z = []
-    if local_contour_z:
-        z_min_local = min(local_contour_z)
-        z_max_local = max(local_contour_z)
+    adjusted_contour_z = local_contour_z
+    if local_contour_z.size:
+        z_min_local = local_contour_z.min()
+        z_max_local = local_contour_z.max()
         z_c_local = (z_min_local + z_max_local) / 2.0
-        adjusted_contour_z = [z - z_c_local for z in local_contour_z]
-        if adjusted_contour_z:
-             z_min_adj = min(adjusted_contour_z)
-             z_max_adj = max(adjusted_contour_z)
+        adjusted_contour_z = local_contour_z - z_c_local
+        z_min_adj = z_min_local - z_c_local
+        z_max_adj = z_max_local - z_c_local
 
-    adjusted_contour_y = list(local_contour_y)
+    # Y 坐标不变, 直接共享解析得到的数组
+    adjusted_contour_y = local_contour_y
 
     adjusted_center_x = center_x + z_c_local * nx_norm
     adjusted_center_y = center_y + z_c_local * ny_norm
     ctrLinePtIn_adj = (adjusted_center_x, adjusted_center_y)
 
-    contour_y_plot_adj = list(adjusted_contour_y)
-    contour_z_plot_adj = list(adjusted_contour_z)
-    if contour_y_plot_adj and contour_z_plot_adj:
-        contour_y_plot_adj.append(contour_y_plot_adj[0])
-        contour_z_plot_adj.append(contour_z_plot_adj[0])
+    contour_closed_adj = np.vstack([adjusted_contour_y, adjusted_contour_z])
+    contour_closed_adj = np.concatenate([contour_closed_adj, contour_closed_adj[:, :1]], axis=1)
+
+    # 截面视图的坐标轴范围只取决于轮廓本身, 加载时算好 (包含局部原点与原始 Z 中心)
+    def padded_limits(lo, hi):
+        pad = 0.1 * ((hi - lo) or 1.0) + 0.5
+        return (lo - pad, hi + pad)
+    cross_section_xlim = None
+    if local_contour_y.size:
+        cross_section_xlim = padded_limits(min(0.0, local_contour_y.min()), max(0.0, local_contour_y.max()))
+    y_candidates = [0.0, z_c_local]
+    if local_contour_z.size:
+        y_candidates += [z_min_local, z_max_local, z_min_adj, z_max_adj]
+    cross_section_ylim = padded_limits(min(y_candidates), max(y_candidates))
 
     return {
         "ctrLinePtIn_adj": ctrLinePtIn_adj,
@@ -228,16 +308,16 @@ def load_and_prepare_section_data(line_odd, line_even):
         "scaleOut": scale_out,
         "contourY_local_adj": adjusted_contour_y,
         "contourZ_local_adj": adjusted_contour_z,
-        "contourY_plot_adj": contour_y_plot_adj,
-        "contourZ_plot_adj": contour_z_plot_adj,
-        "original_contourY_plot": original_contourY_plot,
-        "original_contourZ_plot": original_contourZ_plot,
+        "contour_closed_adj": contour_closed_adj,
+        "contour_closed_orig": contour_closed_orig,
+        "cross_section_xlim": cross_section_xlim,
+        "cross_section_ylim": cross_section_ylim,
         "z_c_local": z_c_local,
         "zMinAdj_local": z_min_adj,
         "zMaxAdj_local": z_max_adj,
         "original_center": (center_x, center_y),
-        "zMinLocal_orig": min(local_contour_z) if local_contour_z else 0.0,
-        "zMaxLocal_orig": max(local_contour_z) if local_contour_z else 0.0,
+        "zMinLocal_orig": z_min_local,
+        "zMaxLocal_orig": z_max_local,
         "ctrLinePtOut_orig": (center_x, center_y),
         "length": 0.0,
         "curvatureRadius": float('inf'),
@@ -247,54 +327,63 @@ def load_and_prepare_section_data(line_odd, line_even):
     }
 
 # --- 角点计算 ---
-def get_segment_points(section_data_i):
+# 每个分段四条边在角点数组中的端点索引: 入口线, 出口线, 下边界, 上边界
+SEGMENT_EDGE_CORNERS = np.array([[0, 1], [3, 2], [0, 3], [1, 2]])
+
+def get_segment_points(ptIn, normalIn, scaleIn, ymin_local, ymax_local,
+                       ptOut, normalOut, scaleOut):
     """
-    使用段 i 的完整几何数据计算四个角点的全局坐标。
+    批量计算所有分段四个角点的全局坐标。
+    点/法线为 (N, 2) 数组, 缩放和上下界为 (N,) 数组;
+    调整后与原始几何分别传入对应的数组即可。
+    返回 (N, 4, 2) 数组, 角点按 InMin, InMax, OutMax, OutMin 首尾相接, 可直接作为四边形使用。
     """
-    ptIn = section_data_i["ctrLinePtIn_adj"]
-    normalIn = section_data_i["normalIn_adj"]
-    scaleIn = section_data_i["scaleIn"]
-    ymin_local = section_data_i["zMinAdj_local"]
-    ymax_local = section_data_i["zMaxAdj_local"]
-    ptOut = section_data_i["ctrLinePtOut"]
-    normalOut = section_data_i["normalOut"]
-    scaleOut = section_data_i["scaleOut"]
-    ptInMin = (ptIn[0] + normalIn[0] * ymin_local * scaleIn,
-               ptIn[1] + normalIn[1] * ymin_local * scaleIn)
-    ptInMax = (ptIn[0] + normalIn[0] * ymax_local * scaleIn,
-               ptIn[1] + normalIn[1] * ymax_local * scaleIn)
-    ptOutMin = (ptOut[0] + normalOut[0] * ymin_local * scaleOut,
-                ptOut[1] + normalOut[1] * ymin_local * scaleOut)
-    ptOutMax = (ptOut[0] + normalOut[0] * ymax_local * scaleOut,
-                ptOut[1] + normalOut[1] * ymax_local * scaleOut)
-    return ptInMin, ptInMax, ptOutMin, ptOutMax
-
-# --- 原始角点计算 (新增) ---
-def get_segment_points_original(section_data_i):
+    y_bounds = np.stack([ymin_local, ymax_local], axis=1) # (N, 2)
+    edge_in = ptIn[:, None, :] + normalIn[:, None, :] * (y_bounds * scaleIn[:, None])[:, :, None]
+    edge_out = ptOut[:, None, :] + normalOut[:, None, :] * (y_bounds * scaleOut[:, None])[:, :, None]
+    return np.concatenate([edge_in, edge_out[:, ::-1]], axis=1)
+
+def build_segment_edges(corners):
     """
-    使用段 i 的 *原始* 几何数据计算四个角点的全局坐标。
+    把 (N, 4, 2) 角点数组整理为 LineCollection 所需的 (4N, 2, 2) 线段数组,
+    每个分段依次为: 入口线, 出口线, 下边界, 上边界。
     """
-    ptIn = section_data_i["original_center"]
-    normalIn = section_data_i["normalIn_adj"] # 使用归一化法线
-    scaleIn = section_data_i["scaleIn"]
-    ymin_local = section_data_i["zMinLocal_orig"]
-    ymax_local = section_data_i["zMaxLocal_orig"]
-    ptOut = section_data_i["ctrLinePtOut_orig"]
-    normalOut = section_data_i["normalOut_orig"]
-    scaleOut = section_data_i["scaleOut"]
-    ptInMin = (ptIn[0] + normalIn[0] * ymin_local * scaleIn,
-               ptIn[1] + normalIn[1] * ymin_local * scaleIn)
-    ptInMax = (ptIn[0] + normalIn[0] * ymax_local * scaleIn,
-               ptIn[1] + normalIn[1] * ymax_local * scaleIn)
-    ptOutMin = (ptOut[0] + normalOut[0] * ymin_local * scaleOut,
-                ptOut[1] + normalOut[1] * ymin_local * scaleOut)
-    ptOutMax = (ptOut[0] + normalOut[0] * ymax_local * scaleOut,
-                ptOut[1] + normalOut[1] * ymax_local * scaleOut)
-    return ptInMin, ptInMax, ptOutMin, ptOutMax
+    return corners[:, SEGMENT_EDGE_CORNERS].reshape(-1, 2, 2)
+
+def build_centerline_path(pts_in, pts_out):
+    """
+    把所有分段的中心线 (入口点 -> 出口点) 拼成一条折线的坐标, 分段之间以 NaN 断开,
+    这样一个 Line2D 即可画出全部中心线。返回 (3N,) 的 x, y 数组。
+    """
+    path = np.full((3 * len(pts_in), 2), np.nan)
+    path[0::3] = pts_in
+    path[1::3] = pts_out
+    return path[:, 0], path[:, 1]
+
+# --- 点击检测 ---
+def find_segment_at_point(quads, x, y):
+    """
+    向量化的射线法点在多边形内测试, 一次检测所有分段。
+    quads 为 (N, 4, 2) 的四边形顶点; 从点 (x, y) 向 +x 方向引射线, 与边相交奇数次即在内部
+    (与 Path.contains_point 一致, 对自相交的 "蝴蝶结" 四边形同样适用)。
+    返回包含该点的第一个分段索引, 没有则返回 -1。
+    """
+    x0, y0 = quads[..., 0], quads[..., 1]
+    x1, y1 = np.roll(x0, -1, axis=1), np.roll(y0, -1, axis=1)
+    straddles = (y0 > y) != (y1 > y)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x_cross = x0 + (y - y0) * (x1 - x0) / (y1 - y0)
+    crossings = np.count_nonzero(straddles & (x < x_cross), axis=1)
+    inside = crossings % 2 == 1
+    return int(np.argmax(inside)) if inside.any() else -1
 
 
 # --- GUI Application Class ---
 class VocalTractViewerApp:
+    # 分段四条边 (入口线, 出口线, 下边界, 上边界) 未选中时的颜色
+    ADJUSTED_EDGE_COLORS = ('gray', 'darkgray', 'green', 'blue')
+    ORIGINAL_EDGE_COLORS = ('lightgray', 'silver', 'lightgreen', 'lightblue')
+
     def __init__(self, master, font_prop=None):
         self.master = master
         self.font_prop = font_prop
@@ -304,9 +393,15 @@ class VocalTractViewerApp:
 
         self.all_sections_data = []
         self.num_segments = 0
+        self.build_section_arrays()
         self.selected_segment_index = -1
-        self.adjusted_segment_lines = []
-        self.original_segment_lines = [] # 新增
+        self.adjusted_segment_lines = None # 调整后矢状图的分段 LineCollection
+        self.original_segment_lines = None # 原始矢状图的分段 LineCollection
+        self._backgrounds = None # blit 用的矢状图背景缓存, 每次整幅重绘后更新
+        self._cross_section_background = None # blit 用的截面图区域 (含标题和刻度) 背景缓存
+        self._cross_section_bbox = None
+        self._segment_styles = {} # 每个矢状图 LineCollection 的 (颜色, 线宽) 数组
+        self._selected_lc_row = {} # 每个矢状图当前高亮分段在 LineCollection 中的起始行
         self.loaded_csv_basename = ""
 
         # --- Top Frame for Controls ---
@@ -341,30 +436,33 @@ class VocalTractViewerApp:
         self.status_label.pack(side=tk.LEFT, expand=True, fill=tk.X, padx=5)
 
         # --- Matplotlib Figure and Axes (改为 1x3) ---
-        self.fig, axes = plt.subplots(1, 3, figsize=(18, 6))
+        self.fig = Figure(figsize=(18, 6))
+        axes = self.fig.subplots(1, 3)
         self.ax_left, self.ax_mid, self.ax_right = axes
-        self.fig.suptitle("声道可视化", fontproperties=self.font_prop)
+        self.fig.suptitle("声道可视化")
 
         # --- Left Plot (Adjusted Sagittal) Setup ---
-        self.ax_left.set_title('调整后矢状面视图', fontproperties=self.font_prop)
-        self.ax_left.set_xlabel('全局 X', fontproperties=self.font_prop)
-        self.ax_left.set_ylabel('全局 Y', fontproperties=self.font_prop)
+        self.ax_left.set_title('调整后矢状面视图')
+        self.ax_left.set_xlabel('全局 X')
+        self.ax_left.set_ylabel('全局 Y')
         self.ax_left.set_aspect('equal', adjustable='datalim')
         self.ax_left.grid(True)
 
         # --- Middle Plot (Original Sagittal) Setup (新增) ---
-        self.ax_mid.set_title('原始矢状面视图', fontproperties=self.font_prop)
-        self.ax_mid.set_xlabel('全局 X', fontproperties=self.font_prop)
-        self.ax_mid.set_ylabel('全局 Y', fontproperties=self.font_prop)
+        self.ax_mid.set_title('原始矢状面视图')
+        self.ax_mid.set_xlabel('全局 X')
+        self.ax_mid.set_ylabel('全局 Y')
         self.ax_mid.set_aspect('equal', adjustable='datalim')
         self.ax_mid.grid(True)
 
         # --- Right Plot (Cross-section) Setup ---
-        self.ax_right.set_title('截面视图 (请选择分段)', fontproperties=self.font_prop)
-        self.ax_right.set_xlabel('局部 Y', fontproperties=self.font_prop)
-        self.ax_right.set_ylabel('局部 Z', fontproperties=self.font_prop)
+        self.ax_right.set_title('截面视图 (请选择分段)')
+        self.ax_right.set_xlabel('局部 Y')
+        self.ax_right.set_ylabel('局部 Z')
         self.ax_right.set_aspect('equal', adjustable='datalim')
         self.ax_right.grid(True)
+        # 截面图整体 animated: 切换分段时连同标题、刻度一起 blit, 由 on_draw 在整幅重绘后补画
+        self.ax_right.set_animated(True)
 
         # --- Embed Matplotlib in Tkinter ---
         self.canvas = FigureCanvasTkAgg(self.fig, master=master)
@@ -378,14 +476,14 @@ class VocalTractViewerApp:
 
         # --- Connect Click Event ---
         self.fig.canvas.mpl_connect('button_press_event', self.on_click)
+        self.fig.canvas.mpl_connect('draw_event', self.on_draw)
+        self.fig.canvas.mpl_connect('resize_event', self.on_resize)
 
     def on_closing(self):
         """处理窗口关闭事件"""
         # 可以选择在这里添加确认对话框
         # if messagebox.askokcancel("Quit", "Do you want to quit?"):
         print("Closing application...")
-        # 清理 matplotlib 图形，防止内存泄漏 (可选但推荐)
-        plt.close(self.fig)
         self.master.destroy()
 
     def load_csv(self):
@@ -401,12 +499,9 @@ class VocalTractViewerApp:
         self.all_sections_data = []
         try:
             with open(filepath, 'r') as f:
-                lines = f.readlines()
+                lines = f.read().splitlines()
             if len(lines) % 2 != 0: print("Warning: Odd number of lines in CSV.")
-            for i in range(0, len(lines), 2):
-                if i + 1 < len(lines):
-                    section = load_and_prepare_section_data(lines[i], lines[i+1])
-                    if section: self.all_sections_data.append(section)
+            self.all_sections_data = parse_section_lines(lines)
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load or process file:\n{e}")
             self.status_label.config(text="Error loading file.")
@@ -421,31 +516,26 @@ class VocalTractViewerApp:
             return
         self.num_segments = len(self.all_sections_data) - 1
         if self.num_segments < 0: self.num_segments = 0
-        for i in range(self.num_segments):
-            data_i = self.all_sections_data[i]; data_i_plus_1 = self.all_sections_data[i+1]
-            s_prime_i = data_i["ctrLinePtIn_adj"]; s_prime_i_plus_1 = data_i_plus_1["ctrLinePtIn_adj"]
-            n_hat_i = data_i["normalIn_adj"]; n_hat_i_plus_1 = data_i_plus_1["normalIn_adj"]
-            length = np.sqrt((s_prime_i_plus_1[0] - s_prime_i[0])**2 + (s_prime_i_plus_1[1] - s_prime_i[1])**2)
+        # 一次性批量计算所有分段的长度与曲率
+        points = np.array([d["ctrLinePtIn_adj"] for d in self.all_sections_data])
+        normals = np.array([d["normalIn_adj"] for d in self.all_sections_data])
+        lengths, radii, angles = calculate_curvature_batch(points, normals)
+        for data_i, length, radius, angle in zip(self.all_sections_data, lengths, radii, angles):
             data_i["length"] = length
-            radius, angle = calculate_curvature(s_prime_i, n_hat_i, s_prime_i_plus_1, n_hat_i_plus_1)
             data_i["curvatureRadius"] = radius; data_i["curvatureAngle"] = angle
-        for i in range(self.num_segments):
-            data_i = self.all_sections_data[i]
-            s_out_i, n_hat_out_i = calculate_outlet_geometry(
-                data_i["ctrLinePtIn_adj"], data_i["normalIn_adj"], data_i["length"],
-                data_i["curvatureRadius"], data_i["curvatureAngle"]
-            )
+        # 出口几何: 调整后中心与原始中心各批量计算一次
+        n = self.num_segments
+        original_centers = np.array([d["original_center"] for d in self.all_sections_data])
+        pts_out = np.empty((n, 2)); normals_out = np.empty((n, 2))
+        pts_out_orig = np.empty((n, 2)); normals_out_orig = np.empty((n, 2))
+        calculate_outlet_geometry_batch(points[:n], normals[:n], lengths, radii, angles, pts_out, normals_out)
+        calculate_outlet_geometry_batch(original_centers[:n], normals[:n], lengths, radii, angles, pts_out_orig, normals_out_orig)
+        for data_i, s_out_i, n_hat_out_i, s_out_i_orig in zip(self.all_sections_data, pts_out, normals_out, pts_out_orig):
             data_i["ctrLinePtOut"] = s_out_i; data_i["normalOut"] = n_hat_out_i
             data_i["normalOut_orig"] = n_hat_out_i
-            
-            # 添加原始出口点计算
-            original_center = data_i["original_center"]
-            s_out_i_orig, n_hat_out_i_orig = calculate_outlet_geometry(
-                original_center, data_i["normalIn_adj"], data_i["length"],
-                data_i["curvatureRadius"], data_i["curvatureAngle"]
-            )
             data_i["ctrLinePtOut_orig"] = s_out_i_orig
 
+        self.build_section_arrays()
         self.selected_segment_index = 0 if self.num_segments > 0 else -1
         self.update_plots() # 调用统一更新函数
         self.status_label.config(text=f"已加载 {len(self.all_sections_data)} 个截面 ({self.num_segments} 个分段).")
@@ -457,6 +547,44 @@ class VocalTractViewerApp:
             self.btn_prev["state"] = "disabled"
             self.btn_next["state"] = "disabled"
 
+    def build_section_arrays(self):
+        """
+        把逐截面的字典整理为按字段连续存放的 numpy 数组 (SoA),
+        每行对应一个分段, 供绘图和点击检测批量使用。
+        变长的轮廓数据仍保留在 all_sections_data 中。
+        """
+        segments = self.all_sections_data[:self.num_segments]
+        def stack_points(key):
+            return np.array([d[key] for d in segments], dtype=float).reshape(-1, 2)
+        def stack_scalars(key):
+            return np.array([d[key] for d in segments], dtype=float)
+        self.pts_in = stack_points("ctrLinePtIn_adj")
+        self.normals_in = stack_points("normalIn_adj")
+        self.pts_out = stack_points("ctrLinePtOut")
+        self.normals_out = stack_points("normalOut")
+        self.scale_in = stack_scalars("scaleIn")
+        self.scale_out = stack_scalars("scaleOut")
+        self.ymin = stack_scalars("zMinAdj_local")
+        self.ymax = stack_scalars("zMaxAdj_local")
+        self.pts_in_orig = stack_points("original_center")
+        self.pts_out_orig = stack_points("ctrLinePtOut_orig")
+        self.normals_out_orig = stack_points("normalOut_orig")
+        self.ymin_orig = stack_scalars("zMinLocal_orig")
+        self.ymax_orig = stack_scalars("zMaxLocal_orig")
+        # 角点数组 (N, 4, 2) 加载时算一次, 同时供分段 LineCollection 和点击检测使用
+        self._corners_adjusted = self.get_adjusted_segment_points()
+        self._corners_original = self.get_original_segment_points()
+
+    def get_adjusted_segment_points(self):
+        """调整后几何下所有分段的四个角点"""
+        return get_segment_points(self.pts_in, self.normals_in, self.scale_in, self.ymin, self.ymax,
+                                  self.pts_out, self.normals_out, self.scale_out)
+
+    def get_original_segment_points(self):
+        """原始几何下所有分段的四个角点 (法线使用归一化后的法线)"""
+        return get_segment_points(self.pts_in_orig, self.normals_in, self.scale_in, self.ymin_orig, self.ymax_orig,
+                                  self.pts_out_orig, self.normals_out_orig, self.scale_out)
+
     def save_plot(self):
         """保存当前图形到文件"""
         if not self.all_sections_data:
@@ -479,174 +607,247 @@ class VocalTractViewerApp:
             ]
         )
         if output_filepath:
+            # 分段线条和截面图是 animated 的, 常规重绘会跳过它们; 保存期间临时取消 animated
+            overlays = [collection for _, collection, _, _ in self.segment_overlays() if collection is not None]
+            overlays.append(self.ax_right)
             try:
-                self.fig.savefig(output_filepath, dpi=300, bbox_inches='tight')
+                for collection in overlays:
+                    collection.set_animated(False)
+                # 用独立的 Agg 画布渲染文件, 不经过屏幕上的 Tk 画布
+                FigureCanvasAgg(self.fig).print_figure(output_filepath, dpi=300, bbox_inches='tight')
                 self.status_label.config(text=f"Plot saved to: {os.path.basename(output_filepath)}")
                 print(f"Plot saved successfully to {output_filepath}")
             except Exception as e:
                 messagebox.showerror("Save Error", f"Failed to save plot:\n{e}")
                 self.status_label.config(text="Error saving plot.")
-
-    def draw_segment_sagittal_gui(self, ax, section_data_i, segment_index, is_selected):
-        ptInMin, ptInMax, ptOutMin, ptOutMax = get_segment_points(section_data_i)
-        color_in = 'red' if is_selected else 'gray'
-        color_out = 'red' if is_selected else 'darkgray'
-        color_upper = 'red' if is_selected else 'blue'
-        color_lower = 'red' if is_selected else 'green'
-        linewidth = 2.0 if is_selected else 1.0
-        zorder = 15 if is_selected else 5
-        lines = []
-        lines.extend(ax.plot([ptInMin[0], ptInMax[0]], [ptInMin[1], ptInMax[1]], color=color_in, linestyle='-', linewidth=linewidth, zorder=zorder))
-        lines.extend(ax.plot([ptOutMin[0], ptOutMax[0]], [ptOutMin[1], ptOutMax[1]], color=color_out, linestyle='-', linewidth=linewidth, zorder=zorder))
-        lines.extend(ax.plot([ptInMin[0], ptOutMin[0]], [ptInMin[1], ptOutMin[1]], color=color_lower, linestyle='-', linewidth=linewidth, zorder=zorder))
-        lines.extend(ax.plot([ptInMax[0], ptOutMax[0]], [ptInMax[1], ptOutMax[1]], color=color_upper, linestyle='-', linewidth=linewidth, zorder=zorder))
-        return lines
-        
-    def draw_segment_sagittal_original_gui(self, ax, section_data_i, segment_index, is_selected):
-        """绘制原始矢状图的单个分段 (高亮可选)"""
-        ptInMin, ptInMax, ptOutMin, ptOutMax = get_segment_points_original(section_data_i)
-        # 使用不同颜色/线型区分
-        color_in = 'magenta' if is_selected else 'lightgray'
-        color_out = 'magenta' if is_selected else 'silver'
-        color_upper = 'magenta' if is_selected else 'lightblue'
-        color_lower = 'magenta' if is_selected else 'lightgreen'
-        linestyle = '-' # 使用实线
-        linewidth = 2.0 if is_selected else 1.0
-        zorder = 15 if is_selected else 5
-        lines = []
-        lines.extend(ax.plot([ptInMin[0], ptInMax[0]], [ptInMin[1], ptInMax[1]], color=color_in, linestyle=linestyle, linewidth=linewidth, zorder=zorder))
-        lines.extend(ax.plot([ptOutMin[0], ptOutMax[0]], [ptOutMin[1], ptOutMax[1]], color=color_out, linestyle=linestyle, linewidth=linewidth, zorder=zorder))
-        lines.extend(ax.plot([ptInMin[0], ptOutMin[0]], [ptInMin[1], ptOutMin[1]], color=color_lower, linestyle=linestyle, linewidth=linewidth, zorder=zorder))
-        lines.extend(ax.plot([ptInMax[0], ptOutMax[0]], [ptInMax[1], ptOutMax[1]], color=color_upper, linestyle=linestyle, linewidth=linewidth, zorder=zorder))
-        return lines
+            finally:
+                for collection in overlays:
+                    collection.set_animated(True)
+                self.fig.set_canvas(self.canvas) # FigureCanvasAgg 会接管 figure, 保存后交还给 Tk 画布
+
+    def draw_segments_sagittal_gui(self, ax, corners, edge_colors, selected_color):
+        """
+        用单个 LineCollection 绘制所有分段的四条边 (入口线, 出口线, 下边界, 上边界),
+        选中分段改用高亮颜色和加粗线宽。
+        该 LineCollection 设为 animated, 不参与常规重绘, 由 on_draw 补画, 以便选中变化时 blit。
+        """
+        colors = np.tile(to_rgba_array(edge_colors), (self.num_segments, 1))
+        linewidths = np.ones(4 * self.num_segments)
+        collection = LineCollection(build_segment_edges(corners), colors=colors,
+                                    linewidths=linewidths, linestyles='-', zorder=5,
+                                    animated=True)
+        # 颜色/线宽数组常驻, 切换选中时只改写其中 4 行
+        self._segment_styles[ax] = (colors, linewidths)
+        self._selected_lc_row[ax] = None
+        self.highlight_segment(ax, collection, edge_colors, selected_color, self.selected_segment_index)
+        ax.add_collection(collection)
+        ax.autoscale_view()
+        return collection
+
+    def highlight_segment(self, ax, collection, edge_colors, selected_color, index):
+        """
+        把该轴 LineCollection 中上次高亮的 4 行恢复默认颜色和线宽, 再高亮 index 分段的 4 行。
+        index 无效时只做恢复。
+        """
+        if collection is None:
+            return
+        colors, linewidths = self._segment_styles[ax]
+        previous_row = self._selected_lc_row[ax]
+        if previous_row is not None:
+            colors[previous_row:previous_row + 4] = to_rgba_array(edge_colors)
+            linewidths[previous_row:previous_row + 4] = 1.0
+            self._selected_lc_row[ax] = None
+        if 0 <= index < self.num_segments:
+            row = 4 * index
+            colors[row:row + 4] = to_rgba(selected_color)
+            linewidths[row:row + 4] = 2.0
+            self._selected_lc_row[ax] = row
+        collection.set_colors(colors)
+        collection.set_linewidths(linewidths)
+
+    def segment_overlays(self):
+        """返回 (axes, 分段 LineCollection, 默认颜色, 高亮颜色) 列表"""
+        return [
+            (self.ax_left, self.adjusted_segment_lines, self.ADJUSTED_EDGE_COLORS, 'red'),
+            (self.ax_mid, self.original_segment_lines, self.ORIGINAL_EDGE_COLORS, 'magenta'),
+        ]
+
+    def on_draw(self, event):
+        """整幅重绘后缓存两个矢状图和截面图区域的背景, 并补画 animated 的截面图和分段线条"""
+        # 保存文件时 figure 由 save_plot 的独立画布绘制, 该次 draw_event 与屏幕画布无关
+        if event.canvas is not self.canvas:
+            return
+        self._backgrounds = {ax: self.canvas.copy_from_bbox(ax.bbox) for ax in (self.ax_left, self.ax_mid)}
+        # 截面图区域: 中间图 (含图例、刻度) 右侧到画布右边缘, 标题和刻度文字随截面变化也在其内
+        left = self.ax_mid.get_tightbbox(event.renderer).x1
+        self._cross_section_bbox = Bbox.from_extents(left, self.fig.bbox.y0, self.fig.bbox.x1, self.fig.bbox.y1)
+        self._cross_section_background = self.canvas.copy_from_bbox(self._cross_section_bbox)
+        self.fig.draw_artist(self.ax_right)
+        for ax, collection, _, _ in self.segment_overlays():
+            if collection is not None:
+                ax.draw_artist(collection)
+
+    def blit_segment_overlays(self):
+        """恢复缓存背景, 只重画分段线条并 blit 两个矢状图区域"""
+        if self._backgrounds is None:
+            return
+        for ax, collection, _, _ in self.segment_overlays():
+            self.canvas.restore_region(self._backgrounds[ax])
+            if collection is not None:
+                ax.draw_artist(collection)
+            self.canvas.blit(ax.bbox)
+
+    def blit_cross_section(self):
+        """恢复截面图区域的缓存背景, 只重画截面图并 blit 该区域"""
+        if self._cross_section_background is None:
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self._cross_section_background)
+        self.fig.draw_artist(self.ax_right)
+        self.canvas.blit(self._cross_section_bbox)
+
+    def select_segment(self, index):
+        """
+        切换选中分段: 矢状图只改动新旧两个分段的颜色/线宽, 截面图只替换数据,
+        两者都通过 blit 刷新, 不触发整幅图的重绘。
+        """
+        self.selected_segment_index = index
+        for ax, collection, edge_colors, selected_color in self.segment_overlays():
+            self.highlight_segment(ax, collection, edge_colors, selected_color, index)
+        self.blit_segment_overlays()
+        self.update_cross_section_plot()
+        self.blit_cross_section()
+        self.status_label.config(text=f"选中分段: {self.selected_segment_index}")
 
     def update_adjusted_sagittal_plot(self):
         """更新左侧调整后矢状图"""
         self.ax_left.clear()
-        self.adjusted_segment_lines = []
+        self.adjusted_segment_lines = None
 
         if not self.all_sections_data:
-            self.ax_left.set_title('调整后矢状面视图 (无数据)', fontproperties=self.font_prop)
+            self.ax_left.set_title('调整后矢状面视图 (无数据)')
             return
 
-        for i in range(self.num_segments):
-            data_i = self.all_sections_data[i]
-            is_selected = (i == self.selected_segment_index)
-            lines = self.draw_segment_sagittal_gui(self.ax_left, data_i, i, is_selected)
-            self.adjusted_segment_lines.append(lines)
-            s_prime_i = data_i["ctrLinePtIn_adj"]
-            s_out_i = data_i["ctrLinePtOut"]
-            self.ax_left.plot([s_prime_i[0], s_out_i[0]], [s_prime_i[1], s_out_i[1]],
-                              color='red', linestyle='--', marker='.', markersize=3,
-                              linewidth=1, zorder=10,
-                              label='_nolegend_' if i > 0 else '计算中心线')
-
-        self.ax_left.set_title('调整后矢状面视图', fontproperties=self.font_prop)
-        self.ax_left.set_xlabel('全局 X', fontproperties=self.font_prop)
-        self.ax_left.set_ylabel('全局 Y', fontproperties=self.font_prop)
+        self.adjusted_segment_lines = self.draw_segments_sagittal_gui(
+            self.ax_left, self._corners_adjusted, self.ADJUSTED_EDGE_COLORS, 'red')
+        centerline, = self.ax_left.plot(*build_centerline_path(self.pts_in, self.pts_out),
+                                        color='red', linestyle='--', marker='.', markersize=3,
+                                        linewidth=1, zorder=10, label='计算中心线')
+
+        self.ax_left.set_title('调整后矢状面视图')
+        self.ax_left.set_xlabel('全局 X')
+        self.ax_left.set_ylabel('全局 Y')
         self.ax_left.set_aspect('equal', adjustable='datalim')
         self.ax_left.grid(True)
-        handles, labels = self.ax_left.get_legend_handles_labels()
+        # 图例只在加载时构建一次, 切换分段不改变图例内容
+        legend_handles = []
         if self.num_segments > 0:
             # 用 Line2D 创建图例条目，避免重复绘制
-            handles.append(plt.Line2D([0], [0], color='gray', lw=1, label='分段边界 (未选)'))
-            handles.append(plt.Line2D([0], [0], color='red', lw=2, label='分段边界 (选中)'))
-        # 去重图例句柄和标签
-        by_label = dict(zip(labels, handles))
-        self.ax_left.legend(by_label.values(), by_label.keys(), fontsize='small', prop=self.font_prop)
+            legend_handles.append(centerline)
+            legend_handles.append(Line2D([0], [0], color='gray', lw=1, label='分段边界 (未选)'))
+            legend_handles.append(Line2D([0], [0], color='red', lw=2, label='分段边界 (选中)'))
+        self.ax_left.legend(handles=legend_handles, fontsize='small')
 
     def update_original_sagittal_plot(self):
         """更新中间原始矢状图"""
         self.ax_mid.clear()
-        self.original_segment_lines = []
+        self.original_segment_lines = None
 
         if not self.all_sections_data:
-            self.ax_mid.set_title('原始矢状面视图 (无数据)', fontproperties=self.font_prop)
+            self.ax_mid.set_title('原始矢状面视图 (无数据)')
             return
 
-        for i in range(self.num_segments):
-            data_i = self.all_sections_data[i]
-            is_selected = (i == self.selected_segment_index)
-            lines = self.draw_segment_sagittal_original_gui(self.ax_mid, data_i, i, is_selected)
-            self.original_segment_lines.append(lines)
-            s_prime_i = data_i["original_center"]
-            s_out_i = data_i["ctrLinePtOut_orig"]
-            self.ax_mid.plot([s_prime_i[0], s_out_i[0]], [s_prime_i[1], s_out_i[1]],
-                             color='orange', linestyle=':', marker='x', markersize=3,
-                             linewidth=1, zorder=10,
-                             label='_nolegend_' if i > 0 else '原始中心线')
-
-        self.ax_mid.set_title('原始矢状面视图', fontproperties=self.font_prop)
-        self.ax_mid.set_xlabel('全局 X', fontproperties=self.font_prop)
-        self.ax_mid.set_ylabel('全局 Y', fontproperties=self.font_prop)
+        # 使用不同颜色区分原始几何
+        self.original_segment_lines = self.draw_segments_sagittal_gui(
+            self.ax_mid, self._corners_original, self.ORIGINAL_EDGE_COLORS, 'magenta')
+        centerline, = self.ax_mid.plot(*build_centerline_path(self.pts_in_orig, self.pts_out_orig),
+                                       color='orange', linestyle=':', marker='x', markersize=3,
+                                       linewidth=1, zorder=10, label='原始中心线')
+
+        self.ax_mid.set_title('原始矢状面视图')
+        self.ax_mid.set_xlabel('全局 X')
+        self.ax_mid.set_ylabel('全局 Y')
         self.ax_mid.set_aspect('equal', adjustable='datalim')
         self.ax_mid.grid(True)
-        handles, labels = self.ax_mid.get_legend_handles_labels()
+        legend_handles = []
         if self.num_segments > 0:
-            handles.append(plt.Line2D([0], [0], color='lightgray', lw=1, label='原始边界 (未选)'))
-            handles.append(plt.Line2D([0], [0], color='magenta', lw=2, label='原始边界 (选中)'))
-        by_label = dict(zip(labels, handles))
-        self.ax_mid.legend(by_label.values(), by_label.keys(), fontsize='small', prop=self.font_prop)
+            legend_handles.append(centerline)
+            legend_handles.append(Line2D([0], [0], color='lightgray', lw=1, label='原始边界 (未选)'))
+            legend_handles.append(Line2D([0], [0], color='magenta', lw=2, label='原始边界 (选中)'))
+        self.ax_mid.legend(handles=legend_handles, fontsize='small')
+
+    def setup_cross_section_plot(self):
+        """
+        加载数据后创建截面图的固定艺术家对象 (轮廓线、参考线) 和图例, 只执行一次;
+        切换分段时由 update_cross_section_plot 仅替换数据。
+        """
+        self.ax_right.clear()
+        self.cross_orig_line, = self.ax_right.plot([], [], marker='.', markersize=3, linestyle='--', color='lightcoral', label='原始轮廓')
+        self.cross_adj_line, = self.ax_right.plot([], [], marker='o', markersize=4, linestyle='-', color='darkblue', label='居中轮廓')
+        origin_line = self.ax_right.axhline(y=0, color='black', linestyle='--', zorder=5, label='局部原点/居中Z')
+        self.cross_zc_line = self.ax_right.axhline(y=0, color='purple', linestyle='--', zorder=6, label='原始Z中心')
+        self.ax_right.set_xlabel('局部 Y')
+        self.ax_right.set_ylabel('局部 Z')
+        self.ax_right.set_aspect('equal', adjustable='datalim')
+        self.ax_right.grid(True)
+        self.cross_legend = self.ax_right.legend(
+            handles=[self.cross_orig_line, self.cross_adj_line, origin_line, self.cross_zc_line],
+            fontsize='small')
+        # 原始 Z 中心的图例文字随截面变化, 单独保留以便就地修改
+        self.cross_zc_legend_text = self.cross_legend.get_texts()[3]
+        self.update_cross_section_plot()
 
     def update_cross_section_plot(self):
-        self.ax_right.clear()
+        """把当前截面的数据填入 setup_cross_section_plot 创建的艺术家对象"""
         # 更新: 即使没有选中，也显示截面0作为默认值
         plot_index = self.selected_segment_index
         if plot_index < 0 and len(self.all_sections_data) > 0:
             plot_index = 0 # 默认显示第一个截面
         elif plot_index < 0:
-            self.ax_right.set_title('截面视图 (无数据)', fontproperties=self.font_prop)
+            self.ax_right.set_title('截面视图 (无数据)')
             return
 
         if plot_index >= len(self.all_sections_data):
-             self.ax_right.set_title(f'截面视图 (索引 {plot_index} 无效)', fontproperties=self.font_prop)
+             self.ax_right.set_title(f'截面视图 (索引 {plot_index} 无效)')
              return
 
         section_data = self.all_sections_data[plot_index]
         title_suffix = f" (选中分段: {self.selected_segment_index})" if self.selected_segment_index == plot_index else " (默认)"
-        current_title = f'截面 {plot_index}{title_suffix}'
-
-        if section_data.get("original_contourY_plot"):
-             self.ax_right.plot(section_data["original_contourY_plot"], section_data["original_contourZ_plot"], marker='.', markersize=3, linestyle='--', color='lightcoral', label='原始轮廓')
-        if section_data.get("contourY_plot_adj"):
-             self.ax_right.plot(section_data["contourY_plot_adj"], section_data["contourZ_plot_adj"], marker='o', markersize=4, linestyle='-', color='darkblue', label='居中轮廓')
-        self.ax_right.axhline(y=0, color='black', linestyle='--', zorder=5, label='局部原点/居中Z')
-        z_c = section_data.get("z_c_local")
-        if z_c is not None:
-             self.ax_right.axhline(y=z_c, color='purple', linestyle='--', zorder=6, label=f'原始Z中心 ({z_c:.2f})')
-
-        self.ax_right.set_title(current_title, fontproperties=self.font_prop)
-        self.ax_right.set_xlabel('局部 Y', fontproperties=self.font_prop)
-        self.ax_right.set_ylabel('局部 Z', fontproperties=self.font_prop)
-        self.ax_right.set_aspect('equal', adjustable='datalim')
-        self.ax_right.grid(True)
-        # 更新: 图例去重
-        handles, labels = self.ax_right.get_legend_handles_labels()
-        by_label = dict(zip(labels, handles))
-        self.ax_right.legend(by_label.values(), by_label.keys(), fontsize='small', prop=self.font_prop)
-
-        # 坐标轴范围调整
-        all_x, all_y = [0], [0]
-        if section_data.get("original_contourY_plot"): all_x.extend(section_data["original_contourY_plot"])
-        if section_data.get("original_contourZ_plot"): all_y.extend(section_data["original_contourZ_plot"])
-        if section_data.get("contourY_plot_adj"): all_x.extend(section_data["contourY_plot_adj"])
-        if section_data.get("contourZ_plot_adj"): all_y.extend(section_data["contourZ_plot_adj"])
-        if z_c is not None: all_y.append(z_c)
-        if len(all_x) > 1:
-            min_x, max_x = min(all_x), max(all_x); range_x = max_x - min_x or 1.0
-            pad_x = 0.1 * range_x + 0.5; self.ax_right.set_xlim(min_x - pad_x, max_x + pad_x)
-        if len(all_y) > 1:
-            min_y, max_y = min(all_y), max(all_y); range_y = max_y - min_y or 1.0
-            pad_y = 0.1 * range_y + 0.5; self.ax_right.set_ylim(min_y - pad_y, max_y + pad_y)
+        self.ax_right.set_title(f'截面 {plot_index}{title_suffix}')
+
+        self.cross_orig_line.set_data(*section_data["contour_closed_orig"])
+        self.cross_adj_line.set_data(*section_data["contour_closed_adj"])
+        z_c = section_data["z_c_local"]
+        self.cross_zc_line.set_ydata([z_c, z_c])
+        self.cross_zc_legend_text.set_text(f'原始Z中心 ({z_c:.2f})')
+
+        # 坐标轴范围调整 (加载时已预先计算); dataLim 仍需更新, set_aspect 的 datalim 模式依赖它
+        self.ax_right.relim()
+        if section_data["cross_section_xlim"] is not None:
+            self.ax_right.set_xlim(*section_data["cross_section_xlim"])
+        else:
+            self.ax_right.autoscale(enable=True, axis='x')
+        self.ax_right.set_ylim(*section_data["cross_section_ylim"])
 
     # 新增: 统一的绘图更新函数
     def update_plots(self):
-        """更新所有三个绘图区域"""
+        """
+        更新所有三个绘图区域。只在加载文件时调用, 切换分段走 select_segment,
+        因此 tight_layout 也只在这里和窗口尺寸变化时执行。
+        """
         self.update_adjusted_sagittal_plot()
         self.update_original_sagittal_plot()
-        self.update_cross_section_plot()
+        self.setup_cross_section_plot()
+        self.apply_layout()
+        self.canvas.draw_idle()
+
+    def apply_layout(self):
+        """tight_layout 需要先测量文字尺寸, 代价较高, 仅在布局可能变化时调用"""
         self.fig.tight_layout(rect=[0, 0.03, 1, 0.95]) # 调整布局防止重叠
-        self.canvas.draw()
+
+    def on_resize(self, event):
+        """窗口尺寸变化后重新计算布局 (随后的重绘由后端负责)"""
+        self.apply_layout()
 
     def on_click(self, event):
         # 修改: 检查点击是否在左侧或中间的轴内
@@ -654,30 +855,13 @@ class VocalTractViewerApp:
             return
         click_x, click_y = event.xdata, event.ydata
         if click_x is None or click_y is None: return # 避免无效点击
-        clicked_segment = -1
-
-        # 根据点击的轴选择使用哪个几何数据进行碰撞检测
-        if event.inaxes == self.ax_left:
-            for i in range(self.num_segments):
-                data_i = self.all_sections_data[i]
-                pts = get_segment_points(data_i)
-                poly_path = Path([pts[0], pts[1], pts[3], pts[2], pts[0]])
-                if poly_path.contains_point((click_x, click_y)):
-                    clicked_segment = i
-                    break
-        elif event.inaxes == self.ax_mid:
-            for i in range(self.num_segments):
-                data_i = self.all_sections_data[i]
-                pts = get_segment_points_original(data_i)
-                poly_path = Path([pts[0], pts[1], pts[3], pts[2], pts[0]])
-                if poly_path.contains_point((click_x, click_y)):
-                    clicked_segment = i
-                    break
+
+        # 根据点击的轴选择使用哪个几何数据进行碰撞检测 (一次性测试所有分段)
+        quads = self._corners_adjusted if event.inaxes == self.ax_left else self._corners_original
+        clicked_segment = find_segment_at_point(quads, click_x, click_y)
 
         if clicked_segment != -1 and clicked_segment != self.selected_segment_index:
-            self.selected_segment_index = clicked_segment
-            self.update_plots() # 调用统一更新
-            self.status_label.config(text=f"选中分段: {self.selected_segment_index}")
+            self.select_segment(clicked_segment)
         elif clicked_segment != -1:
              # 如果重复点击已选中的段，可以不做任何事或给出提示
              # self.status_label.config(text=f"分段 {self.selected_segment_index} 已选中")
@@ -688,21 +872,19 @@ class VocalTractViewerApp:
         """选择上一个分段"""
         if not self.all_sections_data or self.num_segments <= 0:
             return
-        self.selected_segment_index -= 1
-        if self.selected_segment_index < 0:
-            self.selected_segment_index = self.num_segments - 1 # 循环
-        self.update_plots()
-        self.status_label.config(text=f"选中分段: {self.selected_segment_index}")
+        index = self.selected_segment_index - 1
+        if index < 0:
+            index = self.num_segments - 1 # 循环
+        self.select_segment(index)
 
     def select_next_segment(self):
         """选择下一个分段"""
         if not self.all_sections_data or self.num_segments <= 0:
             return
-        self.selected_segment_index += 1
-        if self.selected_segment_index >= self.num_segments:
-            self.selected_segment_index = 0 # 循环
-        self.update_plots()
-        self.status_label.config(text=f"选中分段: {self.selected_segment_index}")
+        index = self.selected_segment_index + 1
+        if index >= self.num_segments:
+            index = 0 # 循环
+        self.select_segment(index)
 
 # --- Main Execution ---
 if __name__ == "__main__":
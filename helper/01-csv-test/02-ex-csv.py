@@ -1,9 +1,18 @@
+import matplotlib
+matplotlib.use('Agg') # 仅输出 PNG 文件, 使用非交互后端以免加载 GUI 工具包
 import matplotlib.pyplot as plt
 import numpy as np
 import sys
 import os
 import math
 from matplotlib import font_manager
+from matplotlib.collections import LineCollection
+
+# numba 为可选依赖: 可用时对出口几何批量计算做 JIT 编译, 否则退回纯 numpy 实现
+try:
+    from numba import njit
+except ImportError:
+    njit = None
 
 # --- 字体设置 ---
 # 获取脚本所在目录
@@ -18,6 +27,11 @@ font_path = os.path.join(script_dir, 'SimHei.ttf')
 zh_font_prop = None
 if os.path.exists(font_path):
     zh_font_prop = font_manager.FontProperties(fname=font_path)
+    # 注册为全局默认字体, 之后的标题/标签/图例无需逐个传入 fontproperties
+    font_manager.fontManager.addfont(font_path)
+    plt.rcParams['font.family'] = 'sans-serif'
+    plt.rcParams['font.sans-serif'] = [zh_font_prop.get_name()] + plt.rcParams['font.sans-serif']
+    plt.rcParams['axes.unicode_minus'] = False # 中文字体通常缺少 Unicode 负号字形
 else:
     print(f"警告：未在目录 '{script_dir}' 下找到字体文件 'SimHei.ttf'，中文可能无法正确显示。")
 
@@ -28,129 +42,143 @@ MINIMAL_DISTANCE = 1e-6 # 用于比较浮点数或角度是否接近零
 
 def normalize_vector(vx, vy):
     """归一化向量"""
-    norm = np.sqrt(vx**2 + vy**2)
+    norm = math.hypot(vx, vy)
     if norm > MINIMAL_DISTANCE:
         return vx / norm, vy / norm
     else:
         return 1.0, 0.0 # 返回默认值，例如 (1, 0)
 
-def normalize_angle(angle):
-    """将角度标准化到 (-pi, pi] 区间"""
-    while angle <= -np.pi:
-        angle += 2 * np.pi
-    while angle > np.pi:
-        angle -= 2 * np.pi
-    return angle
+def normalize_vectors(vectors):
+    """normalize_vector 的批量版本: 对 (N, 2) 数组逐行归一化, 模长过小的行置为 (1, 0)"""
+    vectors = np.array(vectors, dtype=float)
+    norms = np.hypot(vectors[:, 0], vectors[:, 1])
+    valid = norms > MINIMAL_DISTANCE
+    vectors[valid] /= norms[valid, None]
+    vectors[~valid] = (1.0, 0.0)
+    return vectors
 
-def calculate_curvature(p1, n1, p2, n2):
+def calculate_curvature_batch(points, normals):
     """
-    模拟 getCurvatureAngleShift 计算曲率半径和角度。
+    模拟 getCurvatureAngleShift, 一次性计算所有相邻截面对的曲率半径和角度。
     输入:
-        p1 (tuple): 截面1中心点 (x1, y1)
-        n1 (tuple): 截面1单位法线 (nx1, ny1)
-        p2 (tuple): 截面2中心点 (x2, y2)
-        n2 (tuple): 截面2单位法线 (nx2, ny2)
+        points (ndarray): (N, 2) 截面中心点
+        normals (ndarray): (N, 2) 截面单位法线
     输出:
-        radius (float): 曲率半径 R (可能为负，表示方向)
-        angle (float): 法线夹角 alpha (弧度, 标准化到 (-pi, pi])
+        lengths (ndarray): (N-1,) 相邻中心点距离
+        radii (ndarray): (N-1,) 曲率半径 R (近似平行时为 inf)
+        angles (ndarray): (N-1,) 法线夹角 alpha (弧度, 标准化到 (-pi, pi])
     """
-    x1, y1 = p1
-    nx1, ny1 = n1
-    x2, y2 = p2
-    nx2, ny2 = n2
-    cross_p_n2 = (x2 - x1) * ny2 - (y2 - y1) * nx2
-    cross_n2_n1 = nx2 * ny1 - ny2 * nx1
-    radius = 0.0
-    if abs(cross_n2_n1) > MINIMAL_DISTANCE:
-        radius = -cross_p_n2 / cross_n2_n1
-    else:
-        radius = float('inf')
-    angle1 = math.atan2(ny1, nx1)
-    angle2 = math.atan2(ny2, nx2)
-    angle_diff = angle2 - angle1
-    angle = normalize_angle(angle_diff)
-    return radius, angle
-
-def rotate_vector(vector, angle_rad):
-    """将二维向量旋转指定角度 (弧度)"""
-    vx, vy = vector
-    cos_a = math.cos(angle_rad)
-    sin_a = math.sin(angle_rad)
-    vx_new = cos_a * vx - sin_a * vy
-    vy_new = sin_a * vx + cos_a * vy
-    return vx_new, vy_new
-
-def calculate_outlet_geometry(s_prime_i, n_hat_i, L_i, R_i, alpha_i):
+    d_p = points[1:] - points[:-1]
+    n1 = normals[:-1]
+    n2 = normals[1:]
+    lengths = np.hypot(d_p[:, 0], d_p[:, 1])
+    cross_p_n2 = d_p[:, 0] * n2[:, 1] - d_p[:, 1] * n2[:, 0]
+    cross_n2_n1 = n2[:, 0] * n1[:, 1] - n2[:, 1] * n1[:, 0]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        radii = np.where(np.abs(cross_n2_n1) > MINIMAL_DISTANCE, -cross_p_n2 / cross_n2_n1, np.inf)
+    # 每条法线的方位角只算一次 (N 次 atan2), 相邻差值即为夹角
+    normal_angles = np.arctan2(normals[:, 1], normals[:, 0])
+    angle_diff = np.diff(normal_angles)
+    # 与 math.remainder 相同的就近取整归约, 再把 -pi 映射到 pi
+    angles = angle_diff - math.tau * np.round(angle_diff / math.tau)
+    angles[angles <= -math.pi] += math.tau
+    return lengths, radii, angles
+
+def _outlet_geometry_kernel(pts_in, normals_in, lengths, radii, angles, pts_out, normals_out):
     """
-    模拟 Acoustic3dSimulation::ctrLinePtOut 和出口法线的计算。
-    严格遵循 C++ 的条件判断逻辑来计算曲线出口点。
+    模拟 Acoustic3dSimulation::ctrLinePtOut 和出口法线的计算 (逐分段循环, 供 Numba 编译)。
+    输入均为按分段排列的数组, 结果写入预分配的 pts_out / normals_out (N, 2)。
     """
-    pt_in_x, pt_in_y = s_prime_i
-    norm_in_x, norm_in_y = n_hat_i
-    n_vec = (norm_in_x, norm_in_y) # 入口法线向量 N
-
-    # --- 1. 计算出口法线 --- (不变)
-    cos_a = math.cos(alpha_i)
-    sin_a = math.sin(alpha_i)
-    norm_out_x = cos_a * norm_in_x - sin_a * norm_in_y
-    norm_out_y = sin_a * norm_in_x + cos_a * norm_in_y
-    n_hat_out_i = normalize_vector(norm_out_x, norm_out_y)
-
-    # --- 2. 计算出口中心点 ---
-    s_out_i = s_prime_i # 默认等于入口点
-
-    if L_i > MINIMAL_DISTANCE:
-        if abs(alpha_i) < MINIMAL_DISTANCE or not math.isfinite(R_i):
-            # --- 直线情况 ---
-            # 公式: s_out = s' + L * R(-pi/2) * n
-            # R(-pi/2)*n 计算单位切线向量 t
-            # 将法线 n = (nx, ny) 顺时针旋转 90 度得到切线 t = (ny, -nx)
-            tangent_x = norm_in_y
-            tangent_y = -norm_in_x
-            # 出口点 = 入口点 + 长度 * 单位切线方向
-            s_out_x = pt_in_x + L_i * tangent_x
-            s_out_y = pt_in_y + L_i * tangent_y
-            s_out_i = (s_out_x, s_out_y)
+    for i in range(pts_in.shape[0]):
+        norm_in_x = normals_in[i, 0]
+        norm_in_y = normals_in[i, 1]
+        L_i = lengths[i]
+        R_i = radii[i]
+        alpha_i = angles[i]
+
+        # --- 1. 出口法线 ---
+        cos_a = math.cos(alpha_i)
+        sin_a = math.sin(alpha_i)
+        norm_out_x = cos_a * norm_in_x - sin_a * norm_in_y
+        norm_out_y = sin_a * norm_in_x + cos_a * norm_in_y
+        norm = math.sqrt(norm_out_x * norm_out_x + norm_out_y * norm_out_y)
+        if norm > MINIMAL_DISTANCE:
+            normals_out[i, 0] = norm_out_x / norm
+            normals_out[i, 1] = norm_out_y / norm
         else:
-            # --- 曲线情况 (复现 C++ 条件逻辑) ---
-            theta = abs(alpha_i) / 2.0
-            sin_theta = math.sin(theta)
-
-            # C++ 条件: R 和 R*alpha 符号是否相反 (等价于 R 和 alpha 符号是否不同)
-            # 这个条件决定了使用 C++ 代码中的哪一套旋转和平移组合
-            signs_differ = (np.sign(R_i) * np.sign(alpha_i) < 0) if R_i != 0 and alpha_i != 0 else False
-
-            translation_vec = (0.0, 0.0)
-
-            if signs_differ:
-                # 分支1: R 和 alpha 符号不同
-                # 模拟 C++ 的第一种变换组合:
-                #   - 旋转角度 ~ pi/2 - theta
-                #   - 基础平移方向向量: -N (入口法线的反方向)
-                #   - 平移距离标量: -2 * |R| * sin(theta)
-                angle_rot1 = math.pi/2.0 - theta
-                base_vec1 = (-norm_in_x, -norm_in_y) # 基础向量 -N
-                rotated_vec1 = rotate_vector(base_vec1, angle_rot1) # 计算平移方向
-                dist_scalar1 = -2.0 * abs(R_i) * sin_theta # 计算平移距离
-                translation_vec = (dist_scalar1 * rotated_vec1[0], dist_scalar1 * rotated_vec1[1]) # 计算最终平移向量
+            normals_out[i, 0] = 1.0
+            normals_out[i, 1] = 0.0
+
+        # --- 2. 出口中心点 ---
+        s_out_x = pts_in[i, 0]
+        s_out_y = pts_in[i, 1]
+        if L_i > MINIMAL_DISTANCE:
+            if abs(alpha_i) < MINIMAL_DISTANCE or not math.isfinite(R_i):
+                # 直线情况
+                s_out_x += L_i * norm_in_y
+                s_out_y -= L_i * norm_in_x
             else:
-                # 分支2: R 和 alpha 符号相同 (或其一为0)
-                # 模拟 C++ 的第二种变换组合:
-                #   - 旋转角度 ~ theta - pi/2
-                #   - 基础平移方向向量: N (入口法线)
-                #   - 平移距离标量: 2 * |R| * sin(theta)
-                angle_rot2 = theta - math.pi/2.0
-                base_vec2 = n_vec # 基础向量 N
-                rotated_vec2 = rotate_vector(base_vec2, angle_rot2) # 计算平移方向
-                dist_scalar2 = 2.0 * abs(R_i) * sin_theta # 计算平移距离
-                translation_vec = (dist_scalar2 * rotated_vec2[0], dist_scalar2 * rotated_vec2[1]) # 计算最终平移向量
-
-            # 应用最终的平移向量: 出口点 = 入口点 + 平移向量
-            s_out_x = pt_in_x + translation_vec[0]
-            s_out_y = pt_in_y + translation_vec[1]
-            s_out_i = (s_out_x, s_out_y)
-
-    return s_out_i, n_hat_out_i
+                # 曲线情况: 旋转角 ±(pi/2 - theta) 的 cos/sin 由 theta 的 sin/cos 导出
+                theta = abs(alpha_i) / 2.0
+                sin_theta = math.sin(theta)
+                cos_theta = math.cos(theta)
+                dist_scalar = 2.0 * abs(R_i) * sin_theta
+                if R_i != 0.0 and (R_i < 0.0) != (alpha_i < 0.0):
+                    # R 与 alpha 符号不同: 旋转角 pi/2 - theta, 基础向量 -N
+                    rot_sin = cos_theta
+                    base_x = -norm_in_x
+                    base_y = -norm_in_y
+                    dist_scalar = -dist_scalar
+                else:
+                    # R 与 alpha 符号相同: 旋转角 theta - pi/2, 基础向量 N
+                    rot_sin = -cos_theta
+                    base_x = norm_in_x
+                    base_y = norm_in_y
+                s_out_x += dist_scalar * (sin_theta * base_x - rot_sin * base_y)
+                s_out_y += dist_scalar * (rot_sin * base_x + sin_theta * base_y)
+        pts_out[i, 0] = s_out_x
+        pts_out[i, 1] = s_out_y
+
+def _outlet_geometry_numpy(pts_in, normals_in, lengths, radii, angles, pts_out, normals_out):
+    """
+    _outlet_geometry_kernel 的向量化版本 (未安装 numba 时使用): 各分支的条件选取只作用于标量系数,
+    出口点由同一个无分支表达式一次算出。
+    输入均为按分段排列的数组, 结果写入预分配的 pts_out / normals_out (N, 2)。
+    """
+    norm_in_x = normals_in[:, 0]
+    norm_in_y = normals_in[:, 1]
+    cos_a = np.cos(angles)
+    sin_a = np.sin(angles)
+    norm_out = np.stack([cos_a * norm_in_x - sin_a * norm_in_y,
+                         sin_a * norm_in_x + cos_a * norm_in_y], axis=1)
+    norm = np.hypot(norm_out[:, 0], norm_out[:, 1])
+    valid = norm > MINIMAL_DISTANCE
+    normals_out[:] = (1.0, 0.0)
+    normals_out[valid] = norm_out[valid] / norm[valid, None]
+
+    # 直线与两种曲线情况都可写成 "入口点 + 系数 * 旋转后的入口法线":
+    #   直线: 系数 L, 旋转 -pi/2 (cos=0, sin=-1)
+    #   曲线: 系数 2|R|sin(theta), 旋转 ±(pi/2 - theta), 其 cos/sin 由 theta 的 sin/cos 代数导出
+    #         (R 与 alpha 符号不同时, C++ 中的 -N 与负距离两次取负相互抵消)
+    # 先在 (N,) 标量数组上按条件选出系数与 cos/sin, 再用一个无分支表达式算出全部出口点
+    signs_differ = (radii != 0.0) & ((radii < 0.0) != (angles < 0.0))
+    theta = np.abs(angles) / 2.0
+    sin_theta = np.sin(theta)
+    cos_theta = np.cos(theta)
+    is_straight = (np.abs(angles) < MINIMAL_DISTANCE) | ~np.isfinite(radii)
+    with np.errstate(invalid='ignore'):
+        # R 为 inf 的分段走直线分支, 这里产生的 nan 会被 np.where 丢弃
+        dist_scalar = 2.0 * np.abs(radii) * sin_theta
+    coef = np.where(lengths > MINIMAL_DISTANCE, np.where(is_straight, lengths, dist_scalar), 0.0)
+    cos_r = np.where(is_straight, 0.0, sin_theta)
+    sin_r = np.where(is_straight, -1.0, np.where(signs_differ, cos_theta, -cos_theta))
+    pts_out[:, 0] = pts_in[:, 0] + coef * (cos_r * norm_in_x - sin_r * norm_in_y)
+    pts_out[:, 1] = pts_in[:, 1] + coef * (sin_r * norm_in_x + cos_r * norm_in_y)
+
+if njit is not None:
+    calculate_outlet_geometry_batch = njit(cache=True, error_model='numpy')(_outlet_geometry_kernel)
+else:
+    calculate_outlet_geometry_batch = _outlet_geometry_numpy
 
 
 # --- 数据加载与准备 ---
@@ -159,134 +187,157 @@ def load_and_prepare_section_data(line_odd, line_even):
     解析CSV行对, 模拟 C++ 中的数据加载、几何中心调整和必要的数据准备。
     返回包含原始和调整后数据的字典。
     """
-    local_contour_y = []
-    local_contour_z = []
+    local_contour_y = np.empty(0)
+    local_contour_z = np.empty(0)
     center_x, center_y = 0.0, 0.0
     normal_x, normal_y = 1.0, 0.0
     scale_in, scale_out = 1.0, 1.0
     try:
-        parts_odd = line_odd.strip().split(';')
+        # 只切分出前三个标量字段, 轮廓部分逐字段转换并跳过空字段 (含补齐用的尾部分号)
+        parts_odd = line_odd.strip().split(';', 3)
         if len(parts_odd) < 4: raise ValueError("奇数行字段不足")
         center_x = float(parts_odd[0])
         normal_x = float(parts_odd[1])
         scale_in = float(parts_odd[2])
-        local_contour_y = [float(p) for p in parts_odd[3:] if p.strip()]
+        local_contour_y = np.array([p for p in parts_odd[3].split(';') if p.strip()], dtype=float)
     except (IndexError, ValueError) as e:
         print(f"错误: 解析奇数行失败: {e}\n行: {line_odd.strip()}")
         return None
     try:
-        parts_even = line_even.strip().split(';')
+        parts_even = line_even.strip().split(';', 3)
         if len(parts_even) < 4: raise ValueError("偶数行字段不足")
         center_y = float(parts_even[0])
         normal_y = float(parts_even[1])
         scale_out = float(parts_even[2])
-        local_contour_z = [float(p) for p in parts_even[3:] if p.strip()]
+        local_contour_z = np.array([p for p in parts_even[3].split(';') if p.strip()], dtype=float)
     except (IndexError, ValueError) as e:
         print(f"错误: 解析偶数行失败: {e}\n行: {line_even.strip()}")
         return None
-    if len(local_contour_y) != len(local_contour_z):
-        print(f"错误: 轮廓点数量不匹配 ({len(local_contour_y)} vs {len(local_contour_z)})" )
+    nx_norm, ny_norm = normalize_vector(normal_x, normal_y)
+    return prepare_section_data(center_x, center_y, nx_norm, ny_norm, scale_in, scale_out,
+                                local_contour_y, local_contour_z)
+
+def parse_section_lines(lines):
+    """
+    批量解析 CSV 的全部行对: 把所有行拼接后交给一次 np.fromstring 在 C 层解析,
+    再按每行字段数切回各行。若有格式异常或含空字段的行, 退回逐对解析 (跳过空字段, 并报告出错位置)。
+    """
+    lines = [line.strip().rstrip(';') for line in lines[:len(lines) // 2 * 2]]
+    if not lines:
+        return []
+    counts = np.array([line.count(';') + 1 for line in lines])
+    values = None
+    if counts.min() >= 4:
+        try:
+            values = np.fromstring(';'.join(lines), sep=';')
+        except ValueError:
+            values = None
+    if values is None or values.size != counts.sum():
+        sections = (load_and_prepare_section_data(lines[i], lines[i + 1]) for i in range(0, len(lines), 2))
+        return [section for section in sections if section]
+    rows = np.split(values, np.cumsum(counts)[:-1])
+    # 每行前三个字段 (中心, 法线, 缩放) 整理成 (N, 3), 法线一次性批量归一化
+    heads_odd = np.array([row[:3] for row in rows[0::2]])
+    heads_even = np.array([row[:3] for row in rows[1::2]])
+    normals = normalize_vectors(np.column_stack([heads_odd[:, 1], heads_even[:, 1]]))
+    sections = (prepare_section_data(head_odd[0], head_even[0], normal[0], normal[1], head_odd[2], head_even[2],
+                                     row_odd[3:], row_even[3:])
+                for row_odd, row_even, head_odd, head_even, normal
+                in zip(rows[0::2], rows[1::2], heads_odd, heads_even, normals))
+    return [section for section in sections if section]
+
+def prepare_section_data(center_x, center_y, nx_norm, ny_norm, scale_in, scale_out,
+                         local_contour_y, local_contour_z):
+    """由解析得到的截面字段 (法线已归一化) 计算几何中心调整, 返回包含原始和调整后数据的字典"""
+    if local_contour_y.size != local_contour_z.size:
+        print(f"错误: 轮廓点数量不匹配 ({local_contour_y.size} vs {local_contour_z.size})" )
         return None
-    if not local_contour_y:
+    if local_contour_y.size == 0:
         print("警告: 未找到轮廓点")
 
-    # 保存原始局部轮廓用于绘图
-    original_contour_y = list(local_contour_y)
-    original_contour_z = list(local_contour_z)
-    original_contourY_plot = list(original_contour_y)
-    original_contourZ_plot = list(original_contour_z)
-    if original_contourY_plot and original_contourZ_plot:
-        original_contourY_plot.append(original_contourY_plot[0])
-        original_contourZ_plot.append(original_contourZ_plot[0])
-
-    nx_norm, ny_norm = normalize_vector(normal_x, normal_y)
-
     z_min_adj, z_max_adj = 0.0, 0.0
     z_c_local = 0.0
-    adjusted_contour_z = []
-    if local_contour_z:
-        z_min_local = min(local_contour_z)
-        z_max_local = max(local_contour_z)
+    adjusted_contour_z = local_contour_z
+    if local_contour_z.size:
+        z_min_local = local_contour_z.min()
+        z_max_local = local_contour_z.max()
         z_c_local = (z_min_local + z_max_local) / 2.0
-        adjusted_contour_z = [z - z_c_local for z in local_contour_z]
-        if adjusted_contour_z:
-             z_min_adj = min(adjusted_contour_z)
-             z_max_adj = max(adjusted_contour_z)
-
-    adjusted_contour_y = list(local_contour_y)
+        adjusted_contour_z = local_contour_z - z_c_local
+        z_min_adj = adjusted_contour_z.min()
+        z_max_adj = adjusted_contour_z.max()
 
     adjusted_center_x = center_x + z_c_local * nx_norm
     adjusted_center_y = center_y + z_c_local * ny_norm
     ctrLinePtIn_adj = (adjusted_center_x, adjusted_center_y)
 
-    contour_y_plot_adj = list(adjusted_contour_y)
-    contour_z_plot_adj = list(adjusted_contour_z)
-    if contour_y_plot_adj and contour_z_plot_adj:
-        contour_y_plot_adj.append(contour_y_plot_adj[0])
-        contour_z_plot_adj.append(contour_z_plot_adj[0])
-
     return {
         "ctrLinePtIn_adj": ctrLinePtIn_adj,
         "normalIn_adj": (nx_norm, ny_norm),
         "scaleIn": scale_in,
         "scaleOut": scale_out,
-        "contourY_local_adj": adjusted_contour_y,
+        # Y 坐标在居中前后相同, 原始与调整后轮廓共用同一个数组
+        "contourY_local": local_contour_y,
+        "contourZ_local_orig": local_contour_z,
         "contourZ_local_adj": adjusted_contour_z,
-        "contourY_plot_adj": contour_y_plot_adj,
-        "contourZ_plot_adj": contour_z_plot_adj,
-        "original_contourY_plot": original_contourY_plot,
-        "original_contourZ_plot": original_contourZ_plot,
         "z_c_local": z_c_local,
         "zMinAdj_local": z_min_adj,
         "zMaxAdj_local": z_max_adj,
-        "length": 0.0,
-        "curvatureRadius": float('inf'),
-        "curvatureAngle": 0.0,
-        "ctrLinePtOut": ctrLinePtIn_adj,
-        "normalOut": (nx_norm, ny_norm),
     }
 
+def close_contour(contour):
+    """把首点接到末尾, 得到绘图用的闭合曲线坐标"""
+    return np.concatenate([contour, contour[:1]])
+
+# 截面字典中按截面取值的标量/二维向量字段, 由 build_section_arrays 整理为 SoA 数组
+SECTION_ARRAY_FIELDS = ("ctrLinePtIn_adj", "normalIn_adj", "scaleIn", "scaleOut",
+                        "z_c_local", "zMinAdj_local", "zMaxAdj_local")
+
+def build_section_arrays(sections):
+    """
+    把逐截面的字典整理为按字段连续存放的 numpy 数组 (SoA), 返回以字段名为键的字典。
+    每行对应一个截面, 分段几何 (长度、曲率、出口点/法线) 之后也以数组形式写入同一字典;
+    变长的轮廓数据仍保留在各截面字典中。
+    """
+    return {key: np.array([d[key] for d in sections], dtype=float) for key in SECTION_ARRAY_FIELDS}
+
 # --- 角点计算 ---
-def get_segment_points(section_data_i):
+def get_segment_points(sections, num_segments):
     """
-    使用段 i 的完整几何数据计算四个角点的全局坐标。
+    使用 SoA 截面数组一次性计算前 num_segments 个分段四个角点的全局坐标。
+    返回 (N, 4, 2) 数组, 角点顺序为 InMin, InMax, OutMin, OutMax。
     """
-    ptIn = section_data_i["ctrLinePtIn_adj"]
-    normalIn = section_data_i["normalIn_adj"]
-    scaleIn = section_data_i["scaleIn"]
-    ymin_local = section_data_i["zMinAdj_local"]
-    ymax_local = section_data_i["zMaxAdj_local"]
-    ptOut = section_data_i["ctrLinePtOut"]
-    normalOut = section_data_i["normalOut"]
-    scaleOut = section_data_i["scaleOut"]
-    ptInMin = (ptIn[0] + normalIn[0] * ymin_local * scaleIn,
-               ptIn[1] + normalIn[1] * ymin_local * scaleIn)
-    ptInMax = (ptIn[0] + normalIn[0] * ymax_local * scaleIn,
-               ptIn[1] + normalIn[1] * ymax_local * scaleIn)
-    ptOutMin = (ptOut[0] + normalOut[0] * ymin_local * scaleOut,
-                ptOut[1] + normalOut[1] * ymin_local * scaleOut)
-    ptOutMax = (ptOut[0] + normalOut[0] * ymax_local * scaleOut,
-                ptOut[1] + normalOut[1] * ymax_local * scaleOut)
-    return ptInMin, ptInMax, ptOutMin, ptOutMax
+    ptIn = sections["ctrLinePtIn_adj"][:num_segments, None, :]
+    normalIn = sections["normalIn_adj"][:num_segments, None, :]
+    scaleIn = sections["scaleIn"][:num_segments, None, None]
+    ptOut = sections["ctrLinePtOut"][:, None, :]
+    normalOut = sections["normalOut"][:, None, :]
+    scaleOut = sections["scaleOut"][:num_segments, None, None]
+    # 每个分段的 (ymin, ymax) 局部边界, (N, 2, 1)
+    y_bounds = np.stack([sections["zMinAdj_local"][:num_segments],
+                         sections["zMaxAdj_local"][:num_segments]], axis=1)[:, :, None]
+    pts_in = ptIn + normalIn * y_bounds * scaleIn
+    pts_out = ptOut + normalOut * y_bounds * scaleOut
+    return np.concatenate([pts_in, pts_out], axis=1)
 
 # --- 矢状图绘制 ---
-def draw_segment_sagittal(ax, section_data_i, segment_index):
+# 每类边在角点数组中的端点索引, 以及颜色和图例标签
+SEGMENT_EDGES = (
+    ((0, 1), 'gray', '分段边界'),            # 入口线 InMin -> InMax
+    ((2, 3), 'darkgray', '_nolegend_'),    # 出口线 OutMin -> OutMax (用深灰区分)
+    ((0, 2), 'green', '计算的下轮廓'),       # 下边界 InMin -> OutMin
+    ((1, 3), 'blue', '计算的上轮廓'),        # 上边界 InMax -> OutMax
+)
+
+def draw_segments_sagittal(ax, corners):
     """
-    在指定的 axes 上绘制一个声道段梯形轮廓。
-    修改绘制顺序以尝试解决视觉交叉问题。
+    在指定的 axes 上一次性绘制所有声道段的梯形轮廓。
+    corners 为 get_segment_points 返回的 (N, 4, 2) 角点数组;
+    入口线、出口线、下边界、上边界各用一个 LineCollection, 四类边的先后顺序与逐段绘制时相同。
     """
-    ptInMin, ptInMax, ptOutMin, ptOutMax = get_segment_points(section_data_i)
-    label_seg = '_nolegend_' if segment_index > 0 else '分段边界'
-    label_upper = '_nolegend_' if segment_index > 0 else '计算的上轮廓'
-    label_lower = '_nolegend_' if segment_index > 0 else '计算的下轮廓'
-    # 1. 绘制入口线 (灰色)
-    ax.plot([ptInMin[0], ptInMax[0]], [ptInMin[1], ptInMax[1]], color='gray', linestyle='-', linewidth=1, label=label_seg)
-    # 2. 绘制出口线 (灰色, 注意顺序 OutMin -> OutMax)
-    ax.plot([ptOutMin[0], ptOutMax[0]], [ptOutMin[1], ptOutMax[1]], color='darkgray', linestyle='-', linewidth=1) # 用深灰区分
-    # 3. 绘制下边界 (绿色)
-    ax.plot([ptInMin[0], ptOutMin[0]], [ptInMin[1], ptOutMin[1]], color='green', linestyle='-', linewidth=1, label=label_lower)
-    # 4. 绘制上边界 (蓝色)
-    ax.plot([ptInMax[0], ptOutMax[0]], [ptInMax[1], ptOutMax[1]], color='blue', linestyle='-', linewidth=1, label=label_upper)
+    for corner_index, color, label in SEGMENT_EDGES:
+        ax.add_collection(LineCollection(corners[:, corner_index], colors=color,
+                                         linestyles='-', linewidths=1, label=label))
+    ax.autoscale_view()
 
 
 # --- 主程序 ---
@@ -302,14 +353,10 @@ if not os.path.exists(csv_filename):
 all_sections_data = []
 try:
     with open(csv_filename, 'r') as f:
-        lines = f.readlines()
-        if len(lines) % 2 != 0:
-            print(f"警告：CSV 文件 '{csv_filename}' 的行数不是偶数，可能数据不完整。")
-        for i in range(0, len(lines), 2):
-            if i + 1 < len(lines):
-                section = load_and_prepare_section_data(lines[i], lines[i+1])
-                if section:
-                    all_sections_data.append(section)
+        lines = f.read().splitlines()
+    if len(lines) % 2 != 0:
+        print(f"警告：CSV 文件 '{csv_filename}' 的行数不是偶数，可能数据不完整。")
+    all_sections_data = parse_section_lines(lines)
 except Exception as e:
     print(f"错误：读取或处理文件 '{csv_filename}' 时出错: {e}")
     sys.exit(1)
@@ -317,67 +364,60 @@ if not all_sections_data:
     print("错误：未能从 CSV 文件中成功解析任何截面数据。")
     sys.exit(1)
 num_segments = len(all_sections_data) - 1
-for i in range(num_segments):
-    data_i = all_sections_data[i]
-    data_i_plus_1 = all_sections_data[i+1]
-    s_prime_i = data_i["ctrLinePtIn_adj"]
-    s_prime_i_plus_1 = data_i_plus_1["ctrLinePtIn_adj"]
-    n_hat_i = data_i["normalIn_adj"]
-    n_hat_i_plus_1 = data_i_plus_1["normalIn_adj"]
-    length = np.sqrt((s_prime_i_plus_1[0] - s_prime_i[0])**2 + (s_prime_i_plus_1[1] - s_prime_i[1])**2)
-    data_i["length"] = length
-    radius, angle = calculate_curvature(s_prime_i, n_hat_i, s_prime_i_plus_1, n_hat_i_plus_1)
-    data_i["curvatureRadius"] = radius
-    data_i["curvatureAngle"] = angle
-for i in range(num_segments):
-    data_i = all_sections_data[i]
-    s_out_i, n_hat_out_i = calculate_outlet_geometry(
-        data_i["ctrLinePtIn_adj"],
-        data_i["normalIn_adj"],
-        data_i["length"],
-        data_i["curvatureRadius"],
-        data_i["curvatureAngle"]
-    )
-    data_i["ctrLinePtOut"] = s_out_i
-    data_i["normalOut"] = n_hat_out_i
+sections = build_section_arrays(all_sections_data)
+points = sections["ctrLinePtIn_adj"]
+normals = sections["normalIn_adj"]
+# 一次性批量计算所有分段的长度与曲率
+lengths, radii, angles = calculate_curvature_batch(points, normals)
+sections["length"] = lengths
+sections["curvatureRadius"] = radii
+sections["curvatureAngle"] = angles
+# 出口几何批量计算, 结果直接写入 SoA 数组
+pts_out = sections["ctrLinePtOut"] = np.empty((num_segments, 2))
+sections["normalOut"] = np.empty((num_segments, 2))
+calculate_outlet_geometry_batch(points[:num_segments], normals[:num_segments], lengths, radii, angles,
+                                pts_out, sections["normalOut"])
 fig, axs = plt.subplots(1, 2, figsize=(12, 6))
 script_version = "v24" # 更新版本号
-fig.suptitle(f'文件 {os.path.basename(csv_filename)} 的可视化 (重构几何 - {script_version})', fontproperties=zh_font_prop)
+fig.suptitle(f'文件 {os.path.basename(csv_filename)} 的可视化 (重构几何 - {script_version})')
 ax_left = axs[0]
-for i in range(num_segments):
-    data_i = all_sections_data[i]
-    draw_segment_sagittal(ax_left, data_i, i)
-    s_prime_i = data_i["ctrLinePtIn_adj"]
-    s_out_i = data_i["ctrLinePtOut"]
-    ax_left.plot([s_prime_i[0], s_out_i[0]], [s_prime_i[1], s_out_i[1]],
+if num_segments > 0:
+    corners = get_segment_points(sections, num_segments)
+    draw_segments_sagittal(ax_left, corners)
+    # 中心线: 各段之间用 NaN 断开, 合并为一条 Line2D
+    centerline = np.full((num_segments, 3, 2), np.nan)
+    centerline[:, 0] = points[:num_segments]
+    centerline[:, 1] = pts_out
+    centerline = centerline.reshape(-1, 2)
+    ax_left.plot(centerline[:, 0], centerline[:, 1],
                  color='red', linestyle='--', marker='.', markersize=3, linewidth=1, zorder=10,
-                 label='_nolegend_' if i > 0 else '计算的中心线')
-if num_segments == 0:
+                 label='计算的中心线')
+else:
      ax_left.plot([],[], color='red', linestyle='--', marker='.', label='计算的中心线')
      ax_left.plot([],[], color='gray', linestyle='-', label='分段边界')
      ax_left.plot([],[], color='blue', linestyle='-', label='计算的上轮廓')
      ax_left.plot([],[], color='green', linestyle='-', label='计算的下轮廓')
-ax_left.set_title(f'矢状面视图 (分段 - {script_version})', fontproperties=zh_font_prop)
-ax_left.set_xlabel('全局 X 坐标', fontproperties=zh_font_prop)
-ax_left.set_ylabel('全局 Y 坐标', fontproperties=zh_font_prop)
+ax_left.set_title(f'矢状面视图 (分段 - {script_version})')
+ax_left.set_xlabel('全局 X 坐标')
+ax_left.set_ylabel('全局 Y 坐标')
 ax_left.set_aspect('equal', adjustable='box')
 ax_left.grid(True)
-ax_left.legend(fontsize='small', prop=zh_font_prop)
+ax_left.legend(fontsize='small', loc='upper left', bbox_to_anchor=(1.02, 1.0), borderaxespad=0.0)
 ax_right = axs[1]
 if all_sections_data: # 确保至少有一个截面数据
     first_section_data = all_sections_data[0]
-
-    # 绘制原始局部轮廓 (虚线, 浅红色)
-    if first_section_data.get("original_contourY_plot") and first_section_data.get("original_contourZ_plot"):
-        ax_right.plot(first_section_data["original_contourY_plot"],
-                        first_section_data["original_contourZ_plot"],
-                        marker='.', markersize=3, linestyle='--', color='lightcoral', label='从CSV读取的原始轮廓')
-
-    # 绘制居中后的轮廓 (实线, 深蓝色)
-    if first_section_data.get("contourY_plot_adj") and first_section_data.get("contourZ_plot_adj"):
-        ax_right.plot(first_section_data["contourY_plot_adj"],
-                        first_section_data["contourZ_plot_adj"],
-                        marker='o', markersize=4, linestyle='-', color='darkblue', label='Z轴居中后的轮廓')
+    # 只为要绘制的截面 0 构造闭合曲线; 原始与居中后的轮廓共用同一组 Y 坐标
+    contour_y_plot = close_contour(first_section_data["contourY_local"])
+    original_contour_z_plot = close_contour(first_section_data["contourZ_local_orig"])
+    contour_z_plot_adj = close_contour(first_section_data["contourZ_local_adj"])
+
+    if contour_y_plot.size:
+        # 绘制原始局部轮廓 (虚线, 浅红色)
+        ax_right.plot(contour_y_plot, original_contour_z_plot,
+                      marker='.', markersize=3, linestyle='--', color='lightcoral', label='从CSV读取的原始轮廓')
+        # 绘制居中后的轮廓 (实线, 深蓝色)
+        ax_right.plot(contour_y_plot, contour_z_plot_adj,
+                      marker='o', markersize=4, linestyle='-', color='darkblue', label='Z轴居中后的轮廓')
 
     # 绘制局部坐标系的原点 (0,0) / Z轴居中位置
     ax_right.axhline(y=0, color='black', linestyle='--', zorder=5, label='局部原点 (0,0) / 居中 Z 轴')
@@ -388,30 +428,21 @@ if all_sections_data: # 确保至少有一个截面数据
         # 绘制原始Z中心位置的水平虚线
         ax_right.axhline(y=z_c, color='purple', linestyle='--', zorder=6, label=f'原始 Z 轴中心 ({z_c:.2f})')
 
-    ax_right.set_title('截面 0 (Z轴居中效果)', fontproperties=zh_font_prop)
-    ax_right.set_xlabel('局部 Y 坐标', fontproperties=zh_font_prop)
-    ax_right.set_ylabel('局部 Z 坐标', fontproperties=zh_font_prop)
+    ax_right.set_title('截面 0 (Z轴居中效果)')
+    ax_right.set_xlabel('局部 Y 坐标')
+    ax_right.set_ylabel('局部 Z 坐标')
     ax_right.set_aspect('equal', adjustable='box')
     ax_right.grid(True)
-    ax_right.legend(fontsize='small', prop=zh_font_prop)
-
-    # 动态设置坐标轴范围 (基于原始和居中后的局部坐标)
-    all_x_coords = [0]
-    all_y_coords = [0]
-    if first_section_data.get("original_contourY_plot"):
-        all_x_coords.extend(first_section_data["original_contourY_plot"])
-    if first_section_data.get("original_contourZ_plot"):
-        all_y_coords.extend(first_section_data["original_contourZ_plot"])
-    if first_section_data.get("contourY_plot_adj"):
-        all_x_coords.extend(first_section_data["contourY_plot_adj"])
-    if first_section_data.get("contourZ_plot_adj"):
-        all_y_coords.extend(first_section_data["contourZ_plot_adj"])
-    if z_c is not None:
-        all_y_coords.append(z_c)
+    ax_right.legend(fontsize='small')
+
+    # 动态设置坐标轴范围 (基于原始和居中后的局部坐标, 并包含原点)
+    all_x_coords = np.concatenate([[0.0], contour_y_plot])
+    all_y_coords = np.concatenate([[0.0], original_contour_z_plot, contour_z_plot_adj,
+                                   [z_c] if z_c is not None else []])
 
-    if len(all_x_coords) > 1 and len(all_y_coords) > 1:
-        min_x, max_x = min(all_x_coords), max(all_x_coords)
-        min_y, max_y = min(all_y_coords), max(all_y_coords)
+    if all_x_coords.size > 1 and all_y_coords.size > 1:
+        min_x, max_x = all_x_coords.min(), all_x_coords.max()
+        min_y, max_y = all_y_coords.min(), all_y_coords.max()
         range_x = max_x - min_x if max_x > min_x else 1.0
         range_y = max_y - min_y if max_y > min_y else 1.0
         pad_x = 0.1 * range_x + 0.5
@@ -423,12 +454,15 @@ if all_sections_data: # 确保至少有一个截面数据
          ax_right.set_ylim(-1.5, 1.5)
 
 else: # 如果没有截面数据
-    ax_right.text(0.5, 0.5, '无截面数据', horizontalalignment='center', verticalalignment='center', transform=ax_right.transAxes, fontproperties=zh_font_prop)
-    ax_right.set_title('截面 0', fontproperties=zh_font_prop)
+    ax_right.text(0.5, 0.5, '无截面数据', horizontalalignment='center', verticalalignment='center', transform=ax_right.transAxes)
+    ax_right.set_title('截面 0')
 
 # 调整布局并保存
 plt.tight_layout(rect=[0, 0.03, 1, 0.95])
 output_filename = f"{os.path.splitext(os.path.basename(csv_filename))[0]}_refactored_visualization_{script_version}.png"
-plt.savefig(output_filename, dpi=300, bbox_inches='tight')
+# 分辨率可通过环境变量 VOCAL_DPI 调低 (如批量预览时设为 150), 默认保持 300;
+# PNG 用最低压缩级别, 文件稍大但编码耗时大幅减少 (无损)
+output_dpi = int(os.environ.get('VOCAL_DPI', 300))
+fig.savefig(output_filename, dpi=output_dpi, bbox_inches='tight', pil_kwargs={'compress_level': 1})
 print(f"可视化结果已保存到: {output_filename}")
 
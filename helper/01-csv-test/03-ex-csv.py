@@ -4,6 +4,13 @@ import sys
 import os
 import math
 from matplotlib import font_manager
+from matplotlib.collections import LineCollection
+
+# numba 为可选依赖: 可用时对出口几何批量计算做 JIT 编译, 否则退回纯 numpy 实现
+try:
+    from numba import njit
+except ImportError:
+    njit = None
 
 # --- 字体设置 ---
 # 获取脚本所在目录
@@ -24,112 +31,156 @@ else:
 # --- Constants ---
 MINIMAL_DISTANCE = 1e-6 # 用于比较浮点数或角度是否接近零
 
+# 命令行带 -v / --verbose 时才打印逐截面、逐分段的调试信息
+VERBOSE_FLAGS = ('-v', '--verbose')
+VERBOSE = any(arg in VERBOSE_FLAGS for arg in sys.argv[1:])
+
 # --- Helper Functions ---
 
 def normalize_vector(vx, vy):
     """归一化向量"""
-    norm = np.sqrt(vx**2 + vy**2)
+    norm = math.hypot(vx, vy)
     if norm > MINIMAL_DISTANCE:
         return vx / norm, vy / norm
     else:
         return 1.0, 0.0 # 返回默认值，例如 (1, 0)
 
-def normalize_angle(angle):
-    """将角度标准化到 (-pi, pi] 区间"""
-    while angle <= -np.pi:
-        angle += 2 * np.pi
-    while angle > np.pi:
-        angle -= 2 * np.pi
-    return angle
+def normalize_vectors(vectors):
+    """normalize_vector 的批量版本: 对 (N, 2) 数组逐行归一化, 模长过小的行置为 (1, 0)"""
+    vectors = np.array(vectors, dtype=float)
+    norms = np.hypot(vectors[:, 0], vectors[:, 1])
+    valid = norms > MINIMAL_DISTANCE
+    vectors[valid] /= norms[valid, None]
+    vectors[~valid] = (1.0, 0.0)
+    return vectors
 
-def calculate_curvature(p1, n1, p2, n2):
+def calculate_curvature_batch(points, normals):
     """
-    模拟 getCurvatureAngleShift 计算曲率半径和角度。
+    模拟 getCurvatureAngleShift, 一次性计算所有相邻截面对的曲率半径和角度。
+    可带前置批次维度 (如补偿后/原始两套数据叠成 (2, N, 2)), 相邻关系沿倒数第二维。
     输入:
-        p1 (tuple): 截面1中心点 (x1, y1)
-        n1 (tuple): 截面1单位法线 (nx1, ny1)
-        p2 (tuple): 截面2中心点 (x2, y2)
-        n2 (tuple): 截面2单位法线 (nx2, ny2)
+        points (ndarray): (..., N, 2) 截面中心点
+        normals (ndarray): (..., N, 2) 截面单位法线
     输出:
-        radius (float): 曲率半径 R (可能为负，表示方向)
-        angle (float): 法线夹角 alpha (弧度, 标准化到 (-pi, pi])
+        lengths (ndarray): (..., N-1) 相邻中心点距离
+        radii (ndarray): (..., N-1) 曲率半径 R (近似平行时为 inf)
+        angles (ndarray): (..., N-1) 法线夹角 alpha (弧度, 标准化到 (-pi, pi])
     """
-    x1, y1 = p1
-    nx1, ny1 = n1
-    x2, y2 = p2
-    nx2, ny2 = n2
-    cross_p_n2 = (x2 - x1) * ny2 - (y2 - y1) * nx2
-    cross_n2_n1 = nx2 * ny1 - ny2 * nx1
-    radius = 0.0
-    if abs(cross_n2_n1) > MINIMAL_DISTANCE:
-        radius = -cross_p_n2 / cross_n2_n1
-    else:
-        radius = float('inf')
-    angle1 = math.atan2(ny1, nx1)
-    angle2 = math.atan2(ny2, nx2)
-    angle_diff = angle2 - angle1
-    angle = normalize_angle(angle_diff)
-    return radius, angle
-
-def rotate_vector(vector, angle_rad):
-    """将二维向量旋转指定角度 (弧度)"""
-    vx, vy = vector
-    cos_a = math.cos(angle_rad)
-    sin_a = math.sin(angle_rad)
-    vx_new = cos_a * vx - sin_a * vy
-    vy_new = sin_a * vx + cos_a * vy
-    return vx_new, vy_new
-
-def calculate_outlet_geometry(s_prime_i, n_hat_i, L_i, R_i, alpha_i):
+    d_p = points[..., 1:, :] - points[..., :-1, :]
+    n1 = normals[..., :-1, :]
+    n2 = normals[..., 1:, :]
+    lengths = np.hypot(d_p[..., 0], d_p[..., 1])
+    cross_p_n2 = d_p[..., 0] * n2[..., 1] - d_p[..., 1] * n2[..., 0]
+    cross_n2_n1 = n2[..., 0] * n1[..., 1] - n2[..., 1] * n1[..., 0]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        radii = np.where(np.abs(cross_n2_n1) > MINIMAL_DISTANCE, -cross_p_n2 / cross_n2_n1, np.inf)
+    # 相邻法线的有符号夹角: atan2(n1 x n2, n1 . n2), n1 x n2 即 -cross_n2_n1; 结果已在 [-pi, pi], 只需把 -pi 映射到 pi
+    angles = np.arctan2(-cross_n2_n1, n1[..., 0] * n2[..., 0] + n1[..., 1] * n2[..., 1])
+    angles[angles == -math.pi] = math.pi
+    return lengths, radii, angles
+
+def _outlet_geometry_kernel(pts_in, normals_in, lengths, radii, angles, pts_out, normals_out):
     """
-    模拟 Acoustic3dSimulation::ctrLinePtOut 和出口法线的计算。
-    严格遵循 C++ 的条件判断逻辑来计算曲线出口点。
+    模拟 Acoustic3dSimulation::ctrLinePtOut 和出口法线的计算 (逐分段循环, 供 Numba 编译)。
+    输入均为按分段排列的数组, 结果写入预分配的 pts_out / normals_out (N, 2)。
     """
-    pt_in_x, pt_in_y = s_prime_i
-    norm_in_x, norm_in_y = n_hat_i
-    n_vec = (norm_in_x, norm_in_y) # 入口法线向量 N
-
-    # --- 1. 计算出口法线 --- (不变)
-    cos_a = math.cos(alpha_i)
-    sin_a = math.sin(alpha_i)
-    norm_out_x = cos_a * norm_in_x - sin_a * norm_in_y
-    norm_out_y = sin_a * norm_in_x + cos_a * norm_in_y
-    n_hat_out_i = normalize_vector(norm_out_x, norm_out_y)
-
-    # --- 2. 计算出口中心点 ---
-    s_out_i = s_prime_i # 默认等于入口点
-
-    if L_i > MINIMAL_DISTANCE:
-        if abs(alpha_i) < MINIMAL_DISTANCE or not math.isfinite(R_i):
-            # --- 直线情况 ---
-            tangent_x = norm_in_y
-            tangent_y = -norm_in_x
-            s_out_x = pt_in_x + L_i * tangent_x
-            s_out_y = pt_in_y + L_i * tangent_y
-            s_out_i = (s_out_x, s_out_y)
+    for i in range(pts_in.shape[0]):
+        norm_in_x = normals_in[i, 0]
+        norm_in_y = normals_in[i, 1]
+        L_i = lengths[i]
+        R_i = radii[i]
+        alpha_i = angles[i]
+
+        # --- 1. 出口法线 ---
+        cos_a = math.cos(alpha_i)
+        sin_a = math.sin(alpha_i)
+        norm_out_x = cos_a * norm_in_x - sin_a * norm_in_y
+        norm_out_y = sin_a * norm_in_x + cos_a * norm_in_y
+        norm = math.sqrt(norm_out_x * norm_out_x + norm_out_y * norm_out_y)
+        if norm > MINIMAL_DISTANCE:
+            normals_out[i, 0] = norm_out_x / norm
+            normals_out[i, 1] = norm_out_y / norm
         else:
-            # --- 曲线情况 (复现 C++ 条件逻辑) ---
-            theta = abs(alpha_i) / 2.0
-            sin_theta = math.sin(theta)
-            signs_differ = (np.sign(R_i) * np.sign(alpha_i) < 0) if R_i != 0 and alpha_i != 0 else False
-            translation_vec = (0.0, 0.0)
-            if signs_differ:
-                angle_rot1 = math.pi/2.0 - theta
-                base_vec1 = (-norm_in_x, -norm_in_y)
-                rotated_vec1 = rotate_vector(base_vec1, angle_rot1)
-                dist_scalar1 = -2.0 * abs(R_i) * sin_theta
-                translation_vec = (dist_scalar1 * rotated_vec1[0], dist_scalar1 * rotated_vec1[1])
+            normals_out[i, 0] = 1.0
+            normals_out[i, 1] = 0.0
+
+        # --- 2. 出口中心点 ---
+        s_out_x = pts_in[i, 0]
+        s_out_y = pts_in[i, 1]
+        if L_i > MINIMAL_DISTANCE:
+            if abs(alpha_i) < MINIMAL_DISTANCE or not math.isfinite(R_i):
+                # 直线情况
+                s_out_x += L_i * norm_in_y
+                s_out_y -= L_i * norm_in_x
             else:
-                angle_rot2 = theta - math.pi/2.0
-                base_vec2 = n_vec
-                rotated_vec2 = rotate_vector(base_vec2, angle_rot2)
-                dist_scalar2 = 2.0 * abs(R_i) * sin_theta
-                translation_vec = (dist_scalar2 * rotated_vec2[0], dist_scalar2 * rotated_vec2[1])
-            s_out_x = pt_in_x + translation_vec[0]
-            s_out_y = pt_in_y + translation_vec[1]
-            s_out_i = (s_out_x, s_out_y)
-
-    return s_out_i, n_hat_out_i
+                # 曲线情况: 旋转角 ±(pi/2 - theta) 的 cos/sin 由 theta 的 sin/cos 导出
+                theta = abs(alpha_i) / 2.0
+                sin_theta = math.sin(theta)
+                cos_theta = math.cos(theta)
+                dist_scalar = 2.0 * abs(R_i) * sin_theta
+                if R_i != 0.0 and (R_i < 0.0) != (alpha_i < 0.0):
+                    # R 与 alpha 符号不同: 旋转角 pi/2 - theta, 基础向量 -N
+                    rot_sin = cos_theta
+                    base_x = -norm_in_x
+                    base_y = -norm_in_y
+                    dist_scalar = -dist_scalar
+                else:
+                    # R 与 alpha 符号相同: 旋转角 theta - pi/2, 基础向量 N
+                    rot_sin = -cos_theta
+                    base_x = norm_in_x
+                    base_y = norm_in_y
+                s_out_x += dist_scalar * (sin_theta * base_x - rot_sin * base_y)
+                s_out_y += dist_scalar * (rot_sin * base_x + sin_theta * base_y)
+        pts_out[i, 0] = s_out_x
+        pts_out[i, 1] = s_out_y
+
+def _outlet_geometry_numpy(pts_in, normals_in, lengths, radii, angles, pts_out, normals_out):
+    """
+    _outlet_geometry_kernel 的向量化版本 (未安装 numba 时使用): 各分支的条件选取只作用于标量系数,
+    出口点由同一个无分支表达式一次算出。
+    输入均为按分段排列的数组, 结果写入预分配的 pts_out / normals_out (N, 2)。
+    """
+    norm_in_x = normals_in[:, 0]
+    norm_in_y = normals_in[:, 1]
+    cos_a = np.cos(angles)
+    sin_a = np.sin(angles)
+    norm_out = np.stack([cos_a * norm_in_x - sin_a * norm_in_y,
+                         sin_a * norm_in_x + cos_a * norm_in_y], axis=1)
+    norm = np.hypot(norm_out[:, 0], norm_out[:, 1])
+    valid = norm > MINIMAL_DISTANCE
+    normals_out[:] = (1.0, 0.0)
+    normals_out[valid] = norm_out[valid] / norm[valid, None]
+
+    # 直线与两种曲线情况都可写成 "入口点 + 系数 * 旋转后的入口法线":
+    #   直线: 系数 L, 旋转 -pi/2 (cos=0, sin=-1)
+    #   曲线: 系数 2|R|sin(theta), 旋转 ±(pi/2 - theta), 其 cos/sin 由 theta 的 sin/cos 代数导出
+    #         (R 与 alpha 符号不同时, C++ 中的 -N 与负距离两次取负相互抵消)
+    # 先在 (N,) 标量数组上按条件选出系数与 cos/sin, 再用一个无分支表达式算出全部出口点
+    signs_differ = (radii != 0.0) & ((radii < 0.0) != (angles < 0.0))
+    theta = np.abs(angles) / 2.0
+    sin_theta = np.sin(theta)
+    cos_theta = np.cos(theta)
+    is_straight = (np.abs(angles) < MINIMAL_DISTANCE) | ~np.isfinite(radii)
+    with np.errstate(invalid='ignore'):
+        # R 为 inf 的分段走直线分支, 这里产生的 nan 会被 np.where 丢弃
+        dist_scalar = 2.0 * np.abs(radii) * sin_theta
+    coef = np.where(lengths > MINIMAL_DISTANCE, np.where(is_straight, lengths, dist_scalar), 0.0)
+    cos_r = np.where(is_straight, 0.0, sin_theta)
+    sin_r = np.where(is_straight, -1.0, np.where(signs_differ, cos_theta, -cos_theta))
+    pts_out[:, 0] = pts_in[:, 0] + coef * (cos_r * norm_in_x - sin_r * norm_in_y)
+    pts_out[:, 1] = pts_in[:, 1] + coef * (sin_r * norm_in_x + cos_r * norm_in_y)
+
+
+# _outlet_geometry_kernel 的参数类型: pts_in, normals_in, lengths, radii, angles, pts_out, normals_out
+OUTLET_GEOMETRY_SIGNATURE = ("void(float64[:, :], float64[:, :], float64[:], float64[:], float64[:],"
+                             " float64[:, :], float64[:, :])")
+
+if njit is not None:
+    # 给出显式签名: 导入时即完成编译 (有缓存时直接加载), 首次调用不再触发类型推断与编译
+    calculate_outlet_geometry_batch = njit(OUTLET_GEOMETRY_SIGNATURE, cache=True,
+                                           error_model='numpy')(_outlet_geometry_kernel)
+else:
+    calculate_outlet_geometry_batch = _outlet_geometry_numpy
 
 
 # --- 数据加载与准备 (修改后) ---
@@ -138,101 +189,117 @@ def load_and_prepare_section_data(line_odd, line_even):
     解析CSV行对, 模拟 C++ 中的数据加载、几何中心调整和必要的数据准备。
     返回包含原始数据和调整后数据的字典。
     """
-    local_contour_y = []
-    local_contour_z = []
+    local_contour_y = np.empty(0)
+    local_contour_z = np.empty(0)
     center_x, center_y = 0.0, 0.0
     normal_x, normal_y = 1.0, 0.0
     scale_in, scale_out = 1.0, 1.0
     try:
-        parts_odd = line_odd.strip().split(';')
+        # 只切分出前三个标量字段, 轮廓部分逐字段转换并跳过空字段 (含补齐用的尾部分号)
+        parts_odd = line_odd.strip().split(';', 3)
         if len(parts_odd) < 4: raise ValueError("奇数行字段不足")
         center_x = float(parts_odd[0])
         normal_x = float(parts_odd[1])
         scale_in = float(parts_odd[2])
-        local_contour_y = [float(p) for p in parts_odd[3:] if p.strip()]
+        local_contour_y = np.array([p for p in parts_odd[3].split(';') if p.strip()], dtype=float)
     except (IndexError, ValueError) as e:
         print(f"错误: 解析奇数行失败: {e}\n行: {line_odd.strip()}")
         return None
     try:
-        parts_even = line_even.strip().split(';')
+        parts_even = line_even.strip().split(';', 3)
         if len(parts_even) < 4: raise ValueError("偶数行字段不足")
         center_y = float(parts_even[0])
         normal_y = float(parts_even[1])
         scale_out = float(parts_even[2])
-        local_contour_z = [float(p) for p in parts_even[3:] if p.strip()]
+        local_contour_z = np.array([p for p in parts_even[3].split(';') if p.strip()], dtype=float)
     except (IndexError, ValueError) as e:
         print(f"错误: 解析偶数行失败: {e}\n行: {line_even.strip()}")
         return None
-    if len(local_contour_y) != len(local_contour_z):
-        print(f"错误: 轮廓点数量不匹配 ({len(local_contour_y)} vs {len(local_contour_z)})" )
+    nx_norm, ny_norm = normalize_vector(normal_x, normal_y)
+    return prepare_section_data(center_x, center_y, nx_norm, ny_norm, scale_in, scale_out,
+                                local_contour_y, local_contour_z)
+
+def parse_section_lines(lines):
+    """
+    批量解析 CSV 的全部行对: 把所有行拼接后交给一次 np.fromstring 在 C 层解析,
+    再按每行字段数切回各行。若有格式异常或含空字段的行, 退回逐对解析 (跳过空字段, 并报告出错位置)。
+    """
+    lines = [line.strip().rstrip(';') for line in lines[:len(lines) // 2 * 2]]
+    if not lines:
+        return []
+    counts = np.array([line.count(';') + 1 for line in lines])
+    values = None
+    if counts.min() >= 4:
+        try:
+            values = np.fromstring(';'.join(lines), sep=';')
+        except ValueError:
+            values = None
+    if values is None or values.size != counts.sum():
+        sections = (load_and_prepare_section_data(lines[i], lines[i + 1]) for i in range(0, len(lines), 2))
+        return [section for section in sections if section]
+    rows = np.split(values, np.cumsum(counts)[:-1])
+    # 奇数行: 中心 x, 法线 x, 入口缩放, 轮廓 y; 偶数行: 中心 y, 法线 y, 出口缩放, 轮廓 z
+    # 法线整理成 (N, 2) 后一次性批量归一化
+    normals = normalize_vectors([(row_odd[1], row_even[1]) for row_odd, row_even in zip(rows[0::2], rows[1::2])])
+    sections = (prepare_section_data(row_odd[0], row_even[0], normal[0], normal[1], row_odd[2], row_even[2],
+                                     row_odd[3:], row_even[3:])
+                for row_odd, row_even, normal in zip(rows[0::2], rows[1::2], normals))
+    return [section for section in sections if section]
+
+def prepare_section_data(center_x, center_y, nx_norm, ny_norm, scale_in, scale_out,
+                         local_contour_y, local_contour_z):
+    """由解析得到的截面字段 (法线已归一化) 计算几何中心调整, 返回包含原始数据和调整后数据的字典"""
+    if local_contour_y.size != local_contour_z.size:
+        print(f"错误: 轮廓点数量不匹配 ({local_contour_y.size} vs {local_contour_z.size})" )
         return None
-    if not local_contour_y:
+    if local_contour_y.size == 0:
         print("警告: 未找到轮廓点")
 
     # 保存原始数据
     original_center = (center_x, center_y)
-    original_normal = (normal_x, normal_y)
-    original_contour_y = list(local_contour_y)
-    original_contour_z = list(local_contour_z)
-    z_min_orig, z_max_orig = (min(original_contour_z), max(original_contour_z)) if original_contour_z else (0.0, 0.0)
-
-    # 准备绘图用的闭合原始轮廓
-    original_contourY_plot = list(original_contour_y)
-    original_contourZ_plot = list(original_contour_z)
-    if original_contourY_plot and original_contourZ_plot:
-        original_contourY_plot.append(original_contourY_plot[0])
-        original_contourZ_plot.append(original_contourZ_plot[0])
+    original_contour_y = local_contour_y
+    original_contour_z = local_contour_z
+    z_min_orig, z_max_orig = (original_contour_z.min(), original_contour_z.max()) if original_contour_z.size else (0.0, 0.0)
 
     # --- 执行 Z 轴居中和中心点补偿 ---
-    nx_norm, ny_norm = normalize_vector(normal_x, normal_y)
+    # 居中只平移中心点, 法线方向不变: 原始与调整后几何共用同一个归一化法线
     normal_adj = (nx_norm, ny_norm)
 
     z_c_local = 0.0
-    adjusted_contour_z = list(original_contour_z) # 默认等于原始
+    adjusted_contour_z = original_contour_z # 默认等于原始
     z_min_adj, z_max_adj = z_min_orig, z_max_orig # 默认等于原始
 
-    if local_contour_z:
-        z_min_local = min(local_contour_z)
-        z_max_local = max(local_contour_z)
-        z_c_local = (z_min_local + z_max_local) / 2.0
-        adjusted_contour_z = [z - z_c_local for z in local_contour_z]
-        if adjusted_contour_z:
-             z_min_adj = min(adjusted_contour_z)
-             z_max_adj = max(adjusted_contour_z)
+    if local_contour_z.size:
+        z_c_local = (z_min_orig + z_max_orig) / 2.0
+        adjusted_contour_z = local_contour_z - z_c_local
+        z_min_adj = adjusted_contour_z.min()
+        z_max_adj = adjusted_contour_z.max()
 
-    adjusted_contour_y = list(local_contour_y) # Y 坐标不变
+    adjusted_contour_y = local_contour_y # Y 坐标不变, 共享同一数组
 
     # 计算补偿后的中心点
     adjusted_center_x = center_x + z_c_local * nx_norm
     adjusted_center_y = center_y + z_c_local * ny_norm
     center_adj = (adjusted_center_x, adjusted_center_y)
 
-    # 准备绘图用的闭合调整后轮廓
-    contour_y_plot_adj = list(adjusted_contour_y)
-    contour_z_plot_adj = list(adjusted_contour_z)
-    if contour_y_plot_adj and contour_z_plot_adj:
-        contour_y_plot_adj.append(contour_y_plot_adj[0])
-        contour_z_plot_adj.append(contour_z_plot_adj[0])
-
     # --- Debug: 打印 z_c_local 和中心点 ---
-    print(f"--- Section Data ---")
-    print(f"  z_c_local (Z offset): {z_c_local:.6f}")
-    print(f"  Original Center (x, y): ({original_center[0]:.6f}, {original_center[1]:.6f})")
-    print(f"  Adjusted Center (x, y): ({center_adj[0]:.6f}, {center_adj[1]:.6f})")
+    if VERBOSE:
+        print(f"--- Section Data ---")
+        print(f"  z_c_local (Z offset): {z_c_local:.6f}")
+        print(f"  Original Center (x, y): ({original_center[0]:.6f}, {original_center[1]:.6f})")
+        print(f"  Adjusted Center (x, y): ({center_adj[0]:.6f}, {center_adj[1]:.6f})")
     # --- End Debug ---
 
     return {
         # --- 原始数据 ---
         "ctrLinePtIn_orig": original_center,
-        "normalIn_orig": normalize_vector(original_normal[0], original_normal[1]), # 归一化原始法线
+        "normalIn_orig": normal_adj, # 归一化原始法线 (与调整后相同)
         "scaleIn_orig": scale_in,
         "scaleOut_orig": scale_out,
         "contourY_local_orig": original_contour_y,
         "contourZ_local_orig": original_contour_z,
         "zMin_orig": z_min_orig,
         "zMax_orig": z_max_orig,
-        "original_contourY_plot": original_contourY_plot, # 绘图用原始闭合轮廓
-        "original_contourZ_plot": original_contourZ_plot, # 绘图用原始闭合轮廓
 
         # --- 调整/补偿后数据 ---
         "ctrLinePtIn_adj": center_adj,
@@ -243,69 +310,73 @@ def load_and_prepare_section_data(line_odd, line_even):
         "contourZ_local_adj": adjusted_contour_z,
         "zMin_adj": z_min_adj,
         "zMax_adj": z_max_adj,
-        "contourY_plot_adj": contour_y_plot_adj, # 绘图用调整后闭合轮廓
-        "contourZ_plot_adj": contour_z_plot_adj, # 绘图用调整后闭合轮廓
 
         # --- 其他信息 ---
         "z_c_local": z_c_local, # Z轴中心偏移量
-
-        # --- 用于存储计算结果的占位符 ---
-        "results_adj": {},
-        "results_orig": {}
     }
 
+def close_contour(contour):
+    """把首点接到末尾, 得到绘图用的闭合曲线坐标"""
+    return np.concatenate([contour, contour[:1]])
+
 # --- 角点计算 (通用化) ---
 def get_segment_points(ptIn, normalIn, scaleIn, ymin_local, ymax_local,
                        ptOut, normalOut, scaleOut):
     """
-    使用段的入口/出口几何数据计算四个角点的全局坐标。
-    参数为通用名称，可传入 _adj 或 _orig 数据。
+    批量计算所有分段四个角点的全局坐标。
+    点/法线为 (N, 2) 数组, 缩放和上下界为 (N,) 数组; 参数为通用名称，可传入 _adj 或 _orig 数据。
+    返回 (N, 4, 2) 数组, 角点顺序为 InMin, InMax, OutMin, OutMax。
     """
-    ptInMin = (ptIn[0] + normalIn[0] * ymin_local * scaleIn,
-               ptIn[1] + normalIn[1] * ymin_local * scaleIn)
-    ptInMax = (ptIn[0] + normalIn[0] * ymax_local * scaleIn,
-               ptIn[1] + normalIn[1] * ymax_local * scaleIn)
-    ptOutMin = (ptOut[0] + normalOut[0] * ymin_local * scaleOut,
-                ptOut[1] + normalOut[1] * ymin_local * scaleOut)
-    ptOutMax = (ptOut[0] + normalOut[0] * ymax_local * scaleOut,
-                ptOut[1] + normalOut[1] * ymax_local * scaleOut)
-    return ptInMin, ptInMax, ptOutMin, ptOutMax
+    # 每个分段的 (ymin, ymax) 局部边界, (N, 2, 1)
+    y_bounds = np.stack([ymin_local, ymax_local], axis=1)[:, :, None]
+    pts_in = ptIn[:, None, :] + normalIn[:, None, :] * y_bounds * scaleIn[:, None, None]
+    pts_out = ptOut[:, None, :] + normalOut[:, None, :] * y_bounds * scaleOut[:, None, None]
+    return np.concatenate([pts_in, pts_out], axis=1)
 
 # --- 矢状图绘制 (修改后, 用于对比) ---
-def draw_segment_sagittal_comparison(ax, section_data_i, segment_index):
+# 每类边在角点数组 (InMin, InMax, OutMin, OutMax) 中的端点索引, 以及补偿后/原始两套颜色和图例标签
+SEGMENT_EDGES = (
+    # 入口线 InMin -> InMax
+    ((0, 1), ('gray', '补偿后边界'), ('lightgrey', '原始边界')),
+    # 出口线 OutMin -> OutMax
+    ((2, 3), ('darkgray', '_nolegend_'), ('silver', '_nolegend_')),
+    # 下边界 InMin -> OutMin
+    ((0, 2), ('green', '补偿后下轮廓'), ('lightgreen', '原始下轮廓')),
+    # 上边界 InMax -> OutMax
+    ((1, 3), ('blue', '补偿后上轮廓'), ('lightblue', '原始上轮廓')),
+)
+
+def draw_segments_sagittal_comparison(ax, corners_adj, corners_orig):
+    """
+    在指定的 axes 上一次性绘制所有分段补偿后和原始几何的声道段梯形轮廓。
+    角点为 (N, 4, 2) 数组; 每类边各用一个 LineCollection (补偿后实线在上, 原始虚线在下)。
     """
-    在指定的 axes 上同时绘制补偿后和原始几何的声道段梯形轮廓。
+    for corner_index, (color_adj, label_adj), _ in SEGMENT_EDGES:
+        ax.add_collection(LineCollection(corners_adj[:, corner_index], colors=color_adj, linestyles='-',
+                                         linewidths=1, label=label_adj, zorder=5))
+    for corner_index, _, (color_orig, label_orig) in SEGMENT_EDGES:
+        ax.add_collection(LineCollection(corners_orig[:, corner_index], colors=color_orig, linestyles='--',
+                                         linewidths=1, label=label_orig, zorder=4))
+    ax.autoscale_view()
+
+def build_centerline_path(pts_in, pts_out):
     """
-    # 补偿后结果 (实线, 标准色)
-    res_adj = section_data_i["results_adj"]
-    ptInMin_adj, ptInMax_adj, ptOutMin_adj, ptOutMax_adj = res_adj["corners"]
-    label_seg_adj = '_nolegend_' if segment_index > 0 else '补偿后边界'
-    label_upper_adj = '_nolegend_' if segment_index > 0 else '补偿后上轮廓'
-    label_lower_adj = '_nolegend_' if segment_index > 0 else '补偿后下轮廓'
-    ax.plot([ptInMin_adj[0], ptInMax_adj[0]], [ptInMin_adj[1], ptInMax_adj[1]], color='gray', linestyle='-', linewidth=1, label=label_seg_adj, zorder=5)
-    ax.plot([ptOutMin_adj[0], ptOutMax_adj[0]], [ptOutMin_adj[1], ptOutMax_adj[1]], color='darkgray', linestyle='-', linewidth=1, zorder=5)
-    ax.plot([ptInMin_adj[0], ptOutMin_adj[0]], [ptInMin_adj[1], ptOutMin_adj[1]], color='green', linestyle='-', linewidth=1, label=label_lower_adj, zorder=5)
-    ax.plot([ptInMax_adj[0], ptOutMax_adj[0]], [ptInMax_adj[1], ptOutMax_adj[1]], color='blue', linestyle='-', linewidth=1, label=label_upper_adj, zorder=5)
-
-    # 原始结果 (虚线, 浅色)
-    res_orig = section_data_i["results_orig"]
-    if res_orig: # 确保原始结果已计算
-        ptInMin_orig, ptInMax_orig, ptOutMin_orig, ptOutMax_orig = res_orig["corners"]
-        label_seg_orig = '_nolegend_' if segment_index > 0 else '原始边界'
-        label_upper_orig = '_nolegend_' if segment_index > 0 else '原始上轮廓'
-        label_lower_orig = '_nolegend_' if segment_index > 0 else '原始下轮廓'
-        ax.plot([ptInMin_orig[0], ptInMax_orig[0]], [ptInMin_orig[1], ptInMax_orig[1]], color='lightgrey', linestyle='--', linewidth=1, label=label_seg_orig, zorder=4)
-        ax.plot([ptOutMin_orig[0], ptOutMax_orig[0]], [ptOutMin_orig[1], ptOutMax_orig[1]], color='silver', linestyle='--', linewidth=1, zorder=4)
-        ax.plot([ptInMin_orig[0], ptOutMin_orig[0]], [ptInMin_orig[1], ptOutMin_orig[1]], color='lightgreen', linestyle='--', linewidth=1, label=label_lower_orig, zorder=4)
-        ax.plot([ptInMax_orig[0], ptOutMax_orig[0]], [ptInMax_orig[1], ptOutMax_orig[1]], color='lightblue', linestyle='--', linewidth=1, label=label_upper_orig, zorder=4)
+    把所有分段的中心线 (入口点 -> 出口点) 拼成一条折线的坐标, 分段之间以 NaN 断开,
+    这样一个 Line2D 即可画出全部中心线。返回 (3N,) 的 x, y 数组。
+    """
+    path = np.full((3 * len(pts_in), 2), np.nan)
+    path[0::3] = pts_in
+    path[1::3] = pts_out
+    return path[:, 0], path[:, 1]
 
 
 # --- 主程序 ---
-if len(sys.argv) > 1:
-    csv_filename = sys.argv[1]
+positional_args = [arg for arg in sys.argv[1:] if arg not in VERBOSE_FLAGS]
+if positional_args:
+    csv_filename = positional_args[0]
 else:
     print("错误：请提供 CSV 文件名作为命令行参数。")
-    print("用法: python 03-ex-csv.py <文件名.csv>") # 更新脚本名
+    print("用法: python 03-ex-csv.py [-v|--verbose] <文件名.csv>") # 更新脚本名
     sys.exit(1)
 if not os.path.exists(csv_filename):
     print(f"错误：文件 '{csv_filename}' 不存在。")
@@ -314,14 +385,10 @@ if not os.path.exists(csv_filename):
 all_sections_data = []
 try:
     with open(csv_filename, 'r') as f:
-        lines = f.readlines()
-        if len(lines) % 2 != 0:
-            print(f"警告：CSV 文件 '{csv_filename}' 的行数不是偶数，可能数据不完整。")
-        for i in range(0, len(lines), 2):
-            if i + 1 < len(lines):
-                section = load_and_prepare_section_data(lines[i], lines[i+1])
-                if section:
-                    all_sections_data.append(section)
+        lines = f.read().splitlines()
+    if len(lines) % 2 != 0:
+        print(f"警告：CSV 文件 '{csv_filename}' 的行数不是偶数，可能数据不完整。")
+    all_sections_data = parse_section_lines(lines)
 except Exception as e:
     print(f"错误：读取或处理文件 '{csv_filename}' 时出错: {e}")
     sys.exit(1)
@@ -332,63 +399,65 @@ if not all_sections_data:
 
 num_segments = len(all_sections_data) - 1
 
-# --- 计算几何参数 (两次：补偿后 vs 原始) ---
-for i in range(num_segments):
-    data_i = all_sections_data[i]
-    data_i_plus_1 = all_sections_data[i+1]
-
-    # 1. 使用补偿/调整后的数据计算
-    s_prime_i_adj = data_i["ctrLinePtIn_adj"]
-    s_prime_i_plus_1_adj = data_i_plus_1["ctrLinePtIn_adj"]
-    n_hat_i_adj = data_i["normalIn_adj"]
-    n_hat_i_plus_1_adj = data_i_plus_1["normalIn_adj"]
-    length_adj = np.sqrt((s_prime_i_plus_1_adj[0] - s_prime_i_adj[0])**2 + (s_prime_i_plus_1_adj[1] - s_prime_i_adj[1])**2)
-    radius_adj, angle_adj = calculate_curvature(s_prime_i_adj, n_hat_i_adj, s_prime_i_plus_1_adj, n_hat_i_plus_1_adj)
-    s_out_i_adj, n_hat_out_i_adj = calculate_outlet_geometry(
-        s_prime_i_adj, n_hat_i_adj, length_adj, radius_adj, angle_adj
-    )
-    corners_adj = get_segment_points(
-        s_prime_i_adj, n_hat_i_adj, data_i["scaleIn_adj"], data_i["zMin_adj"], data_i["zMax_adj"],
-        s_out_i_adj, n_hat_out_i_adj, data_i["scaleOut_adj"]
-    )
-    data_i["results_adj"] = {
-        "length": length_adj, "curvatureRadius": radius_adj, "curvatureAngle": angle_adj,
-        "ctrLinePtOut": s_out_i_adj, "normalOut": n_hat_out_i_adj, "corners": corners_adj
-    }
-
-    # --- Debug: 打印角点坐标 (补偿后) ---
-    print(f"-- Segment {i} (Adjusted/Compensated) --")
-    print(f"  Corners Adj (InMin, InMax, OutMin, OutMax):")
-    print(f"    InMin:  ({corners_adj[0][0]:.4f}, {corners_adj[0][1]:.4f}) | InMax:  ({corners_adj[1][0]:.4f}, {corners_adj[1][1]:.4f})")
-    print(f"    OutMin: ({corners_adj[2][0]:.4f}, {corners_adj[2][1]:.4f}) | OutMax: ({corners_adj[3][0]:.4f}, {corners_adj[3][1]:.4f})")
-    # --- End Debug ---
-
-    # 2. 使用原始数据计算
-    s_prime_i_orig = data_i["ctrLinePtIn_orig"]
-    s_prime_i_plus_1_orig = data_i_plus_1["ctrLinePtIn_orig"]
-    n_hat_i_orig = data_i["normalIn_orig"]
-    n_hat_i_plus_1_orig = data_i_plus_1["normalIn_orig"]
-    length_orig = np.sqrt((s_prime_i_plus_1_orig[0] - s_prime_i_orig[0])**2 + (s_prime_i_plus_1_orig[1] - s_prime_i_orig[1])**2)
-    radius_orig, angle_orig = calculate_curvature(s_prime_i_orig, n_hat_i_orig, s_prime_i_plus_1_orig, n_hat_i_plus_1_orig)
-    s_out_i_orig, n_hat_out_i_orig = calculate_outlet_geometry(
-        s_prime_i_orig, n_hat_i_orig, length_orig, radius_orig, angle_orig
-    )
-    corners_orig = get_segment_points(
-        s_prime_i_orig, n_hat_i_orig, data_i["scaleIn_orig"], data_i["zMin_orig"], data_i["zMax_orig"],
-        s_out_i_orig, n_hat_out_i_orig, data_i["scaleOut_orig"]
-    )
-    data_i["results_orig"] = {
-        "length": length_orig, "curvatureRadius": radius_orig, "curvatureAngle": angle_orig,
-        "ctrLinePtOut": s_out_i_orig, "normalOut": n_hat_out_i_orig, "corners": corners_orig
-    }
-
-    # --- Debug: 打印角点坐标 (原始) ---
-    print(f"-- Segment {i} (Original/Raw) --")
-    print(f"  Corners Orig (InMin, InMax, OutMin, OutMax):")
-    print(f"    InMin:  ({corners_orig[0][0]:.4f}, {corners_orig[0][1]:.4f}) | InMax:  ({corners_orig[1][0]:.4f}, {corners_orig[1][1]:.4f})")
-    print(f"    OutMin: ({corners_orig[2][0]:.4f}, {corners_orig[2][1]:.4f}) | OutMax: ({corners_orig[3][0]:.4f}, {corners_orig[3][1]:.4f})")
-    print(f"---------------------------------------")
-    # --- End Debug ---
+# --- 计算几何参数 (补偿后 vs 原始), 两套数据对全部分段一起批量计算 ---
+def stack_field(key):
+    """把各截面字典中的同一字段整理为 numpy 数组, 每行对应一个截面"""
+    return np.array([d[key] for d in all_sections_data], dtype=float)
+
+# 补偿后/原始两套数据结构相同且互不依赖: 叠成 (2, ...) 后一次性算完, 出口几何只调用一次内核
+SEGMENT_VARIANTS = ("_adj", "_orig")
+
+def stack_variants(key):
+    """把两套数据的同一字段叠成 (2, 截面数, ...) 数组"""
+    return np.stack([stack_field(key + suffix) for suffix in SEGMENT_VARIANTS])
+
+points = stack_variants("ctrLinePtIn")
+normals = stack_variants("normalIn")
+lengths, radii, angles = calculate_curvature_batch(points, normals)
+
+# 按分段展平为 (2 * num_segments, ...) 交给内核和角点计算
+pts_in = points[:, :-1].reshape(-1, 2)
+normals_in = normals[:, :-1].reshape(-1, 2)
+pts_out = np.empty_like(pts_in)
+normals_out = np.empty_like(normals_in)
+calculate_outlet_geometry_batch(pts_in, normals_in, lengths.ravel(), radii.ravel(), angles.ravel(),
+                                pts_out, normals_out)
+corners = get_segment_points(pts_in, normals_in, stack_variants("scaleIn")[:, :-1].ravel(),
+                             stack_variants("zMin")[:, :-1].ravel(), stack_variants("zMax")[:, :-1].ravel(),
+                             pts_out, normals_out, stack_variants("scaleOut")[:, :-1].ravel())
+
+# 每套结果为以字段名为键的数组字典 (SoA), 每行对应一个分段
+segment_arrays = {"ctrLinePtIn": points[:, :-1],
+                  "ctrLinePtOut": pts_out.reshape(2, num_segments, 2),
+                  "normalOut": normals_out.reshape(2, num_segments, 2),
+                  "length": lengths,
+                  "curvatureRadius": radii,
+                  "curvatureAngle": angles,
+                  "corners": corners.reshape(2, num_segments, 4, 2)}
+segment_results = {suffix: {key: values[v] for key, values in segment_arrays.items()}
+                   for v, suffix in enumerate(SEGMENT_VARIANTS)}
+results_adj = segment_results["_adj"]
+results_orig = segment_results["_orig"]
+
+if VERBOSE:
+    for i in range(num_segments):
+        corners_adj = results_adj["corners"][i]
+        corners_orig = results_orig["corners"][i]
+
+        # --- Debug: 打印角点坐标 (补偿后) ---
+        print(f"-- Segment {i} (Adjusted/Compensated) --")
+        print(f"  Corners Adj (InMin, InMax, OutMin, OutMax):")
+        print(f"    InMin:  ({corners_adj[0][0]:.4f}, {corners_adj[0][1]:.4f}) | InMax:  ({corners_adj[1][0]:.4f}, {corners_adj[1][1]:.4f})")
+        print(f"    OutMin: ({corners_adj[2][0]:.4f}, {corners_adj[2][1]:.4f}) | OutMax: ({corners_adj[3][0]:.4f}, {corners_adj[3][1]:.4f})")
+        # --- End Debug ---
+
+        # --- Debug: 打印角点坐标 (原始) ---
+        print(f"-- Segment {i} (Original/Raw) --")
+        print(f"  Corners Orig (InMin, InMax, OutMin, OutMax):")
+        print(f"    InMin:  ({corners_orig[0][0]:.4f}, {corners_orig[0][1]:.4f}) | InMax:  ({corners_orig[1][0]:.4f}, {corners_orig[1][1]:.4f})")
+        print(f"    OutMin: ({corners_orig[2][0]:.4f}, {corners_orig[2][1]:.4f}) | OutMax: ({corners_orig[3][0]:.4f}, {corners_orig[3][1]:.4f})")
+        print(f"---------------------------------------")
+        # --- End Debug ---
 
 
 # --- 绘图 ---
@@ -399,27 +468,21 @@ fig.suptitle(f'文件 {os.path.basename(csv_filename)} 可视化对比 (补偿 v
 
 # --- 左图: 矢状面视图对比 ---
 ax_left = axs[0]
-for i in range(num_segments):
-    data_i = all_sections_data[i]
+if num_segments > 0:
     # 绘制补偿后和原始的边界
-    draw_segment_sagittal_comparison(ax_left, data_i, i)
+    draw_segments_sagittal_comparison(ax_left, results_adj["corners"], results_orig["corners"])
 
     # 绘制补偿后的中心线 (红色实线)
-    s_prime_i_adj = data_i["ctrLinePtIn_adj"]
-    s_out_i_adj = data_i["results_adj"]["ctrLinePtOut"]
-    ax_left.plot([s_prime_i_adj[0], s_out_i_adj[0]], [s_prime_i_adj[1], s_out_i_adj[1]],
+    ax_left.plot(*build_centerline_path(results_adj["ctrLinePtIn"], results_adj["ctrLinePtOut"]),
                  color='red', linestyle='-', marker='.', markersize=4, linewidth=1.5, zorder=10,
-                 label='_nolegend_' if i > 0 else '补偿后中心线')
+                 label='补偿后中心线')
 
     # 绘制原始中心线 (橙色虚线)
-    s_prime_i_orig = data_i["ctrLinePtIn_orig"]
-    s_out_i_orig = data_i["results_orig"]["ctrLinePtOut"]
-    ax_left.plot([s_prime_i_orig[0], s_out_i_orig[0]], [s_prime_i_orig[1], s_out_i_orig[1]],
+    ax_left.plot(*build_centerline_path(results_orig["ctrLinePtIn"], results_orig["ctrLinePtOut"]),
                  color='orange', linestyle='--', marker='x', markersize=3, linewidth=1, zorder=9,
-                 label='_nolegend_' if i > 0 else '原始中心线')
-
-# 添加图例元素 (如果 num_segments == 0)
-if num_segments == 0:
+                 label='原始中心线')
+else:
+    # 添加图例元素 (如果 num_segments == 0)
      ax_left.plot([],[], color='red', linestyle='-', marker='.', label='补偿后中心线')
      ax_left.plot([],[], color='orange', linestyle='--', marker='x', label='原始中心线')
      # 只需添加一组边界图例即可
@@ -437,25 +500,25 @@ ax_left.set_ylabel('全局 Y 坐标', fontproperties=zh_font_prop)
 ax_left.set_aspect('equal', adjustable='box')
 ax_left.grid(True)
 # 调整图例位置和大小
-ax_left.legend(fontsize='x-small', prop=zh_font_prop, loc='best')
+ax_left.legend(fontsize='x-small', prop=zh_font_prop, loc='upper left', bbox_to_anchor=(1.02, 1.0), borderaxespad=0.0)
 
 
 # --- 右图: 截面 0 Z轴居中效果 ---
 ax_right = axs[1]
 if all_sections_data: # 确保至少有一个截面数据
     first_section_data = all_sections_data[0]
-
-    # 绘制原始局部轮廓 (虚线, 浅红色) - plot在后，zorder低
-    if first_section_data.get("original_contourY_plot") and first_section_data.get("original_contourZ_plot"):
-        ax_right.plot(first_section_data["original_contourY_plot"],
-                        first_section_data["original_contourZ_plot"],
-                        marker='.', markersize=3, linestyle='--', color='lightcoral', label='从CSV读取的原始轮廓', zorder=1)
-
-    # 绘制居中后的轮廓 (实线, 深蓝色) - plot在前，zorder高
-    if first_section_data.get("contourY_plot_adj") and first_section_data.get("contourZ_plot_adj"):
-        ax_right.plot(first_section_data["contourY_plot_adj"],
-                        first_section_data["contourZ_plot_adj"],
-                        marker='o', markersize=4, linestyle='-', color='darkblue', label='Z轴居中后的轮廓', zorder=2)
+    # 只有截面 0 需要闭合轮廓, 在这里生成 (Y 坐标原始/居中后相同, 共用一份)
+    contour_y_plot = close_contour(first_section_data["contourY_local_orig"])
+    original_contour_z_plot = close_contour(first_section_data["contourZ_local_orig"])
+    contour_z_plot_adj = close_contour(first_section_data["contourZ_local_adj"])
+
+    if contour_y_plot.size:
+        # 绘制原始局部轮廓 (虚线, 浅红色) - plot在后，zorder低
+        ax_right.plot(contour_y_plot, original_contour_z_plot,
+                      marker='.', markersize=3, linestyle='--', color='lightcoral', label='从CSV读取的原始轮廓', zorder=1)
+        # 绘制居中后的轮廓 (实线, 深蓝色) - plot在前，zorder高
+        ax_right.plot(contour_y_plot, contour_z_plot_adj,
+                      marker='o', markersize=4, linestyle='-', color='darkblue', label='Z轴居中后的轮廓', zorder=2)
 
     # 绘制局部坐标系的原点 (0,0) / Z轴居中位置
     ax_right.axhline(y=0, color='black', linestyle='-.', linewidth=1, zorder=5, label='局部 Z=0 (居中后)')
@@ -473,22 +536,14 @@ if all_sections_data: # 确保至少有一个截面数据
     ax_right.legend(fontsize='small', prop=zh_font_prop, loc='best')
 
     # 动态设置坐标轴范围 (基于原始和居中后的局部坐标)
-    all_x_coords = [0]
-    all_y_coords = [0]
-    if first_section_data.get("original_contourY_plot"):
-        all_x_coords.extend(first_section_data["original_contourY_plot"])
-    if first_section_data.get("original_contourZ_plot"):
-        all_y_coords.extend(first_section_data["original_contourZ_plot"])
-    if first_section_data.get("contourY_plot_adj"): # 同时考虑居中后范围
-        all_x_coords.extend(first_section_data["contourY_plot_adj"])
-    if first_section_data.get("contourZ_plot_adj"): # 同时考虑居中后范围
-        all_y_coords.extend(first_section_data["contourZ_plot_adj"])
-    if z_c is not None:
-        all_y_coords.append(z_c) # 包含原始中心线
-
-    if len(all_x_coords) > 1 and len(all_y_coords) > 1:
-        min_x, max_x = min(all_x_coords), max(all_x_coords)
-        min_y, max_y = min(all_y_coords), max(all_y_coords)
+    # 同时考虑原始和居中后范围, 并包含原始中心线
+    all_x_coords = np.concatenate([[0.0], contour_y_plot])
+    all_y_coords = np.concatenate([[0.0], original_contour_z_plot, contour_z_plot_adj,
+                                   [z_c] if z_c is not None else []])
+
+    if all_x_coords.size > 1 and all_y_coords.size > 1:
+        min_x, max_x = all_x_coords.min(), all_x_coords.max()
+        min_y, max_y = all_y_coords.min(), all_y_coords.max()
         range_x = max_x - min_x if max_x > min_x else 1.0
         range_y = max_y - min_y if max_y > min_y else 1.0
         pad_x = 0.1 * range_x + 0.5
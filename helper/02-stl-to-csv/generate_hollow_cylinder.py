@@ -4,6 +4,78 @@ import trimesh
 import numpy as np
 import os
 
+def build_hollow_cylinder_mesh(
+    inner_radius: float,
+    outer_radius: float,
+    height: float,
+    sections: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Builds the triangle mesh of a hollow cylinder directly, without any boolean operation.
+
+    The cylinder is centered at the origin along Z (like trimesh.primitives.Cylinder),
+    spanning z in [-height/2, height/2].
+
+    Returns:
+        vertices: (4*sections, 3) array, rings ordered outer-bottom, outer-top,
+                  inner-bottom, inner-top.
+        faces: (8*sections, 3) vertex indices, wound so normals point out of the solid.
+    """
+    theta = np.linspace(0.0, 2.0 * np.pi, sections, endpoint=False)
+    cos_t, sin_t = np.cos(theta), np.sin(theta)
+    z_bottom = np.full(sections, -0.5 * height)
+    z_top = np.full(sections, 0.5 * height)
+    vertices = np.concatenate([
+        np.column_stack([outer_radius * cos_t, outer_radius * sin_t, z_bottom]),
+        np.column_stack([outer_radius * cos_t, outer_radius * sin_t, z_top]),
+        np.column_stack([inner_radius * cos_t, inner_radius * sin_t, z_bottom]),
+        np.column_stack([inner_radius * cos_t, inner_radius * sin_t, z_top]),
+    ])
+
+    k = np.arange(sections)
+    k1 = (k + 1) % sections
+    ob, ot, ib, it = k, k + sections, k + 2 * sections, k + 3 * sections
+    ob1, ot1, ib1, it1 = k1, k1 + sections, k1 + 2 * sections, k1 + 3 * sections
+    faces = np.concatenate([
+        np.stack([ob, ob1, ot1], axis=1), np.stack([ob, ot1, ot], axis=1),  # outer wall
+        np.stack([ib, it1, ib1], axis=1), np.stack([ib, it, it1], axis=1),  # inner wall
+        np.stack([ot, ot1, it1], axis=1), np.stack([ot, it1, it], axis=1),  # top annulus
+        np.stack([ob, ib1, ob1], axis=1), np.stack([ob, ib, ib1], axis=1),  # bottom annulus
+    ])
+    return vertices, faces
+
+def axis_transform_matrix(
+    center: tuple[float, float, float],
+    axis: tuple[float, float, float]
+) -> np.ndarray:
+    """
+    Builds the 4x4 transform that rotates +Z onto `axis` (Rodrigues' formula) and
+    then translates to `center`.
+
+    With c = cos(angle) = z . a, s = |v| and K the skew matrix of v = z x a, the
+    rotation is I + K + K @ K * (1 - c) / s^2 = I + K + K @ K / (1 + c). The second
+    form is used for c >= 0 and the first for c < 0, so neither divides by a
+    cancelled difference. Exactly (anti)parallel axes give the identity or a half
+    turn about X.
+    """
+    target_axis = np.asarray(axis, dtype=float)
+    target_axis = target_axis / np.linalg.norm(target_axis)
+    c = target_axis[2]
+    vx, vy = -target_axis[1], target_axis[0] # z x a (its z component is 0)
+    s2 = vx * vx + vy * vy
+    transform_matrix = np.identity(4)
+    if s2 == 0.0:
+        if c < 0.0:
+            transform_matrix[:3, :3] = np.diag([1.0, -1.0, -1.0])
+    else:
+        K = np.array([[0.0, 0.0, vy],
+                      [0.0, 0.0, -vx],
+                      [-vy, vx, 0.0]])
+        factor = 1.0 / (1.0 + c) if c >= 0.0 else (1.0 - c) / s2
+        transform_matrix[:3, :3] = np.identity(3) + K + K @ K * factor
+    transform_matrix[:3, 3] = center
+    return transform_matrix
+
 def create_hollow_cylinder_stl(
     inner_radius: float,
     outer_radius: float,
@@ -16,6 +88,9 @@ def create_hollow_cylinder_stl(
     """
     Generates an STL file for a hollow cylinder (pipe) using trimesh.
 
+    The pipe mesh is constructed directly (see build_hollow_cylinder_mesh), so no
+    boolean backend (Blender/OpenSCAD/manifold) is needed.
+
     Args:
         inner_radius: The inner radius of the cylinder. Must be less than outer_radius.
         outer_radius: The outer radius of the cylinder.
@@ -38,6 +113,9 @@ def create_hollow_cylinder_stl(
     if inner_radius <= 0:
         print("Error: Inner radius must be positive.")
         return False
+    if not np.any(axis):
+        print("Error: Axis must be a non-zero vector.")
+        return False
 
     print(f"Generating hollow cylinder:")
     print(f"  Inner Radius: {inner_radius}")
@@ -49,57 +127,16 @@ def create_hollow_cylinder_stl(
     print(f"  Output file: {output_filename}")
 
     try:
-        # 1. Create the outer cylinder
-        # We use a transform to align the cylinder primitive (default along Z)
-        # to the specified center and axis.
-        # First, create the base cylinder along Z at origin
-        outer_cylinder_base = trimesh.primitives.Cylinder(
-            radius=outer_radius, height=height, sections=sections
-        )
-
-        # 2. Create the inner cylinder (same parameters but smaller radius)
-        inner_cylinder_base = trimesh.primitives.Cylinder(
-            radius=inner_radius, height=height, sections=sections
-        )
-
-        # Determine the transformation matrix to align the cylinder
-        z_axis = np.array([0, 0, 1])
-        target_axis = trimesh.util.unitize(np.array(axis))
-        # Rotation from Z to target axis
-        rotation_matrix = trimesh.geometry.rotation_matrix(
-            np.arccos(np.dot(z_axis, target_axis)),
-            trimesh.util.unitize(np.cross(z_axis, target_axis))
-        ) if not np.allclose(z_axis, target_axis) else np.identity(4) # Handle case where axis is already Z
-
-        # Translation to the center (assuming center is the midpoint of the height along the axis)
-        translation_vector = np.array(center)
-        transform_matrix = trimesh.transformations.translation_matrix(translation_vector) @ rotation_matrix
-
-
-        # Apply the transform to both cylinders
-        outer_cylinder = outer_cylinder_base.apply_transform(transform_matrix)
-        inner_cylinder = inner_cylinder_base.apply_transform(transform_matrix)
-
-
-        # 3. Perform boolean difference (Outer - Inner)
-        # This requires a backend like 'blender', 'scad', or using 'rtree' dependency.
-        # Trimesh will attempt to use the best available one.
-        print("Performing boolean difference (this might take a moment)...")
-        hollow_cylinder = outer_cylinder.difference(inner_cylinder)
-        print("Boolean difference complete.")
-
-        # Check if the difference operation was successful (sometimes fails)
-        if not isinstance(hollow_cylinder, trimesh.Trimesh) or hollow_cylinder.is_empty:
-             print("Error: Boolean difference failed. The resulting mesh is empty or invalid.")
-             print("Ensure trimesh's boolean dependencies (like 'rtree' or Blender/OpenSCAD) are correctly installed.")
-             # As a fallback, maybe export the outer cylinder? Or just fail.
-             # print("Saving outer cylinder as fallback...")
-             # outer_cylinder.export(output_filename)
-             # return True
-             return False
-
-
-        # 4. Export the resulting mesh to STL
+        # 1. Build the pipe mesh along Z at the origin
+        vertices, faces = build_hollow_cylinder_mesh(inner_radius, outer_radius, height, sections)
+        hollow_cylinder = trimesh.Trimesh(vertices=vertices, faces=faces, process=False)
+
+        # 2. Align the pipe to the specified center and axis
+        # (center is the midpoint of the height along the axis)
+        transform_matrix = axis_transform_matrix(center, axis)
+        hollow_cylinder.apply_transform(transform_matrix)
+
+        # 3. Export the resulting mesh to STL
         print(f"Exporting to {output_filename}...")
         hollow_cylinder.export(file_obj=output_filename)
         print("Export complete.")
@@ -107,7 +144,7 @@ def create_hollow_cylinder_stl(
 
     except ImportError as e:
         print(f"Error: Missing dependency for trimesh - {e}")
-        print("Please install the required libraries (e.g., 'pip install rtree').")
+        print("Please install the required libraries (e.g., 'pip install trimesh').")
         return False
     except Exception as e:
         print(f"An unexpected error occurred: {e}")
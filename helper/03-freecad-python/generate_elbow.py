@@ -8,23 +8,256 @@ import sys
 import os
 import math
 import argparse
+import functools
+import numpy as np
+
+# numba 为可选依赖: 可用时对路径与截面坐标系的计算做 JIT 编译, 否则退回纯 numpy 实现
+try:
+    from numba import njit
+except ImportError:
+    njit = None
 
 # 导入FreeCAD模块
 try:
     import FreeCAD
     import Part
-    import Mesh
-    # 尝试导入可能需要的额外模块
-    try:
-        import MeshPart
-    except ImportError:
-        pass
     print(f"成功加载FreeCAD (版本: {FreeCAD.Version})")
 except ImportError as e:
     print(f"错误: 无法导入FreeCAD模块 - {e}")
     print("请确保FreeCAD已正确安装，并且环境变量设置正确")
     sys.exit(1)
 
+# 导出STL时曲面三角化的线性精度
+STL_TOLERANCE = 0.1
+
+# 二进制STL单个三角形记录: 法线 + 三个顶点 (小端float32) + 2字节属性, 共50字节
+STL_DTYPE = np.dtype([
+    ('normal', '<f4', (3,)),
+    ('v0', '<f4', (3,)),
+    ('v1', '<f4', (3,)),
+    ('v2', '<f4', (3,)),
+    ('attr', '<u2'),
+])
+
+def write_binary_stl(output_file, vertices, faces):
+    """
+    将三角网格一次性写为二进制STL (80字节文件头 + 三角形数 + 每个三角形50字节)
+    """
+    # 一次索引取出全部三角形的顶点: (T, 3, 3)
+    tri_verts = vertices[faces]
+    normals = np.cross(tri_verts[:, 1] - tri_verts[:, 0], tri_verts[:, 2] - tri_verts[:, 0])
+    lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+    normals = np.divide(normals, lengths, out=np.zeros_like(normals), where=lengths > 0)
+
+    records = np.zeros(len(faces), dtype=STL_DTYPE)
+    records['normal'] = normals
+    records['v0'] = tri_verts[:, 0]
+    records['v1'] = tri_verts[:, 1]
+    records['v2'] = tri_verts[:, 2]
+
+    with open(output_file, 'wb') as f:
+        f.write(b'binary STL generated by generate_elbow.py'.ljust(80, b' '))
+        f.write(np.array(len(faces), dtype='<u4').tobytes())
+        records.tofile(f)
+
+# Part.makeLoft 的附加参数 (solid, ruled); 旧版本不接受 ruled, 首次放样时确定后缓存, 见 make_loft
+_LOFT_ARGS = None
+
+def make_loft(profiles):
+    """
+    放样生成实体。首次调用时确定当前 FreeCAD 支持的参数形式并缓存,
+    之后直接调用, 不再经过 try/except; 只有参数不匹配的 TypeError 会触发退回
+    """
+    global _LOFT_ARGS
+    if _LOFT_ARGS is None:
+        try:
+            # 尝试使用标准参数
+            shape = Part.makeLoft(profiles, True, False)
+            _LOFT_ARGS = (True, False)
+            return shape
+        except TypeError:
+            # 如果失败，尝试简化参数
+            _LOFT_ARGS = (True,)
+    return Part.makeLoft(profiles, *_LOFT_ARGS)
+
+# create_elbow(reuse=True) 时多次调用复用的 FreeCAD 文档 (见 get_elbow_document)
+_DOC = None
+
+def get_elbow_document():
+    """返回缓存的弯管文档; 已存在时清空其中的对象, 否则 (或已被关闭时) 新建"""
+    global _DOC
+    if _DOC is None or _DOC.Name not in FreeCAD.listDocuments():
+        _DOC = FreeCAD.newDocument("ElbowCache")
+    else:
+        for obj in _DOC.Objects:
+            _DOC.removeObject(obj.Name)
+    return _DOC
+
+def close_elbow_document():
+    """关闭缓存的弯管文档"""
+    global _DOC
+    if _DOC is not None and _DOC.Name in FreeCAD.listDocuments():
+        FreeCAD.closeDocument(_DOC.Name)
+    _DOC = None
+
+def to_array(vector):
+    """FreeCAD.Vector 转为长度为3的 float64 数组"""
+    return np.array([vector.x, vector.y, vector.z], dtype=np.float64)
+
+def to_vector(row):
+    """长度为3的数组转为 FreeCAD.Vector (只在调用 FreeCAD/Part 接口时转换)"""
+    return FreeCAD.Vector(float(row[0]), float(row[1]), float(row[2]))
+
+@functools.lru_cache(maxsize=None)
+def prototype_profile_face(radius_ratio):
+    """
+    原点处 XY 平面内的单位截面圆环面 (外半径1, 内半径 radius_ratio), 接缝在 +X 方向。
+    内外半径按同一比例渐缩, 所以所有截面都是它的缩放和刚体变换; 每种半径比只构建一次。
+    """
+    origin = FreeCAD.Vector(0, 0, 0)
+    z_axis = FreeCAD.Vector(0, 0, 1)
+    outer_wire = Part.Wire(Part.Edge(Part.Circle(origin, z_axis, 1.0)))
+    inner_wire = Part.Wire(Part.Edge(Part.Circle(origin, z_axis, float(radius_ratio))))
+    
+    # 创建截面轮廓（带内孔的面）; 原型按半径比缓存, 这里的 try/except 每种比例只执行一次
+    try:
+        # 在新版本中，可以直接创建带孔的面
+        face = Part.Face([outer_wire, inner_wire])
+    except Exception:
+        # 在旧版本中，可能需要不同的方法
+        # 尝试使用wires属性
+        face = Part.Face(outer_wire)
+        face.Wires = [outer_wire, inner_wire]
+    return face
+
+def build_profile_face(point, normal, u, v, outer_radius, radius_ratio):
+    """
+    生成单个截面的圆环面: 复制原型圆环面, 按外半径缩放后放到截面位置
+
+    参数:
+        point: 截面中心, 长度为3的数组
+        normal, u, v: 截面局部坐标系 (单位法线即路径切线, 接缝方向, 第二方向)
+        outer_radius: 该截面的外半径
+        radius_ratio: 内半径/外半径 (各截面相同)
+    """
+    # 列向量为 u, v, normal, 平移为截面中心
+    matrix = FreeCAD.Matrix(u[0], v[0], normal[0], point[0],
+                            u[1], v[1], normal[1], point[1],
+                            u[2], v[2], normal[2], point[2],
+                            0.0, 0.0, 0.0, 1.0)
+    face = prototype_profile_face(radius_ratio).copy()
+    face.scale(float(outer_radius))
+    face.Placement = FreeCAD.Placement(matrix)
+    return face
+
+def _elbow_path_numpy(angle_rad, bend_center, start_dir, bend_dir, bend_plane_normal,
+                      bend_radius, outer_radius, taper_ratio,
+                      points, tangents, u_all, v_all, outer_radii):
+    """
+    路径与截面坐标系的 numpy 批量实现 (未安装 numba 时使用), 接口与 _elbow_path_kernel 相同。
+    结果写入预分配的 (N, 3) / (N,) 数组, N = 截面数 + 1。
+    """
+    n = points.shape[0]
+    # 路径（圆弧）上的点
+    param = np.linspace(0.0, 1.0, n)
+    current_angle = angle_rad * param
+    pos = np.cos(current_angle)[:, None] * start_dir + np.sin(current_angle)[:, None] * bend_dir
+    points[:] = bend_center - bend_radius * pos
+    
+    # 管道截面的法线（沿路径切线）: 前向差分, 最后一个截面沿用最后一段的方向
+    tangents[:-1] = np.diff(points, axis=0)
+    tangents[-1] = tangents[-2]
+    
+    # 各截面的外半径（考虑渐缩）; 内半径按同一比例渐缩, 由原型截面的内外半径比给出
+    outer_radii[:] = outer_radius - (outer_radius * (1.0 - taper_ratio)) * param
+    
+    # 原型的 X 轴 (接缝方向) 统一对齐 弯曲平面法线 x 切线, 避免放样时截面相互扭转;
+    # 叉积随切线长度线性缩放, 用未单位化的差分切线和平方长度判断退化 (|u|/|t| < 1e-6), 不需要开方
+    u = np.cross(bend_plane_normal, tangents)
+    tangent_length2 = np.sum(tangents * tangents, axis=1)
+    degenerate = np.sum(u * u, axis=1) < 1e-12 * tangent_length2
+    tangents /= np.sqrt(tangent_length2)[:, None]
+    # 叉积接近零的截面改用与切线最不平行的坐标轴, 投影到截面平面内
+    fallback = np.where(np.abs(tangents[:, :1]) < np.abs(tangents[:, 1:2]), [1.0, 0.0, 0.0], [0.0, 1.0, 0.0])
+    fallback -= tangents * np.sum(fallback * tangents, axis=1, keepdims=True)
+    u = np.where(degenerate[:, None], fallback, u)
+    u_all[:] = u / np.linalg.norm(u, axis=1, keepdims=True)
+    v_all[:] = np.cross(tangents, u_all)
+
+def _elbow_path_kernel(angle_rad, bend_center, start_dir, bend_dir, bend_plane_normal,
+                       bend_radius, outer_radius, taper_ratio,
+                       points, tangents, u_all, v_all, outer_radii):
+    """
+    路径与截面坐标系的逐截面循环 (供 Numba 编译), 公式与 _elbow_path_numpy 完全一致
+    """
+    n = points.shape[0]
+    # 循环不变量: 参数步长和外半径随参数的减小量
+    step = 1.0 / (n - 1)
+    radius_drop = outer_radius * (1.0 - taper_ratio)
+    for i in range(n):
+        # 与 np.linspace 相同的参数取法, 保证末端恰为 1
+        t = i * step if i < n - 1 else 1.0
+        a = angle_rad * t
+        c = math.cos(a)
+        s = math.sin(a)
+        for k in range(3):
+            points[i, k] = bend_center[k] - bend_radius * (c * start_dir[k] + s * bend_dir[k])
+        outer_radii[i] = outer_radius - radius_drop * t
+    
+    for i in range(n):
+        j = i if i < n - 1 else n - 2
+        tx = points[j + 1, 0] - points[j, 0]
+        ty = points[j + 1, 1] - points[j, 1]
+        tz = points[j + 1, 2] - points[j, 2]
+        
+        # 先用未单位化的切线求叉积, 以平方长度判断退化
+        ux = bend_plane_normal[1] * tz - bend_plane_normal[2] * ty
+        uy = bend_plane_normal[2] * tx - bend_plane_normal[0] * tz
+        uz = bend_plane_normal[0] * ty - bend_plane_normal[1] * tx
+        tangent_length2 = tx * tx + ty * ty + tz * tz
+        degenerate = ux * ux + uy * uy + uz * uz < 1e-12 * tangent_length2
+        
+        inv_length = 1.0 / math.sqrt(tangent_length2)
+        tx *= inv_length
+        ty *= inv_length
+        tz *= inv_length
+        tangents[i, 0] = tx
+        tangents[i, 1] = ty
+        tangents[i, 2] = tz
+        
+        if degenerate:
+            if abs(tx) < abs(ty):
+                ux, uy, uz = 1.0, 0.0, 0.0
+            else:
+                ux, uy, uz = 0.0, 1.0, 0.0
+            d = ux * tx + uy * ty + uz * tz
+            ux -= tx * d
+            uy -= ty * d
+            uz -= tz * d
+        inv_length = 1.0 / math.sqrt(ux * ux + uy * uy + uz * uz)
+        ux *= inv_length
+        uy *= inv_length
+        uz *= inv_length
+        u_all[i, 0] = ux
+        u_all[i, 1] = uy
+        u_all[i, 2] = uz
+        v_all[i, 0] = ty * uz - tz * uy
+        v_all[i, 1] = tz * ux - tx * uz
+        v_all[i, 2] = tx * uy - ty * ux
+
+if njit is not None:
+    elbow_path_geometry = njit(cache=True)(_elbow_path_kernel)
+else:
+    elbow_path_geometry = _elbow_path_numpy
+
+def sections_for_tolerance(angle_rad, bend_radius, tolerance):
+    """
+    弦高误差不超过 tolerance 所需的最少弯曲分段数 (至少4段):
+    半径 R 的圆弧上, 每段圆心角不超过 2·acos(1 - tolerance/R)
+    """
+    max_step = 2.0 * math.acos(1.0 - tolerance / bend_radius)
+    return max(4, int(math.ceil(abs(angle_rad) / max_step)))
+
 def create_elbow(
     outer_radius,
     inner_radius,
@@ -35,7 +268,9 @@ def create_elbow(
     start_dir=FreeCAD.Vector(1, 0, 0),
     bend_plane_normal=FreeCAD.Vector(0, 0, 1),
     sections=64,
-    taper_ratio=1.0  # 1.0表示不缩小，0.5表示终端半径是起始半径的一半
+    taper_ratio=1.0,  # 1.0表示不缩小，0.5表示终端半径是起始半径的一半
+    reuse=False,
+    tolerance=None
 ):
     """
     创建一个弯管模型并导出为STL文件
@@ -51,6 +286,10 @@ def create_elbow(
         bend_plane_normal: 弯曲平面法线
         sections: 弯曲分段数
         taper_ratio: 终端/起始半径比例，用于渐缩弯管
+        reuse: 为 False (默认) 时每次新建文档; 为 True 时复用同一个缓存文档, 下次调用会清空
+               其中的对象 (调用方持有的上一次结果随之失效), 不再需要时用 close_elbow_document 关闭
+        tolerance: 弦高误差容差; 给定时按弯曲半径和角度算出所需的最少分段数代替 sections,
+                   并作为导出STL时的三角化精度 (默认使用 STL_TOLERANCE)
     """
     # 验证参数
     if inner_radius >= outer_radius:
@@ -62,157 +301,74 @@ def create_elbow(
     if bend_radius <= outer_radius * 2:
         print(f"警告: 弯曲半径({bend_radius})可能过小，可能导致模型畸形")
     
-    # 标准化向量
-    if start_dir.Length == 0 or bend_plane_normal.Length == 0:
-        raise ValueError("方向向量不能为零向量")
+    if tolerance is not None and not 0 < tolerance < bend_radius:
+        raise ValueError("容差必须为正数且小于弯曲半径")
     
-    start_dir = start_dir.normalize()
-    bend_plane_normal = bend_plane_normal.normalize()
+    # 标准化向量 (转为 numpy 数组, 不修改调用方传入的 FreeCAD.Vector)
+    start_dir_np = to_array(start_dir)
+    bend_plane_normal_np = to_array(bend_plane_normal)
+    start_length = np.linalg.norm(start_dir_np)
+    normal_length = np.linalg.norm(bend_plane_normal_np)
+    if start_length == 0 or normal_length == 0:
+        raise ValueError("方向向量不能为零向量")
+    start_dir_np /= start_length
+    bend_plane_normal_np /= normal_length
     
-    # 确保方向向量和法线正交
-    dot_product = start_dir.dot(bend_plane_normal)
-    if abs(dot_product) > 1e-6:
-        # 调整法线使其与方向向量正交
-        bend_plane_normal = bend_plane_normal - start_dir.multiply(dot_product)
-        bend_plane_normal = bend_plane_normal.normalize()
+    # 确保方向向量和法线正交: 无条件减去法线在方向上的投影 (已正交时投影为0)
+    bend_plane_normal_np -= start_dir_np * np.dot(start_dir_np, bend_plane_normal_np)
+    normal_length = np.linalg.norm(bend_plane_normal_np)
+    if normal_length < 1e-9:
+        raise ValueError("弯曲平面法线不能与起始方向平行")
+    bend_plane_normal_np /= normal_length
     
     # 计算弯曲平面的第二个方向向量（弯曲方向）
-    bend_dir = bend_plane_normal.cross(start_dir)
-    bend_dir = bend_dir.normalize()
+    bend_dir_np = np.cross(bend_plane_normal_np, start_dir_np)
+    bend_dir_np /= np.linalg.norm(bend_dir_np)
     
     # 计算弯管中心点
-    bend_center = center.add(start_dir.multiply(bend_radius))
+    bend_center_np = to_array(center) + bend_radius * start_dir_np
     
-    # 创建新文档
-    doc = FreeCAD.newDocument("Elbow")
+    # 创建文档 (reuse 时复用缓存文档)
+    doc = get_elbow_document() if reuse else FreeCAD.newDocument("Elbow")
     
     # 转换角度为弧度
     angle_rad = math.radians(angle)
     
-    # 创建路径（圆弧）
-    arc_points = []
-    for i in range(sections + 1):
-        param = float(i) / sections
-        current_angle = angle_rad * param
-        
-        # 计算当前点的位置
-        pos_vec = start_dir.multiply(math.cos(current_angle)).add(
-                  bend_dir.multiply(math.sin(current_angle)))
-        point = bend_center.sub(pos_vec.multiply(bend_radius))
-        arc_points.append(point)
+    # 给定容差时, 放样的截面数由弦高误差决定
+    if tolerance is not None:
+        sections = sections_for_tolerance(angle_rad, bend_radius, tolerance)
+        print(f"根据容差 {tolerance} 确定弯曲分段数: {sections}")
     
-    arc = Part.makePolygon(arc_points)
+    # 路径（圆弧）上 sections+1 个点、切线、外半径及截面坐标系, 一次算出
+    n = sections + 1
+    points = np.empty((n, 3))
+    tangents = np.empty((n, 3))
+    u_all = np.empty((n, 3))
+    v_all = np.empty((n, 3))
+    outer_radii = np.empty(n)
+    elbow_path_geometry(angle_rad, bend_center_np, start_dir_np, bend_dir_np, bend_plane_normal_np,
+                        float(bend_radius), float(outer_radius), float(taper_ratio),
+                        points, tangents, u_all, v_all, outer_radii)
     
     # 创建用于放样的截面轮廓
-    profiles = []
-    
-    # 生成沿路径的截面
+    radius_ratio = inner_radius / outer_radius
+    profiles = [None] * (sections + 1)
     for i in range(sections + 1):
-        param = float(i) / sections
-        current_angle = angle_rad * param
-        
-        # 计算当前位置
-        pos_vec = start_dir.multiply(math.cos(current_angle)).add(
-                  bend_dir.multiply(math.sin(current_angle)))
-        point = bend_center.sub(pos_vec.multiply(bend_radius))
-        
-        # 管道截面的法线（沿路径切线）
-        if i < sections:
-            tangent = arc_points[i+1].sub(arc_points[i])
-        else:
-            tangent = arc_points[i].sub(arc_points[i-1])
-        tangent = tangent.normalize()
-        
-        # 计算当前截面的半径（考虑渐缩）
-        current_outer_radius = outer_radius * (1.0 - param * (1.0 - taper_ratio))
-        current_inner_radius = inner_radius * (1.0 - param * (1.0 - taper_ratio))
-        
-        # 创建截面圆环
-        normal = tangent
-        
-        # 创建截面的局部坐标系
-        u = bend_plane_normal.cross(normal)
-        if u.Length < 1e-6:
-            # 如果交叉积接近零，选择一个垂直于法线的向量
-            if abs(normal.x) < abs(normal.y):
-                u = FreeCAD.Vector(1, 0, 0)
-            else:
-                u = FreeCAD.Vector(0, 1, 0)
-            u = u.sub(normal.multiply(u.dot(normal)))
-            
-        u = u.normalize()
-        v = normal.cross(u).normalize()
-        
-        # 创建内外圆
-        outer_circle_pts = []
-        inner_circle_pts = []
-        
-        # 使用24个分段创建圆
-        radial_segments = 24
-        for j in range(radial_segments):
-            angle_j = 2.0 * math.pi * j / radial_segments
-            cos_j = math.cos(angle_j)
-            sin_j = math.sin(angle_j)
-            
-            # 计算圆周上的点
-            circle_vec = u.multiply(cos_j).add(v.multiply(sin_j))
-            
-            outer_pt = point.add(circle_vec.multiply(current_outer_radius))
-            inner_pt = point.add(circle_vec.multiply(current_inner_radius))
-            
-            outer_circle_pts.append(outer_pt)
-            inner_circle_pts.append(inner_pt)
-        
-        # 闭合圆
-        outer_circle_pts.append(outer_circle_pts[0])
-        inner_circle_pts.append(inner_circle_pts[0])
-        
-        # 创建轮廓线
-        outer_wire = Part.makePolygon(outer_circle_pts)
-        inner_wire = Part.makePolygon(inner_circle_pts)
-        
-        # 创建截面轮廓（带内孔的面）
-        try:
-            # 在新版本中，可以直接创建带孔的面
-            face = Part.Face([outer_wire, inner_wire])
-        except Exception:
-            # 在旧版本中，可能需要不同的方法
-            # 尝试使用wires属性
-            face = Part.Face(outer_wire)
-            face.Wires = [outer_wire, inner_wire]
-        
-        profiles.append(face)
+        profiles[i] = build_profile_face(points[i], tangents[i], u_all[i], v_all[i], outer_radii[i], radius_ratio)
     
     # 使用放样创建弯管
-    try:
-        # 尝试使用标准参数
-        elbow = Part.makeLoft(profiles, True, False)
-    except TypeError:
-        # 如果失败，尝试简化参数
-        elbow = Part.makeLoft(profiles, True)
+    elbow = make_loft(profiles)
     
     # 添加到文档
     elbow_obj = doc.addObject("Part::Feature", "Elbow")
     elbow_obj.Shape = elbow
     
-    # 导出STL文件
-    try:
-        # 尝试新版本的导出方式
-        Mesh.export([elbow_obj], output_file)
-    except (TypeError, AttributeError):
-        # 如果失败，尝试旧版本的导出方式
-        try:
-            # 尝试使用MeshPart模块
-            import MeshPart
-            mesh = doc.addObject("Mesh::Feature", "Mesh")
-            mesh.Mesh = MeshPart.meshFromShape(Shape=elbow, LinearDeflection=0.1, AngularDeflection=0.1)
-            mesh.Mesh.write(output_file)
-        except (ImportError, AttributeError):
-            # 如果MeshPart不可用，尝试直接转换和导出
-            from FreeCAD import Base
-            mesh = doc.addObject("Mesh::Feature", "Mesh")
-            mesh.Mesh = elbow.tessellate(0.1)
-            mesh.Mesh.write(output_file)
+    # 导出STL文件: 直接三角化形状并写二进制STL, 不经过 Mesh::Feature
+    verts, tris = elbow.tessellate(tolerance if tolerance is not None else STL_TOLERANCE)
+    # FreeCAD.Vector 支持序列协议, 整个列表一次转换为 (N, 3) 数组
+    vertices = np.array(verts, dtype=np.float64).reshape(-1, 3)
+    faces = np.asarray(tris, dtype=np.int64).reshape(-1, 3)
+    write_binary_stl(output_file, vertices, faces)
     
     # 计算体积和表面积
     volume = elbow.Volume
@@ -244,6 +400,7 @@ def main():
     parser.add_argument("-a", "--angle", type=float, default=45.0, help="弯曲角度(度) (默认: 45.0)")
     parser.add_argument("-t", "--taper-ratio", type=float, default=1.0, help="终端/起始半径比例 (默认: 1.0，表示不缩小)")
     parser.add_argument("-s", "--sections", type=int, default=64, help="弯曲分段数 (默认: 64)")
+    parser.add_argument("-e", "--tolerance", type=float, default=None, help="弦高误差容差, 给定时据此确定分段数和STL精度 (默认: 不使用)")
     parser.add_argument("-f", "--output-file", type=str, default="elbow.stl", help="输出STL文件路径 (默认: elbow.stl)")
     parser.add_argument("-x", "--center-x", type=float, default=0.0, help="起始点X坐标 (默认: 0.0)")
     parser.add_argument("-y", "--center-y", type=float, default=0.0, help="起始点Y坐标 (默认: 0.0)")
@@ -274,7 +431,8 @@ def main():
             start_dir,
             bend_normal,
             args.sections,
-            args.taper_ratio
+            args.taper_ratio,
+            tolerance=args.tolerance
         )
         
         return 0
@@ -8,23 +8,89 @@ import sys
 import os
 import math
 import argparse
+import numpy as np
 
 # 导入FreeCAD模块
 try:
     import FreeCAD
-    import Part
     import Mesh
-    # 尝试导入可能需要的额外模块
-    try:
-        import MeshPart
-    except ImportError:
-        pass
     print(f"成功加载FreeCAD (版本: {FreeCAD.Version})")
 except ImportError as e:
     print(f"错误: 无法导入FreeCAD模块 - {e}")
     print("请确保FreeCAD已正确安装，并且环境变量设置正确")
     sys.exit(1)
 
+def build_tube_mesh(length, outer_radius, inner_radius, center, direction, segments):
+    """
+    直接生成空心直圆管的三角网格 (不经过BRep布尔运算)
+
+    参数:
+        center, direction: 长度为3的数组, direction 需已单位化
+        segments: 圆周分段数
+
+    返回:
+        vertices: (4*segments, 3) 顶点数组, 依次为 外圈底/外圈顶/内圈底/内圈顶
+        faces: (8*segments, 3) 三角形顶点索引, 法线朝向实体外侧
+    """
+    # 与方向垂直的一组正交基 (u, v, direction 构成右手系)
+    helper = np.array([0.0, 0.0, 1.0]) if abs(direction[2]) < 0.9 else np.array([1.0, 0.0, 0.0])
+    u = np.cross(direction, helper)
+    u /= np.linalg.norm(u)
+    v = np.cross(direction, u)
+
+    theta = np.linspace(0.0, 2.0 * np.pi, segments, endpoint=False)
+    ring = np.cos(theta)[:, None] * u + np.sin(theta)[:, None] * v
+    top = length * direction
+    vertices = np.concatenate([
+        center + outer_radius * ring,        # 外圈底
+        center + outer_radius * ring + top,  # 外圈顶
+        center + inner_radius * ring,        # 内圈底
+        center + inner_radius * ring + top,  # 内圈顶
+    ])
+
+    k = np.arange(segments)
+    k1 = (k + 1) % segments
+    ob, ot, ib, it = k, k + segments, k + 2 * segments, k + 3 * segments
+    ob1, ot1, ib1, it1 = k1, k1 + segments, k1 + 2 * segments, k1 + 3 * segments
+    faces = np.concatenate([
+        np.stack([ob, ob1, ot1], axis=1), np.stack([ob, ot1, ot], axis=1),  # 外壁
+        np.stack([ib, it1, ib1], axis=1), np.stack([ib, it, it1], axis=1),  # 内壁
+        np.stack([ot, ot1, it1], axis=1), np.stack([ot, it1, it], axis=1),  # 顶面圆环
+        np.stack([ob, ib1, ob1], axis=1), np.stack([ob, ib, ib1], axis=1),  # 底面圆环
+    ])
+    return vertices, faces
+
+# 二进制STL单个三角形记录: 法线 + 三个顶点 (小端float32) + 2字节属性, 共50字节
+STL_DTYPE = np.dtype([
+    ('normal', '<f4', (3,)),
+    ('v0', '<f4', (3,)),
+    ('v1', '<f4', (3,)),
+    ('v2', '<f4', (3,)),
+    ('attr', '<u2'),
+])
+
+def write_binary_stl(output_file, vertices, faces):
+    """
+    将三角网格一次性写为二进制STL (80字节文件头 + 三角形数 + 每个三角形50字节)
+    """
+    v0 = vertices[faces[:, 0]]
+    v1 = vertices[faces[:, 1]]
+    v2 = vertices[faces[:, 2]]
+    normals = np.cross(v1 - v0, v2 - v0)
+    lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+    normals = np.divide(normals, lengths, out=np.zeros_like(normals), where=lengths > 0)
+
+    records = np.zeros(len(faces), dtype=STL_DTYPE)
+    records['normal'] = normals
+    records['v0'] = v0
+    records['v1'] = v1
+    records['v2'] = v2
+
+    with open(output_file, 'wb') as f:
+        f.write(b'binary STL generated by generate_tube.py'.ljust(80, b' '))
+        f.write(np.array(len(faces), dtype='<u4').tobytes())
+        records.tofile(f)
+
 def create_tube(
     length, 
     outer_radius, 
@@ -32,7 +98,8 @@ def create_tube(
     output_file="tube.stl",
     center=FreeCAD.Vector(0, 0, 0),
     direction=FreeCAD.Vector(0, 0, 1),
-    segments=64
+    segments=64,
+    add_to_document=True
 ):
     """
     创建一个直圆管模型并导出为STL文件
@@ -45,6 +112,8 @@ def create_tube(
         center: 圆管中心点
         direction: 圆管方向向量
         segments: 圆周分段数
+        add_to_document: 为 True 时把网格加入新建的 FreeCAD 文档并返回该文档;
+                         为 False 时只导出STL并返回 None, 省去逐个三角形转换为 Mesh 对象
     """
     # 验证参数
     if inner_radius >= outer_radius:
@@ -59,73 +128,30 @@ def create_tube(
     
     direction = direction.normalize()
     
-    # 创建新文档
-    doc = FreeCAD.newDocument("Tube")
+    # 直圆管无需BRep: 直接生成三角网格, 省去两次makeCylinder和布尔差运算
+    vertices, faces = build_tube_mesh(
+        length,
+        outer_radius,
+        inner_radius,
+        np.array([center.x, center.y, center.z], dtype=float),
+        np.array([direction.x, direction.y, direction.z], dtype=float),
+        segments
+    )
     
-    # 创建外圆柱
-    # 注意: 根据FreeCAD版本不同，makeCylinder可能接受不同数量的参数
-    # 在较旧版本中，没有segments参数
-    try:
-        # 尝试使用6个参数（包括segments）
-        outer_cylinder = Part.makeCylinder(
-            outer_radius,  # 半径
-            length,        # 高度
-            center,        # 基点 
-            direction,     # 方向
-            360,           # 角度
-            segments       # 分段数
-        )
-    except TypeError:
-        # 如果失败，使用5个参数（不包括segments）
-        outer_cylinder = Part.makeCylinder(
-            outer_radius,  # 半径
-            length,        # 高度
-            center,        # 基点 
-            direction,     # 方向
-            360            # 角度
-        )
+    # 导出STL文件 (直接写二进制STL, 不经过FreeCAD的导出流程)
+    write_binary_stl(output_file, vertices, faces)
     
-    # 创建内圆柱
-    try:
-        # 尝试使用6个参数（包括segments）
-        inner_cylinder = Part.makeCylinder(
-            inner_radius,  # 半径
-            length,        # 高度
-            center,        # 基点 
-            direction,     # 方向
-            360,           # 角度
-            segments       # 分段数
-        )
-    except TypeError:
-        # 如果失败，使用5个参数（不包括segments）
-        inner_cylinder = Part.makeCylinder(
-            inner_radius,  # 半径
-            length,        # 高度
-            center,        # 基点 
-            direction,     # 方向
-            360            # 角度
-        )
-    
-    # 执行布尔差运算，创建空心圆管
-    hollow_tube = outer_cylinder.cut(inner_cylinder)
-    
-    # 添加到文档
-    tube_obj = doc.addObject("Part::Feature", "Tube")
-    tube_obj.Shape = hollow_tube
-    
-    # 导出STL文件
-    try:
-        # 尝试新版本的导出方式
-        Mesh.export([tube_obj], output_file)
-    except TypeError:
-        # 如果失败，尝试旧版本的导出方式
-        mesh = doc.addObject("Mesh::Feature", "Mesh")
-        mesh.Mesh = MeshPart.meshFromShape(Shape=hollow_tube, LinearDeflection=0.1, AngularDeflection=0.1)
-        mesh.Mesh.write(output_file)
+    # 只有调用方需要文档对象时才构建 Mesh (需要逐个三角形转换为 Python 列表)
+    doc = None
+    if add_to_document:
+        doc = FreeCAD.newDocument("Tube")
+        tube_obj = doc.addObject("Mesh::Feature", "Tube")
+        tube_obj.Mesh = Mesh.Mesh(vertices[faces].reshape(-1, 3).tolist())
     
-    # 计算体积和表面积
-    volume = hollow_tube.Volume
-    surface_area = hollow_tube.Area
+    # 计算体积和表面积 (按理想圆柱面解析计算)
+    volume = math.pi * (outer_radius ** 2 - inner_radius ** 2) * length
+    surface_area = (2 * math.pi * (outer_radius + inner_radius) * length
+                    + 2 * math.pi * (outer_radius ** 2 - inner_radius ** 2))
     wall_thickness = outer_radius - inner_radius
     
     # 打印信息
@@ -169,7 +195,8 @@ def main():
             args.output_file,
             center,
             direction,
-            args.segments
+            args.segments,
+            add_to_document=False
         )
         
         return 0